@@ -1,20 +1,25 @@
 """Analytics and progress tracking API endpoints"""
 
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy import desc, func
+from sqlalchemy import desc, func, literal_column
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.core.security import get_current_user
+from app.core.security import get_current_user, require_admin
 from app.models.assessment import Assessment, SkillProgress
 from app.models.scenario import Scenario
 from app.models.session import Session as SessionModel
 from app.models.session import SessionStatus
 from app.models.user import User
+from app.services.assessment_engine import SKILLS
+from app.services.cohort_export import MEDIA_TYPES, ExportFormat, cohort_export_service
+from app.services.leaderboard import leaderboard_service
+from app.services.recommender import recommendation_service
 
 router = APIRouter()
 
@@ -37,9 +42,13 @@ class SkillRadarData(BaseModel):
 
 
 class ProgressTrend(BaseModel):
-    dates: List[str]
-    scores: List[int]
+    dates: List[str]  # Start of each bucket
+    scores: List[int]  # Average score per bucket
+    min_scores: List[int]
+    max_scores: List[int]
+    counts: List[int]  # Assessments per bucket
     skill: str
+    bucket: str
 
 
 @router.get("/user/{user_id}/dashboard")
@@ -49,76 +58,74 @@ async def get_user_dashboard(
     """
     Get comprehensive dashboard data for a user
 
+    Computed with a fixed number of aggregate queries (see
+    scripts/check_dashboard_queries.py), however long the user's history.
+
     Args:
         user_id: User ID
     """
     # Get user
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.query(User.id).filter(User.id == user_id).first()
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Get completed sessions
-    completed_sessions = (
-        db.query(SessionModel)
-        .filter(SessionModel.user_id == user_id, SessionModel.status == SessionStatus.COMPLETED)
-        .all()
-    )
-
-    # Get assessments
-    assessments = db.query(Assessment).filter(Assessment.user_id == user_id).all()
+    completed = (SessionModel.user_id == user_id, SessionModel.status == SessionStatus.COMPLETED)
 
-    # Calculate statistics
-    total_scenarios = len(completed_sessions)
-    total_time_spent = (
-        sum((s.duration or 0) for s in completed_sessions) // 60
-    )  # Convert to minutes
-
-    average_score = 0
-    if assessments:
-        average_score = sum(a.overall_score for a in assessments) / len(assessments)
+    # Completed session count and total time, average assessment score
+    total_scenarios, total_duration = (
+        db.query(func.count(SessionModel.id), func.coalesce(func.sum(SessionModel.duration), 0))
+        .filter(*completed)
+        .one()
+    )
+    average_score = (
+        db.query(func.avg(Assessment.overall_score)).filter(Assessment.user_id == user_id).scalar()
+    )
 
     # Scenarios by specialty
-    scenarios_by_specialty = {}
-    for session in completed_sessions:
-        scenario = db.query(Scenario).filter(Scenario.id == session.scenario_id).first()
-        if scenario:
-            specialty = scenario.specialty
-            scenarios_by_specialty[specialty] = scenarios_by_specialty.get(specialty, 0) + 1
-
-    # Recent activity (last 5 sessions)
+    specialty_counts = (
+        db.query(Scenario.specialty, func.count(SessionModel.id))
+        .join(Scenario, Scenario.id == SessionModel.scenario_id)
+        .filter(*completed)
+        .group_by(Scenario.specialty)
+        .all()
+    )
+
+    # Recent activity (last 5 sessions) with scenario title and score
     recent_sessions = (
-        db.query(SessionModel)
+        db.query(
+            SessionModel.session_id,
+            SessionModel.started_at,
+            SessionModel.duration,
+            SessionModel.status,
+            Scenario.title,
+            Assessment.overall_score,
+        )
+        .outerjoin(Scenario, Scenario.id == SessionModel.scenario_id)
+        .outerjoin(Assessment, Assessment.session_id == SessionModel.session_id)
         .filter(SessionModel.user_id == user_id)
         .order_by(desc(SessionModel.started_at))
         .limit(5)
         .all()
     )
 
-    recent_activity = []
-    for session in recent_sessions:
-        scenario = db.query(Scenario).filter(Scenario.id == session.scenario_id).first()
-
-        assessment = (
-            db.query(Assessment).filter(Assessment.session_id == session.session_id).first()
-        )
-
-        recent_activity.append(
-            {
-                "session_id": session.session_id,
-                "scenario_title": scenario.title if scenario else "Unknown",
-                "date": session.started_at.isoformat(),
-                "duration": session.duration,
-                "score": assessment.overall_score if assessment else None,
-                "status": session.status,
-            }
-        )
+    recent_activity = [
+        {
+            "session_id": session.session_id,
+            "scenario_title": session.title or "Unknown",
+            "date": session.started_at.isoformat(),
+            "duration": session.duration,
+            "score": session.overall_score,
+            "status": session.status,
+        }
+        for session in recent_sessions
+    ]
 
     return {
         "total_scenarios_completed": total_scenarios,
-        "total_time_spent": total_time_spent,
-        "average_score": round(average_score, 1),
-        "scenarios_by_specialty": scenarios_by_specialty,
+        "total_time_spent": int(total_duration) // 60,  # Convert to minutes
+        "average_score": round(float(average_score or 0), 1),
+        "scenarios_by_specialty": dict(specialty_counts),
         "recent_activity": recent_activity,
     }
 
@@ -151,148 +158,167 @@ async def get_skills_radar(
     return skills
 
 
-@router.get("/user/{user_id}/progress-trend")
+@router.get("/user/{user_id}/progress-trend", response_model=ProgressTrend)
 async def get_progress_trend(
     user_id: int,
     skill: Optional[str] = Query(None, description="Specific skill to track"),
-    days: int = Query(30, description="Number of days to look back"),
+    days: int = Query(30, ge=1, description="Number of days to look back"),
+    bucket: Literal["day", "week", "month"] = Query("day", description="Bucket size"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
     """
     Get progress trend over time
 
+    Scores are grouped into day, week (from Monday) or month buckets in SQL,
+    reading only the typed score columns, so the series length depends on
+    the window and bucket size, not on the number of assessments.
+
     Args:
         user_id: User ID
         skill: Specific skill to track (optional, defaults to overall score)
         days: Number of days to look back
+        bucket: Bucket size
     """
+    if skill and skill not in SKILLS:
+        raise HTTPException(status_code=400, detail=f"Unknown skill: {skill}")
+    score = getattr(Assessment, f"{skill}_score" if skill else "overall_score")
+
     # Calculate date range
     end_date = datetime.utcnow()
     start_date = end_date - timedelta(days=days)
 
-    # Get assessments in date range
-    assessments = (
-        db.query(Assessment)
-        .filter(Assessment.user_id == user_id, Assessment.created_at >= start_date)
-        .order_by(Assessment.created_at)
+    bucket_start = _bucket_start(db, bucket, Assessment.created_at).label("bucket_start")
+    rows = (
+        db.query(
+            bucket_start,
+            func.avg(score).label("average"),
+            func.min(score).label("minimum"),
+            func.max(score).label("maximum"),
+            func.count(score).label("count"),
+        )
+        .filter(
+            Assessment.user_id == user_id,
+            Assessment.created_at >= start_date,
+            score.isnot(None),
+        )
+        .group_by(bucket_start)
+        .order_by(bucket_start)
         .all()
     )
 
-    dates = []
-    scores = []
+    return {
+        "dates": [_format_bucket(row.bucket_start) for row in rows],
+        "scores": [int(round(float(row.average))) for row in rows],
+        "min_scores": [row.minimum for row in rows],
+        "max_scores": [row.maximum for row in rows],
+        "counts": [row.count for row in rows],
+        "skill": skill or "overall",
+        "bucket": bucket,
+    }
+
 
-    for assessment in assessments:
-        dates.append(assessment.created_at.strftime("%Y-%m-%d"))
+def _bucket_start(db: Session, bucket: str, column):
+    """SQL expression for the start of the day/week/month containing ``column``"""
+    if db.get_bind().dialect.name == "sqlite":
+        modifiers = {"day": (), "week": ("weekday 0", "-6 days"), "month": ("start of month",)}
+        return func.date(column, *modifiers[bucket])
+    # Inline the unit: as a bind parameter, PostgreSQL would not match the
+    # SELECT and GROUP BY expressions
+    return func.date_trunc(literal_column(f"'{bucket}'"), column)
 
-        if skill and skill in assessment.skills_breakdown:
-            scores.append(assessment.skills_breakdown[skill].get("score", 0))
-        else:
-            scores.append(assessment.overall_score)
 
-    return {"dates": dates, "scores": scores, "skill": skill or "overall"}
+def _format_bucket(value) -> str:
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    return str(value)[:10]
 
 
 @router.get("/user/{user_id}/recommendations")
 async def get_scenario_recommendations(
     user_id: int,
-    limit: int = Query(5, description="Number of recommendations"),
+    limit: int = Query(5, ge=1, le=50, description="Number of recommendations"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
     """
     Get personalized scenario recommendations based on weak areas
 
+    Unplayed published scenarios are ranked by how strongly their skill
+    emphasis (from the rubric and past students' scores) overlaps the user's
+    weakest skills.
+
     Args:
         user_id: User ID
         limit: Number of scenarios to recommend
     """
-    # Get skill progress to identify weak areas
-    skill_progress = (
-        db.query(SkillProgress)
-        .filter(SkillProgress.user_id == user_id)
-        .order_by(SkillProgress.current_level)
-        .all()
-    )
-
-    # Identify weakest skills
-    weak_skills = [s.skill_name for s in skill_progress[:2]] if skill_progress else []
-
-    # Get scenarios user has completed
-    completed_sessions = (
-        db.query(SessionModel.scenario_id)
-        .filter(SessionModel.user_id == user_id, SessionModel.status == SessionStatus.COMPLETED)
-        .all()
-    )
-    completed_scenario_ids = [s.scenario_id for s in completed_sessions]
-
-    # Find scenarios targeting weak areas that haven't been completed
-    # This is a simplified recommendation - could be enhanced with ML
-    recommendations = (
-        db.query(Scenario)
-        .filter(Scenario.id.notin_(completed_scenario_ids), Scenario.status == "published")
-        .order_by(Scenario.average_score.desc())
-        .limit(limit)
-        .all()
-    )
-
-    return [
-        {
-            "scenario_id": s.scenario_id,
-            "title": s.title,
-            "specialty": s.specialty,
-            "difficulty": s.difficulty,
-            "average_score": s.average_score,
-            "reason": (
-                f"Recommended to improve {', '.join(weak_skills)}"
-                if weak_skills
-                else "Popular scenario"
-            ),
-        }
-        for s in recommendations
-    ]
+    return recommendation_service.recommend(db, user_id, limit)
 
 
 @router.get("/leaderboard")
 async def get_leaderboard(
-    specialty: Optional[str] = Query(None), limit: int = Query(10), db: Session = Depends(get_db)
+    specialty: Optional[str] = Query(None),
+    institution: Optional[str] = Query(None),
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
 ):
     """
     Get leaderboard of top performing users
 
+    Served from the incrementally maintained leaderboard table; pages are
+    cached briefly, and ``generated_at`` says when a page was read.
+
     Args:
         specialty: Filter by specialty (optional)
+        institution: Filter by institution (optional)
         limit: Number of users to return
+        offset: Number of users to skip
     """
-    # Get average scores per user
-    query = db.query(
-        User.id,
-        User.first_name,
-        User.last_name,
-        User.institution,
-        func.avg(Assessment.overall_score).label("avg_score"),
-        func.count(Assessment.id).label("scenarios_completed"),
-    ).join(Assessment, User.id == Assessment.user_id)
-
-    if specialty:
-        # Filter by specialty through sessions and scenarios
-        query = (
-            query.join(SessionModel, Assessment.session_id == SessionModel.session_id)
-            .join(Scenario, SessionModel.scenario_id == Scenario.id)
-            .filter(Scenario.specialty == specialty)
-        )
+    return leaderboard_service.get_page(
+        db, specialty=specialty, institution=institution, offset=offset, limit=limit
+    )
 
-    query = query.group_by(User.id).order_by(desc("avg_score")).limit(limit)
 
-    results = query.all()
+@router.get("/cohort-export")
+async def export_cohort(
+    format: ExportFormat = Query("csv", description="csv or ndjson"),
+    institution: Optional[str] = Query(None),
+    started_from: Optional[datetime] = Query(None, description="Sessions started at or after"),
+    started_to: Optional[datetime] = Query(None, description="Sessions started before"),
+    scenario_id: Optional[str] = Query(None),
+    include_transcript: bool = Query(False),
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Stream a cohort's sessions with their assessment scores (admin only)
 
-    return [
-        {
-            "rank": idx + 1,
-            "user_name": f"{r.first_name} {r.last_name}",
-            "institution": r.institution,
-            "average_score": round(r.avg_score, 1),
-            "scenarios_completed": r.scenarios_completed,
-        }
-        for idx, r in enumerate(results)
-    ]
+    One row per session, in session order, optionally with the transcript.
+    Rows are read from a server-side cursor and sent as they are encoded,
+    so memory use does not grow with the size of the cohort.
+
+    Args:
+        format: Output format
+        institution: Only users of this institution
+        started_from: Only sessions started at or after this time
+        started_to: Only sessions started before this time
+        scenario_id: Only sessions of this scenario
+        include_transcript: Add each session's transcript (JSON in CSV)
+    """
+    if started_from and started_to and started_from >= started_to:
+        raise HTTPException(status_code=400, detail="started_from must be before started_to")
+
+    filename = f"cohort-{datetime.utcnow():%Y%m%d-%H%M%S}.{format}"
+    return StreamingResponse(
+        cohort_export_service.stream(
+            format,
+            institution=institution,
+            started_from=started_from,
+            started_to=started_to,
+            scenario_id=scenario_id,
+            include_transcript=include_transcript,
+        ),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
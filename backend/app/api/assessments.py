@@ -2,16 +2,23 @@
 
 import uuid
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from pydantic import BaseModel, Field, field_validator
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.core.security import get_current_user
+from app.core.pagination import keyset_page, set_next_cursor
+from app.core.security import get_current_user, require_admin
 from app.models.assessment import Assessment, SkillProgress
 from app.models.session import Session as SessionModel
+from app.services.assessment_engine import validate_score_weights
+from app.services.batch_scoring import ASSESSMENT_RESCORE_JOB
+from app.services.job_queue import job_queue
+from app.services.leaderboard import leaderboard_service
+from app.services.recommender import recommendation_service
+from app.services.skill_progress import skill_progress_service
 
 router = APIRouter()
 
@@ -68,6 +75,22 @@ class SkillProgressResponse(BaseModel):
         from_attributes = True
 
 
+class RescoreRequest(BaseModel):
+    """Options for re-scoring stored assessments"""
+
+    weights: Optional[Dict[str, float]] = Field(
+        None, description="Overall-score weight per skill (defaults to the configured weights)"
+    )
+    scenario_id: Optional[int] = Field(None, description="Only re-score this scenario's sessions")
+    batch_size: int = Field(5000, ge=100, le=50000)
+    dry_run: bool = False
+
+    @field_validator("weights")
+    @classmethod
+    def check_weights(cls, weights: Optional[Dict[str, float]]) -> Optional[Dict[str, float]]:
+        return validate_score_weights(weights) if weights is not None else None
+
+
 @router.post("/", response_model=AssessmentResponse, status_code=status.HTTP_201_CREATED)
 async def create_assessment(
     assessment_data: AssessmentCreate,
@@ -107,15 +130,44 @@ async def create_assessment(
     assessment = Assessment(assessment_id=assessment_id, **assessment_data.model_dump())
 
     db.add(assessment)
+    skill_progress_service.record_assessment(
+        db, assessment_data.user_id, assessment_data.skills_breakdown
+    )
+    leaderboard_service.record_assessment(
+        db, assessment_data.user_id, assessment_data.session_id, assessment_data.overall_score
+    )
     db.commit()
     db.refresh(assessment)
-
-    # Update skill progress
-    await _update_skill_progress(db, assessment_data.user_id, assessment_data.skills_breakdown)
+    recommendation_service.invalidate_user(assessment_data.user_id)
 
     return assessment
 
 
+@router.post("/rescore", status_code=status.HTTP_202_ACCEPTED)
+async def rescore_assessments(
+    request: RescoreRequest,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Queue a re-score of stored assessments (admin only).
+
+    Scores are recomputed in vectorised batches from each assessment's stored
+    metrics and its scenario's current rubric; only changed rows are written.
+    Poll ``GET /jobs/{job_id}`` for the result counts.
+    """
+    params = {
+        "weights": request.weights,
+        "scenario_pk": request.scenario_id,
+        "batch_size": request.batch_size,
+        "dry_run": request.dry_run,
+    }
+    job = job_queue.enqueue(db, ASSESSMENT_RESCORE_JOB, params)
+    db.commit()
+
+    return {"job_id": job.job_id, "status": job.status}
+
+
 @router.get("/{assessment_id}", response_model=AssessmentResponse)
 async def get_assessment(
     assessment_id: str,
@@ -152,20 +204,18 @@ async def get_assessment_by_session(
 @router.get("/user/{user_id}", response_model=List[AssessmentResponse])
 async def list_user_assessments(
     user_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
-    """List all assessments for a user"""
-    assessments = (
-        db.query(Assessment)
-        .filter(Assessment.user_id == user_id)
-        .order_by(Assessment.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    """List all assessments for a user, most recent first"""
+    query = db.query(Assessment).filter(Assessment.user_id == user_id)
+    keys = [Assessment.created_at, Assessment.id]
+    assessments = keyset_page(query, keys, cursor, limit).offset(skip).all()
+    set_next_cursor(response, assessments, keys, limit)
 
     return assessments
 
@@ -178,56 +228,3 @@ async def get_user_skill_progress(
     skills = db.query(SkillProgress).filter(SkillProgress.user_id == user_id).all()
 
     return skills
-
-
-async def _update_skill_progress(db: Session, user_id: int, skills_breakdown: dict):
-    """Update user skill progress based on latest assessment"""
-    for skill_name, skill_data in skills_breakdown.items():
-        score = skill_data.get("score", 0)
-
-        # Get or create skill progress
-        progress = (
-            db.query(SkillProgress)
-            .filter(SkillProgress.user_id == user_id, SkillProgress.skill_name == skill_name)
-            .first()
-        )
-
-        if progress:
-            # Update existing
-            progress.previous_level = progress.current_level
-            progress.current_level = score
-            progress.sessions_count += 1
-            progress.last_score = score
-
-            # Calculate average
-            if progress.average_score:
-                progress.average_score = int(
-                    (progress.average_score * (progress.sessions_count - 1) + score)
-                    / progress.sessions_count
-                )
-            else:
-                progress.average_score = score
-
-            # Determine trend
-            if progress.previous_level:
-                if score > progress.previous_level + 5:
-                    progress.trend = "improving"
-                elif score < progress.previous_level - 5:
-                    progress.trend = "declining"
-                else:
-                    progress.trend = "stable"
-
-        else:
-            # Create new
-            progress = SkillProgress(
-                user_id=user_id,
-                skill_name=skill_name,
-                current_level=score,
-                last_score=score,
-                average_score=score,
-                sessions_count=1,
-                trend="new",
-            )
-            db.add(progress)
-
-    db.commit()
@@ -1,16 +1,21 @@
 """Clark integration API endpoints for importing consultations"""
 
-import uuid
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.core.security import get_current_user
-from app.models.scenario import DifficultyLevel, Scenario, ScenarioStatus
+from app.core.security import get_current_user, require_admin
+from app.models.job import Job
+from app.models.scenario import DifficultyLevel, Scenario
+from app.services.bulk_jobs import bulk_job_registry
+from app.services.clark_import import CLARK_IMPORT_JOB, build_scenario_row
 from app.services.clark_integration import clark_service
+from app.services.clark_sync import clark_sync_service
+from app.services.job_queue import job_queue
 
 router = APIRouter()
 
@@ -116,38 +121,50 @@ class ImportResult(BaseModel):
 async def list_consultations(
     specialty: Optional[str] = Query(None),
     limit: int = Query(20, le=50),
+    offset: int = Query(0, ge=0),
+    sync: bool = Query(
+        False, description="Fetch consultations newer than the watermark first (admin only)"
+    ),
+    db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
     """
     List available consultations from Clark that can be imported.
-    Requires Clark authentication. Returns mock data if not authenticated.
+
+    When authenticated, the listing (including the specialty filter) is served
+    from the local cache without contacting Clark. Admins may pass ``sync=true``
+    to first pull consultations newer than the stored watermark, like
+    ``POST /clark/sync``. Returns mock data if not authenticated.
     """
+    if sync:
+        await require_admin(current_user)
+
     # Check if authenticated with Clark
     if clark_service.is_authenticated():
-        result = await clark_service.fetch_consultations(specialty=specialty, limit=limit)
+        sync_result = await clark_sync_service.sync() if sync else None
 
-        if result.get("success"):
-            return {
-                "success": True,
-                "authenticated": True,
-                "consultations": result.get("consultations", []),
-                "count": result.get("count", 0),
-            }
-        elif result.get("code") == "TOKEN_EXPIRED":
+        if sync_result and sync_result.get("code") == "TOKEN_EXPIRED":
             return {
                 "success": False,
                 "authenticated": False,
                 "error": "Session expired - please log in again",
                 "consultations": [],
             }
-        else:
-            # API error but still authenticated
-            return {
-                "success": False,
-                "authenticated": True,
-                "error": result.get("error"),
-                "consultations": [],
-            }
+
+        cached = clark_sync_service.list_cached(db, specialty=specialty, limit=limit, offset=offset)
+        response = {
+            "success": True,
+            "authenticated": True,
+            "consultations": cached["consultations"],
+            "count": cached["count"],
+            "total": cached["total"],
+            "synced_at": clark_sync_service.get_status(db)["last_synced_at"],
+        }
+        if sync_result and not sync_result.get("success"):
+            # API error but still authenticated - serve the (possibly stale) cache
+            response["error"] = sync_result.get("error")
+            response["stale"] = True
+        return response
 
     # Not authenticated - return mock data with login required flag
     mock_consultations = [
@@ -214,6 +231,36 @@ async def list_consultations(
     }
 
 
+@router.post("/sync")
+async def sync_consultations(
+    full: bool = Query(False, description="Ignore the watermark and re-list from the start"),
+    max_pages: int = Query(20, ge=1, le=200),
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Incrementally sync Clark consultations into the local cache (admin only).
+    Only consultations newer than the stored watermark are fetched; a sync
+    that stops early resumes where it left off on the next call.
+    """
+    result = await clark_sync_service.sync(max_pages=max_pages, full=full)
+
+    if result.get("code") in ("NOT_AUTHENTICATED", "TOKEN_EXPIRED"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Log in to Clark before syncing",
+        )
+
+    return result
+
+
+@router.get("/sync/status")
+async def get_sync_status(
+    db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)
+):
+    """Get the Clark sync watermark and local cache size"""
+    return clark_sync_service.get_status(db)
+
+
 @router.get("/consultations/{consultation_id}/preview", response_model=ConsultationPreview)
 async def preview_consultation(
     consultation_id: str,
@@ -327,6 +374,8 @@ async def import_consultation(
             result = await clark_service.get_consultation(consultation_id)
             if result.get("success") and result.get("consultation"):
                 scenario_data = clark_service.convert_to_scenario(result["consultation"])
+                # Track the source so bulk imports can skip it
+                scenario_data["source_clark_consultation_id"] = consultation_id
 
         # Fall back to mock data if not from Clark
         if not scenario_data:
@@ -338,34 +387,28 @@ async def import_consultation(
                 detail=f"Consultation {consultation_id} not found",
             )
 
-        # Generate unique scenario ID
-        scenario_id = f"scenario_{uuid.uuid4().hex[:12]}"
-
-        # Override difficulty if provided
-        if difficulty:
-            scenario_data["difficulty"] = difficulty
-
         # Create scenario in draft status
         scenario = Scenario(
-            scenario_id=scenario_id,
-            title=scenario_data.get("title", "Imported Scenario"),
-            description=scenario_data.get(
-                "description", "Scenario imported from Clark consultation"
-            ),
-            specialty=scenario_data.get("specialty", "General Practice"),
-            difficulty=DifficultyLevel(scenario_data.get("difficulty", "intermediate")),
-            status=ScenarioStatus.DRAFT,
-            patient_profile=scenario_data.get("patient_profile", {}),
-            dialogue_tree=scenario_data.get("dialogue_tree", {}),
-            learning_objectives=scenario_data.get("learning_objectives", []),
-            correct_diagnosis=scenario_data.get("correct_diagnosis", ""),
-            assessment_rubric=scenario_data.get("assessment_rubric", {}),
-            clare_guidelines=scenario_data.get("clare_guideline_ids", []),
-            created_by=current_user.get("sub"),
+            **build_scenario_row(scenario_data, current_user.get("sub"), difficulty)
         )
 
         db.add(scenario)
-        db.commit()
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            existing = (
+                db.query(Scenario.scenario_id)
+                .filter(Scenario.source_clark_consultation_id == consultation_id)
+                .scalar()
+            )
+            if existing is None:
+                raise
+            return ImportResult(
+                success=False,
+                scenario_id=existing,
+                message=f"Consultation already imported as scenario '{existing}'",
+            )
         db.refresh(scenario)
 
         return ImportResult(
@@ -380,6 +423,60 @@ async def import_consultation(
         return ImportResult(success=False, message=f"Failed to import consultation: {str(e)}")
 
 
+class BulkImportRequest(BaseModel):
+    """Options for a bulk Clark import run"""
+
+    max_consultations: int = Field(500, ge=1, le=5000)
+    concurrency: int = Field(4, ge=1, le=16)
+    batch_size: int = Field(50, ge=1, le=500)
+    difficulty: Optional[DifficultyLevel] = None
+    dry_run: bool = False
+
+
+@router.post("/consultations/bulk-import", status_code=status.HTTP_202_ACCEPTED)
+async def bulk_import_consultations(
+    request: BulkImportRequest,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Import many Clark consultations as draft scenarios in the background (admin only).
+
+    Consultations already imported are skipped. Poll
+    ``GET /clark/imports/{job_id}`` for per-consultation progress.
+    """
+    if not clark_service.is_authenticated():
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Log in to Clark before running a bulk import",
+        )
+
+    params = request.model_dump(mode="json")
+    params["created_by"] = current_user.get("sub")
+    job = job_queue.enqueue(db, CLARK_IMPORT_JOB, params)
+    db.commit()
+
+    return bulk_job_registry.describe(job, include_items=False)
+
+
+@router.get("/imports/{job_id}")
+async def get_bulk_import_status(
+    job_id: str,
+    include_items: bool = Query(True, description="Include per-consultation results"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin),
+):
+    """Get progress of a bulk Clark import job (admin only)"""
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+
+    if not job or job.kind != CLARK_IMPORT_JOB:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Import job {job_id} not found"
+        )
+
+    return bulk_job_registry.describe(job, include_items=include_items)
+
+
 def _get_mock_scenario_data(consultation_id: str) -> Optional[dict]:
     """Get mock scenario data for demo purposes"""
     mock_data = {
@@ -2,10 +2,18 @@
 
 from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException, Query, status
-from pydantic import BaseModel
-
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.security import require_admin
+from app.models.job import Job
+from app.models.scenario import ScenarioStatus
+from app.services.bulk_jobs import bulk_job_registry
 from app.services.clare_integration import clare_service
+from app.services.guideline_enrichment import GUIDELINE_ENRICHMENT_JOB
+from app.services.job_queue import job_queue
 
 router = APIRouter()
 
@@ -28,6 +36,20 @@ class GuidelinesSearchResponse(BaseModel):
     count: int
 
 
+class EnrichmentRequest(BaseModel):
+    """Options for a bulk guideline enrichment run"""
+
+    dry_run: bool = False
+    concurrency: int = Field(5, ge=1, le=20)
+    batch_size: int = Field(100, ge=1, le=1000)
+    only_missing: bool = False
+    status: Optional[ScenarioStatus] = None
+    resume_after_id: Optional[int] = Field(None, description="Resume after this scenario id")
+    resume_job_id: Optional[str] = Field(
+        None, description="Resume from the checkpoint of a previous enrichment job"
+    )
+
+
 @router.get("/search", response_model=GuidelinesSearchResponse)
 async def search_guidelines(
     condition: str = Query(..., description="Clinical condition or diagnosis to search for"),
@@ -70,6 +92,52 @@ async def search_guidelines(
     )
 
 
+@router.post("/enrich", status_code=status.HTTP_202_ACCEPTED)
+async def start_guideline_enrichment(
+    request: EnrichmentRequest,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Queue a bulk Clare enrichment job over the scenario catalogue (admin only).
+
+    The job runs in the background; poll ``GET /guidelines/enrich/{job_id}``
+    for progress. Pass ``resume_job_id`` (or ``resume_after_id``) to continue an
+    interrupted run from its last checkpoint.
+    """
+    resume_after_id = request.resume_after_id
+    if request.resume_job_id:
+        previous = _get_enrichment_job(db, request.resume_job_id)
+        resume_after_id = bulk_job_registry.describe(previous).get("checkpoint")
+
+    params = request.model_dump(mode="json", exclude={"resume_job_id"})
+    params["resume_after_id"] = resume_after_id
+    job = job_queue.enqueue(db, GUIDELINE_ENRICHMENT_JOB, params)
+    db.commit()
+
+    return bulk_job_registry.describe(job, include_items=False)
+
+
+@router.get("/enrich/{job_id}")
+async def get_guideline_enrichment_status(
+    job_id: str,
+    include_items: bool = Query(False, description="Include per-scenario results"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin),
+):
+    """Get progress of a bulk enrichment job (admin only)"""
+    return bulk_job_registry.describe(_get_enrichment_job(db, job_id), include_items=include_items)
+
+
+def _get_enrichment_job(db: Session, job_id: str) -> Job:
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+    if not job or job.kind != GUIDELINE_ENRICHMENT_JOB:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Enrichment job {job_id} not found"
+        )
+    return job
+
+
 @router.get("/{guideline_id}")
 async def get_guideline(guideline_id: str):
     """
@@ -0,0 +1,119 @@
+"""Background job status API endpoints"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.projection import load_only_for
+from app.core.security import get_current_user, require_admin
+from app.models.job import Job, JobStatus
+from app.services.job_queue import job_queue
+
+router = APIRouter()
+
+
+class JobResponse(BaseModel):
+    """State of a background job"""
+
+    job_id: str
+    queue: str
+    kind: str
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    progress: Optional[Dict[str, Any]]
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    created_at: Optional[datetime]
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+@router.get("/", response_model=List[JobResponse])
+async def list_jobs(
+    queue: Optional[str] = None,
+    kind: Optional[str] = None,
+    job_status: Optional[JobStatus] = Query(None, alias="status"),
+    limit: int = Query(50, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin),
+):
+    """List background jobs, newest first (admin only)"""
+    query = db.query(Job).options(load_only_for(Job, JobResponse))
+    if queue:
+        query = query.filter(Job.queue == queue)
+    if kind:
+        query = query.filter(Job.kind == kind)
+    if job_status:
+        query = query.filter(Job.status == job_status.value)
+
+    return query.order_by(Job.id.desc()).offset(offset).limit(limit).all()
+
+
+@router.get("/stats")
+async def get_job_stats(
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Get job counts per queue and status, and this process's worker state (admin only)
+    """
+    counts: Dict[str, Dict[str, int]] = {}
+    rows = db.query(Job.queue, Job.status, func.count(Job.id)).group_by(Job.queue, Job.status)
+    for queue, job_status, count in rows:
+        counts.setdefault(queue, {})[job_status] = count
+
+    return {"counts": counts, "workers": job_queue.stats()}
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """Get the status of a background job"""
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found")
+
+    return job
+
+
+@router.post("/{job_id}/retry", response_model=JobResponse)
+async def retry_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin),
+):
+    """Queue a failed job to run again with a fresh set of attempts (admin only)"""
+    job = db.query(Job).filter(Job.job_id == job_id).first()
+
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found")
+    if job.status != JobStatus.FAILED.value:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Only failed jobs can be retried (job is {job.status})",
+        )
+
+    job.status = JobStatus.PENDING.value
+    job.attempts = 0
+    job.run_at = datetime.utcnow()
+    job.finished_at = None
+    db.commit()
+    db.refresh(job)
+    job_queue.notify(job.queue)
+
+    return job
@@ -1,19 +1,57 @@
 """Scenario management API endpoints"""
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, field_serializer
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.core.security import get_current_user
+from app.core.http_cache import PRIVATE_CACHE, PUBLIC_CACHE, conditional_response, make_etag
+from app.core.pagination import keyset_page, set_next_cursor
+from app.core.projection import load_only_for
+from app.core.security import get_current_user, require_admin
 from app.models.scenario import DifficultyLevel, Scenario, ScenarioStatus
+from app.services.dialogue_graph import DialogueGraphError, compile_dialogue_tree
+from app.services.recommender import recommendation_service
+from app.services.scenario_registry import scenario_registry
+from app.services.scenario_search import scenario_search_service
+from app.services.scenario_transfer import scenario_transfer_service
 
 router = APIRouter()
 
 
+def _compile_dialogue(dialogue_tree: dict) -> dict:
+    """Validate a dialogue tree and build its compiled node index"""
+    try:
+        return compile_dialogue_tree(dialogue_tree)
+    except DialogueGraphError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid dialogue tree: {e}"
+        )
+
+
+def _catalogue_version(db: Session, with_stats: bool = True) -> tuple:
+    """
+    Cheap fingerprint of the scenario table, used in list ETags.
+
+    Row count and highest id catch inserts and deletes, the latest
+    ``updated_at`` catches edits and status changes. ``times_played`` is bumped
+    without touching ``updated_at``, so list endpoints showing it also fold in
+    its sum.
+    """
+    columns = [func.count(Scenario.id), func.max(Scenario.id), func.max(Scenario.updated_at)]
+    if with_stats:
+        columns += [
+            func.sum(Scenario.times_played),
+            func.sum(func.coalesce(Scenario.average_score, 0)),
+        ]
+    return tuple(db.execute(select(*columns)).one())
+
+
 # Pydantic schemas
 class ScenarioBase(BaseModel):
     scenario_id: str
@@ -65,26 +103,58 @@ class ScenarioListItem(BaseModel):
         from_attributes = True
 
 
+class ScenarioSearchHit(ScenarioListItem):
+    """Search result with its relevance"""
+
+    rank: float
+
+
+class ScenarioSearchResponse(BaseModel):
+    query: str
+    total: int
+    offset: int
+    limit: int
+    results: List[ScenarioSearchHit]
+    facets: Dict[str, Dict[str, int]]
+
+
 @router.get("/", response_model=List[ScenarioListItem])
 async def list_scenarios(
+    request: Request,
+    response: Response,
     specialty: Optional[str] = Query(None),
     difficulty: Optional[DifficultyLevel] = Query(None),
     status: Optional[ScenarioStatus] = Query(None, description="Filter by status"),
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     db: Session = Depends(get_db),
 ):
     """
     List all scenarios with optional filters
 
+    Answers ``If-None-Match`` with 304 when the catalogue has not changed
+    since the client's copy.
+
     Args:
         specialty: Filter by medical specialty
         difficulty: Filter by difficulty level
         status: Filter by publication status
-        skip: Number of records to skip
+        skip: Number of records to skip (prefer ``cursor`` for deep pages)
         limit: Maximum number of records to return
+        cursor: Continue after the previous page (its ``X-Next-Cursor`` header)
     """
-    query = db.query(Scenario)
+    etag = make_etag(
+        "scenarios", _catalogue_version(db), specialty, difficulty, status, skip, limit, cursor
+    )
+    published_only = status in (None, ScenarioStatus.PUBLISHED)
+    cached = conditional_response(
+        request, response, etag, PUBLIC_CACHE if published_only else PRIVATE_CACHE
+    )
+    if cached:
+        return cached
+
+    query = db.query(Scenario).options(load_only_for(Scenario, ScenarioListItem))
 
     if specialty:
         query = query.filter(Scenario.specialty == specialty)
@@ -96,21 +166,136 @@ async def list_scenarios(
         # By default, only show published scenarios
         query = query.filter(Scenario.status == ScenarioStatus.PUBLISHED)
 
-    scenarios = query.offset(skip).limit(limit).all()
+    keys = [Scenario.id]
+    scenarios = keyset_page(query, keys, cursor, limit, descending=False).offset(skip).all()
+    set_next_cursor(response, scenarios, keys, limit)
     return scenarios
 
 
+@router.get("/search", response_model=ScenarioSearchResponse)
+async def search_scenarios(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text"),
+    specialty: Optional[str] = Query(None),
+    difficulty: Optional[DifficultyLevel] = Query(None),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """
+    Search published scenarios, most relevant first
+
+    Matches title, description, diagnosis, learning objectives and presenting
+    complaint; each word of ``q`` also matches longer words it starts.
+
+    Args:
+        q: Search text
+        specialty: Only return scenarios of this specialty
+        difficulty: Only return scenarios of this difficulty
+        offset: Number of results to skip
+        limit: Maximum number of results to return
+
+    Returns:
+        Ranked results, total match count and counts per specialty and
+        difficulty (before the specialty and difficulty filters)
+    """
+    found = scenario_search_service.search(
+        db, q, specialty, difficulty, offset, limit, projection=ScenarioListItem
+    )
+    return {
+        "query": q,
+        "total": found["total"],
+        "offset": offset,
+        "limit": limit,
+        "results": [
+            ScenarioSearchHit(
+                **ScenarioListItem.model_validate(scenario).model_dump(), rank=round(rank, 4)
+            )
+            for scenario, rank in found["hits"]
+        ],
+        "facets": found["facets"],
+    }
+
+
+@router.get("/export")
+async def export_scenarios(
+    status: Optional[ScenarioStatus] = Query(None, description="Only export this status"),
+    specialty: Optional[str] = Query(None),
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Stream the scenario catalogue as NDJSON (admin only)
+
+    One scenario per line, in the format ``POST /scenarios/import`` accepts.
+    Rows are read from a server-side cursor as the response is sent.
+    """
+    return StreamingResponse(
+        scenario_transfer_service.export_lines(status, specialty),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="scenarios.ndjson"'},
+    )
+
+
+@router.post("/import")
+async def import_scenarios(
+    request: Request,
+    overwrite: bool = Query(False, description="Update scenarios that already exist"),
+    batch_size: int = Query(200, ge=1, le=1000, description="Scenarios per transaction"),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_admin),
+):
+    """
+    Import scenarios from an NDJSON request body (admin only)
+
+    The body is parsed as it is received; each line is validated like
+    ``POST /scenarios`` and may also set ``status``. Valid lines are written
+    in transactions of ``batch_size`` scenarios, so a bad line or batch does
+    not undo the others.
+
+    Returns:
+        Counts of lines, created and updated scenarios, and per-line errors
+    """
+    return await scenario_transfer_service.import_lines(
+        db,
+        request.stream(),
+        overwrite=overwrite,
+        batch_size=batch_size,
+        created_by=current_user.get("sub"),
+    )
+
+
 @router.get("/{scenario_id}", response_model=ScenarioResponse)
-async def get_scenario(scenario_id: str, db: Session = Depends(get_db)):
-    """Get scenario by ID"""
-    scenario = db.query(Scenario).filter(Scenario.scenario_id == scenario_id).first()
+async def get_scenario(
+    scenario_id: str, request: Request, response: Response, db: Session = Depends(get_db)
+):
+    """
+    Get scenario by ID
 
-    if not scenario:
+    The ETag is derived from the scenario's version columns, read without
+    loading its JSON documents, so a matching ``If-None-Match`` gets a 304
+    before the full row is fetched or serialised.
+    """
+    version = db.execute(
+        select(
+            Scenario.id,
+            Scenario.status,
+            Scenario.updated_at,
+            Scenario.times_played,
+            Scenario.average_score,
+        ).where(Scenario.scenario_id == scenario_id)
+    ).first()
+
+    if not version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail=f"Scenario {scenario_id} not found"
         )
 
-    return scenario
+    etag = make_etag("scenario", *version)
+    cache_control = PUBLIC_CACHE if version.status == ScenarioStatus.PUBLISHED else PRIVATE_CACHE
+    cached = conditional_response(request, response, etag, cache_control)
+    if cached:
+        return cached
+
+    return db.get(Scenario, version.id)
 
 
 @router.post("/", response_model=ScenarioResponse, status_code=status.HTTP_201_CREATED)
@@ -129,8 +314,11 @@ async def create_scenario(
             detail=f"Scenario with ID {scenario_data.scenario_id} already exists",
         )
 
+    compiled_dialogue = _compile_dialogue(scenario_data.dialogue_tree)
+
     scenario = Scenario(
         **scenario_data.model_dump(),
+        compiled_dialogue=compiled_dialogue,
         created_by=current_user.get("sub"),
         status=ScenarioStatus.DRAFT,
     )
@@ -157,12 +345,17 @@ async def update_scenario(
             status_code=status.HTTP_404_NOT_FOUND, detail=f"Scenario {scenario_id} not found"
         )
 
+    compiled_dialogue = _compile_dialogue(scenario_data.dialogue_tree)
+
     # Update fields
     for key, value in scenario_data.model_dump().items():
         setattr(scenario, key, value)
+    scenario.compiled_dialogue = compiled_dialogue
 
     db.commit()
     db.refresh(scenario)
+    scenario_registry.invalidate(scenario.id)
+    recommendation_service.invalidate_index()
 
     return scenario
 
@@ -179,8 +372,11 @@ async def delete_scenario(
             status_code=status.HTTP_404_NOT_FOUND, detail=f"Scenario {scenario_id} not found"
         )
 
+    scenario_pk = scenario.id
     db.delete(scenario)
     db.commit()
+    scenario_registry.invalidate(scenario_pk)
+    recommendation_service.invalidate_index()
 
     return None
 
@@ -204,6 +400,7 @@ async def publish_scenario(
 
     db.commit()
     db.refresh(scenario)
+    recommendation_service.invalidate_index()
 
     return scenario
 
@@ -224,12 +421,19 @@ async def archive_scenario(
 
     db.commit()
     db.refresh(scenario)
+    scenario_registry.invalidate(scenario.id)
+    recommendation_service.invalidate_index()
 
     return scenario
 
 
 @router.get("/specialties/list")
-async def list_specialties(db: Session = Depends(get_db)):
+async def list_specialties(request: Request, response: Response, db: Session = Depends(get_db)):
     """Get list of all available specialties"""
+    etag = make_etag("specialties", _catalogue_version(db, with_stats=False))
+    cached = conditional_response(request, response, etag, PUBLIC_CACHE)
+    if cached:
+        return cached
+
     specialties = db.query(Scenario.specialty).distinct().all()
     return [s[0] for s in specialties]
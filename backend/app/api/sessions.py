@@ -1,20 +1,33 @@
 """Session management API endpoints"""
 
+import json
+import logging
 import uuid
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.core.pagination import keyset_page, set_next_cursor
+from app.core.projection import load_only_for
 from app.core.security import get_current_user
 from app.models.assessment import Assessment
 from app.models.scenario import Scenario
 from app.models.session import Session as SessionModel
 from app.models.session import SessionStatus
-from app.services.assessment_engine import AssessmentEngine
+from app.services.conversation_log import conversation_store
+from app.services.job_queue import job_queue
+from app.services.scenario_registry import scenario_registry, session_scenario_data
+from app.services.session_assessment import SESSION_ASSESSMENT_JOB
+from app.services.session_bootstrap import session_bootstrap_cache
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -118,12 +131,33 @@ async def create_session(
 
     db.add(session)
 
-    # Update scenario play count
-    scenario.times_played += 1
+    # Update scenario play count. updated_at is left alone: it versions the
+    # cached scenario snapshot, which a play does not change
+    db.execute(
+        update(Scenario)
+        .where(Scenario.id == scenario.id)
+        .values(times_played=Scenario.times_played + 1, updated_at=Scenario.updated_at)
+    )
+
+    # Read what the WebSocket will need before the commit expires the row
+    scenario_pk, scenario_version = scenario.id, scenario.updated_at
+    scenario_data = session_scenario_data(scenario_pk, scenario)
 
     db.commit()
     db.refresh(session)
 
+    # Warm the WebSocket bootstrap so the connect needs no database queries
+    try:
+        snapshot = scenario_registry.get(scenario_pk, scenario_version) or scenario_registry.put(
+            scenario_pk, scenario_version, scenario_data
+        )
+        session_bootstrap_cache.warm(
+            session_id, snapshot, presynthesise=settings.SESSION_BOOTSTRAP_PRESYNTHESISE
+        )
+    except Exception as e:
+        # The WebSocket falls back to loading the session from the database
+        logger.warning(f"Failed to warm bootstrap for session {session_id}: {e}")
+
     return session
 
 
@@ -142,23 +176,48 @@ async def get_session(
     return session
 
 
+@router.get("/{session_id}/conversation")
+async def get_session_conversation(
+    session_id: str, db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)
+):
+    """
+    Stream a session's full conversation for review, as NDJSON in turn order
+
+    Works while the session is still connected: stored turns are read in
+    batches, followed by the turns still held in memory.
+    """
+    exists = db.query(SessionModel.id).filter(SessionModel.session_id == session_id).first()
+    if not exists:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail=f"Session {session_id} not found"
+        )
+
+    async def lines():
+        async for message in conversation_store.iter_conversation(session_id):
+            yield (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.get("/user/{user_id}", response_model=List[SessionListItem])
 async def list_user_sessions(
     user_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
-    """List all sessions for a user"""
-    sessions = (
+    """List all sessions for a user, most recent first"""
+    query = (
         db.query(SessionModel)
+        .options(load_only_for(SessionModel, SessionListItem))
         .filter(SessionModel.user_id == user_id)
-        .order_by(SessionModel.started_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
     )
+    keys = [SessionModel.started_at, SessionModel.id]
+    sessions = keyset_page(query, keys, cursor, limit).offset(skip).all()
+    set_next_cursor(response, sessions, keys, limit)
 
     return sessions
 
@@ -166,9 +225,11 @@ async def list_user_sessions(
 @router.get("/user/{user_id}/history", response_model=List[SessionWithDetails])
 async def list_user_session_history(
     user_id: int,
+    response: Response,
     status: Optional[SessionStatus] = None,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
@@ -201,11 +262,10 @@ async def list_user_session_history(
     if status:
         query = query.filter(SessionModel.status == status)
 
-    # Order by most recent first
-    query = query.order_by(SessionModel.started_at.desc())
-
-    # Apply pagination
-    results = query.offset(skip).limit(limit).all()
+    # Most recent first, one keyset page
+    keys = [SessionModel.started_at, SessionModel.id]
+    results = keyset_page(query, keys, cursor, limit).offset(skip).all()
+    set_next_cursor(response, results, keys, limit)
 
     # Convert to response model
     sessions = []
@@ -274,7 +334,10 @@ async def complete_session(
     current_user: dict = Depends(get_current_user),
 ):
     """
-    Mark session as completed and create assessment
+    Mark session as completed and queue its assessment
+
+    The assessment is created by a background job; poll
+    ``GET /assessments/session/{session_id}`` or ``GET /jobs/{assessment_job_id}``.
 
     Args:
         session_id: Session ID
@@ -305,63 +368,28 @@ async def complete_session(
         diagnosis_correct = diagnosis.lower().strip() == scenario.correct_diagnosis.lower().strip()
         session.diagnosis_correct = diagnosis_correct
 
-    db.commit()
-
-    # Create assessment
-    assessment = None
+    # Score the session in the background, committed together with the completion
+    assessment_id = None
+    job = None
     if scenario:
-        # Build scenario data for assessment engine
-        scenario_data = {
-            "id": scenario.id,
-            "scenario_id": scenario.scenario_id,
-            "title": scenario.title,
-            "assessment_rubric": scenario.assessment_rubric or {},
-        }
-
-        # Build session data for assessment engine
-        session_data = {
-            "questions_asked": session.questions_asked or 0,
-            "relevant_questions": session.questions_asked
-            or 0,  # Simplified: assume all questions are relevant
-            "topics_covered": session.topics_covered or [],
-            "red_flags_caught": session.red_flags_identified or [],
-            "duration": duration,
-            "diagnosis_correct": diagnosis_correct,
-            "relevance_percentage": 70,  # Default relevance
-        }
-
-        # Calculate assessment using engine
-        engine = AssessmentEngine(scenario_data, session_data)
-        assessment_result = engine.calculate_assessment()
-
-        # Create assessment record
         assessment_id = f"assessment_{uuid.uuid4().hex[:12]}"
-        assessment = Assessment(
-            assessment_id=assessment_id,
-            user_id=session.user_id,
-            session_id=session.session_id,
-            overall_score=assessment_result["overall_score"],
-            history_taking_score=assessment_result["history_taking_score"],
-            clinical_reasoning_score=assessment_result["clinical_reasoning_score"],
-            management_score=assessment_result["management_score"],
-            communication_score=assessment_result["communication_score"],
-            efficiency_score=assessment_result["efficiency_score"],
-            metrics=assessment_result["metrics"],
-            skills_breakdown=assessment_result["skills_breakdown"],
-            feedback_summary=assessment_result["feedback_summary"],
-            strengths=assessment_result["strengths"],
-            areas_for_improvement=assessment_result["areas_for_improvement"],
+        job = job_queue.enqueue(
+            db,
+            SESSION_ASSESSMENT_JOB,
+            {"session_id": session.session_id, "assessment_id": assessment_id},
+            dedupe_key=f"{SESSION_ASSESSMENT_JOB}:{session.session_id}",
         )
+        # Completing twice keeps the first job and its assessment ID
+        assessment_id = job.payload["assessment_id"]
 
-        db.add(assessment)
-        db.commit()
-        db.refresh(assessment)
+    db.commit()
 
     return {
         "status": "success",
         "message": "Session completed",
         "duration": duration,
-        "assessment_id": assessment.assessment_id if assessment else None,
+        "assessment_id": assessment_id,
+        "assessment_job_id": job.job_id if job else None,
     }
 
 
@@ -2,10 +2,11 @@
 
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.pagination import keyset_page, set_next_cursor
 from app.core.security import (
     create_access_token,
     get_current_user,
@@ -14,6 +15,7 @@ from app.core.security import (
 )
 from app.models.user import ExperienceLevel, User, UserRole
 from app.schemas.user import TokenResponse, UserRegister, UserResponse, UserUpdate
+from app.services.leaderboard import leaderboard_service
 
 router = APIRouter()
 
@@ -153,6 +155,7 @@ async def update_current_user_profile(
         user.last_name = update_data.last_name
     if update_data.institution is not None:
         user.institution = update_data.institution
+        leaderboard_service.set_institution(db, user.id, user.institution)
     if update_data.year_of_study is not None:
         user.year_of_study = update_data.year_of_study
     if update_data.specialty_interest is not None:
@@ -230,8 +233,10 @@ async def get_user_by_id(
 
 @router.get("/", response_model=List[UserResponse])
 async def list_users(
+    response: Response,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
     experience_level: Optional[str] = None,
     current_user: Dict[str, Any] = Depends(require_admin),
     db: Session = Depends(get_db),
@@ -242,7 +247,9 @@ async def list_users(
     if experience_level:
         query = query.filter(User.experience_level == ExperienceLevel(experience_level))
 
-    users = query.offset(skip).limit(limit).all()
+    keys = [User.id]
+    users = keyset_page(query, keys, cursor, limit, descending=False).offset(skip).all()
+    set_next_cursor(response, users, keys, limit)
 
     return [
         UserResponse(
@@ -3,10 +3,11 @@
 import asyncio
 import os
 import tempfile
+from collections.abc import Mapping
 from typing import Any, Dict, List, Optional
 
 import httpx
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI
 from pydub import AudioSegment
 
 from app.core.config import settings
@@ -209,7 +210,9 @@ class AzureOpenAIService:
     """Azure OpenAI service for scenario adaptation and response generation"""
 
     def __init__(self):
-        self.client = AzureOpenAI(
+        # Async client: awaiting requests directly (rather than in an executor)
+        # means cancelling the calling task aborts the HTTP request too
+        self.client = AsyncAzureOpenAI(
             api_key=settings.AZURE_OPENAI_KEY,
             api_version=settings.AZURE_OPENAI_API_VERSION,
             azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
@@ -218,23 +221,44 @@ class AzureOpenAIService:
 
     async def generate_patient_response(
         self,
-        scenario_context: Dict[str, Any],
+        scenario_context: Mapping[str, Any],
         student_message: str,
         conversation_history: List[Dict[str, str]],
+        conversation_summary: Optional[str] = None,
+        system_prompt: Optional[str] = None,
     ) -> Dict[str, str]:
         """
         Generate contextual patient response using GPT-4
 
+        Args:
+            scenario_context: Scenario data
+            student_message: Student's latest message
+            conversation_history: Recent messages to include verbatim (already
+                fitted to the prompt budget by the caller)
+            conversation_summary: Summary of earlier turns not in the history
+            system_prompt: Precompiled ``build_system_prompt`` output for the
+                scenario; built from ``scenario_context`` when omitted
+
         Returns:
             Dict with 'text' and 'emotion' keys
         """
-        system_prompt = self._build_system_prompt(scenario_context)
+        if system_prompt is None:
+            system_prompt = self.build_system_prompt(scenario_context)
         messages = [{"role": "system", "content": system_prompt}]
 
+        if conversation_summary:
+            messages.append(
+                {
+                    "role": "system",
+                    "content": "Summary of the consultation so far (stay consistent with it):\n"
+                    + conversation_summary,
+                }
+            )
+
         # Add conversation history
         # Filter out non-string content from history if needed, or ensure history is clean
         clean_history = []
-        for msg in conversation_history[-6:]:
+        for msg in conversation_history:
             content = msg.get("content")
             # If content is a dict (from previous turns), extract text
             if isinstance(content, dict):
@@ -246,17 +270,12 @@ class AzureOpenAIService:
         # Add current student message
         messages.append({"role": "user", "content": student_message})
 
-        # Run in executor to avoid blocking
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: self.client.chat.completions.create(
-                model=self.deployment_name,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=200,
-                response_format={"type": "json_object"},  # Force JSON output
-            ),
+        response = await self.client.chat.completions.create(
+            model=self.deployment_name,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=200,
+            response_format={"type": "json_object"},  # Force JSON output
         )
 
         content = response.choices[0].message.content
@@ -268,7 +287,45 @@ class AzureOpenAIService:
             # Fallback if JSON parsing fails
             return {"text": content, "emotion": "neutral"}
 
-    def _build_system_prompt(self, scenario_context: Dict[str, Any]) -> str:
+    async def summarise_conversation(
+        self,
+        previous_summary: str,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 200,
+    ) -> str:
+        """
+        Fold older consultation turns into a rolling summary.
+
+        Args:
+            previous_summary: Summary so far (may be empty)
+            messages: Turns to add to the summary, oldest first
+            max_tokens: Upper bound on the summary length
+
+        Returns:
+            Updated summary text
+        """
+        transcript = "\n".join(
+            f"{'Student' if m['role'] == 'student' else 'Patient'}: {m['content']}"
+            for m in messages
+        )
+        prompt = (
+            "Update the running summary of a clinical history-taking consultation "
+            "between a medical student and a simulated patient. Keep every fact the "
+            "patient has disclosed and note which topics the student has asked about. "
+            "Be concise; use short bullet points.\n\n"
+            f"Current summary:\n{previous_summary or '(none yet)'}\n\n"
+            f"New turns:\n{transcript}"
+        )
+
+        response = await self.client.chat.completions.create(
+            model=self.deployment_name,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.2,
+            max_tokens=max_tokens,
+        )
+        return response.choices[0].message.content or previous_summary
+
+    def build_system_prompt(self, scenario_context: Mapping[str, Any]) -> str:
         """Build system prompt for patient role-play"""
         patient = scenario_context.get("patient_profile", {})
         dialogue_tree = scenario_context.get("dialogue_tree", {})
@@ -319,7 +376,7 @@ Example:
 """
         return prompt
 
-    def _extract_all_clinical_facts(self, dialogue_tree: Dict[str, Any]) -> str:
+    def _extract_all_clinical_facts(self, dialogue_tree: Mapping[str, Any]) -> str:
         """
         Recursively extract all clinical facts from the dialogue tree.
         Returns a formatted string of bullet points.
@@ -327,7 +384,7 @@ Example:
         facts = []
 
         def traverse(node_data: Any):
-            if isinstance(node_data, dict):
+            if isinstance(node_data, Mapping):
                 # Check if this is a node with 'patient_says'
                 if "patient_says" in node_data:
                     response = node_data["patient_says"]
@@ -341,15 +398,15 @@ Example:
 
                 # Recurse into all values
                 for key, value in node_data.items():
-                    if key == "branches" and isinstance(value, dict):
+                    if key == "branches" and isinstance(value, Mapping):
                         # Handle branches specifically to capture topic keys
                         for topic_key, branch_node in value.items():
                             # Add the topic key as context if useful
                             traverse(branch_node)
-                    elif isinstance(value, (dict, list)):
+                    elif isinstance(value, (Mapping, list, tuple)):
                         traverse(value)
 
-            elif isinstance(node_data, list):
+            elif isinstance(node_data, (list, tuple)):
                 for item in node_data:
                     traverse(item)
 
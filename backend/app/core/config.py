@@ -1,6 +1,6 @@
 """Application configuration management"""
 
-from typing import List
+from typing import Dict, List
 
 from pydantic import validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -46,6 +46,53 @@ class Settings(BaseSettings):
     # ElevenLabs (fallback)
     ELEVENLABS_API_KEY: str = ""
 
+    # Scenario registry (shared read-only scenarios for live sessions)
+    SCENARIO_REGISTRY_SIZE: int = 128
+
+    # Messages kept in memory per live session (older ones spill to the database)
+    CONVERSATION_BUFFER_SIZE: int = 16
+
+    # Patient prompt context: recent messages are sent verbatim up to this many
+    # tokens; older ones are folded into a rolling summary of at most
+    # CONTEXT_SUMMARY_MAX_TOKENS
+    CONTEXT_HISTORY_TOKEN_BUDGET: int = 400
+    CONTEXT_SUMMARY_MAX_TOKENS: int = 200
+
+    # Patient audio is sent after the text reply; synthesis slower than this is skipped
+    TTS_DEADLINE_SECONDS: float = 8.0
+
+    # Session bootstrap entries warmed at session creation for the WebSocket
+    # connect; optionally start synthesising the opening line right away
+    SESSION_BOOTSTRAP_TTL_SECONDS: float = 120.0
+    SESSION_BOOTSTRAP_PRESYNTHESISE: bool = False
+
+    # Weight of each skill score in an assessment's overall score (must sum to 1)
+    ASSESSMENT_SCORE_WEIGHTS: Dict[str, float] = {
+        "history_taking": 0.30,
+        "clinical_reasoning": 0.25,
+        "management": 0.20,
+        "communication": 0.15,
+        "efficiency": 0.10,
+    }
+
+    # Leaderboard pages are served from an in-process snapshot for this long
+    LEADERBOARD_CACHE_SECONDS: float = 30.0
+
+    # Scenario recommendations: skill index rebuild interval, per-user cache
+    RECOMMENDER_INDEX_TTL_SECONDS: float = 300.0
+    RECOMMENDATION_CACHE_SECONDS: float = 600.0
+    RECOMMENDATION_CACHE_SIZE: int = 20
+
+    # Background job queue (jobs table, polled by in-process asyncio workers)
+    JOB_WORKERS_ENABLED: bool = True
+    JOB_QUEUE_CONCURRENCY: Dict[str, int] = {"default": 2, "assessments": 4, "imports": 1}
+    JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    # A running job whose worker has not renewed its lease for this long is retried
+    JOB_LEASE_SECONDS: float = 60.0
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: float = 5.0
+    JOB_RETRY_BACKOFF_MAX_SECONDS: float = 600.0
+
     # Security
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
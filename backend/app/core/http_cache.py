@@ -0,0 +1,72 @@
+"""HTTP validation caching: strong ETags, If-None-Match and Cache-Control"""
+
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# Cache-Control for content anyone may see (published scenarios): caches and
+# proxies may reuse it briefly, then must revalidate with the ETag
+PUBLIC_CACHE = "public, max-age=60, must-revalidate"
+
+# Cache-Control for drafts and archived scenarios: browsers may keep a copy
+# but must revalidate every time, and shared caches must not store it
+PRIVATE_CACHE = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Build a strong ETag from the values that determine a response.
+
+    Args:
+        parts: Version values (timestamps, counts, request parameters)
+
+    Returns:
+        Quoted entity tag
+    """
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Whether the request's If-None-Match already names ``etag``.
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match, so a
+    ``W/`` prefix added by a proxy does not defeat revalidation.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in header.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    """304 response carrying the validators a cache needs to keep its copy"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def conditional_response(
+    request: Request, response: Response, etag: str, cache_control: str
+) -> Optional[Response]:
+    """
+    Answer a conditional GET, or tag the full response that will follow.
+
+    Usage in an endpoint, before loading anything heavy:
+
+        cached = conditional_response(request, response, etag, PUBLIC_CACHE)
+        if cached:
+            return cached
+
+    Returns:
+        A 304 response if the client's copy is current, otherwise None
+        (``response`` then carries the ETag and Cache-Control headers)
+    """
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return None
@@ -0,0 +1,104 @@
+"""Keyset (cursor) pagination for list endpoints"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import literal, tuple_
+from sqlalchemy.orm import InstrumentedAttribute, Query
+
+# Response header carrying the cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Opaque cursor for the row with the given sort-key values.
+
+    Args:
+        values: The row's sort-key values (ints, strings or datetimes)
+
+    Returns:
+        URL-safe token
+    """
+    payload = [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> List[Any]:
+    """
+    Sort-key values of a cursor made by ``encode_cursor``.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed or has the wrong length
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != length:
+            raise ValueError("wrong number of keys")
+        return [datetime.fromisoformat(v["dt"]) if isinstance(v, dict) else v for v in payload]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def keyset_page(
+    query: Query,
+    keys: Sequence[InstrumentedAttribute],
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True,
+) -> Query:
+    """
+    Order ``query`` by ``keys`` and restrict it to the page after ``cursor``.
+
+    The last key must be unique (normally the primary key) so the order is
+    total. Key columns must not be NULL: a row-value comparison with NULL is
+    never true, so such rows would drop out of cursor pages. With a matching
+    composite index each page costs the same however deep it is, and rows
+    inserted while paging do not shift later pages.
+
+    Usage:
+        query = keyset_page(query, [Model.created_at, Model.id], cursor, limit)
+        rows = query.all()
+        set_next_cursor(response, rows, [Model.created_at, Model.id], limit)
+
+    Args:
+        query: Filtered query
+        keys: Sort columns, most significant first
+        cursor: Cursor from the previous page's ``X-Next-Cursor``, if any
+        limit: Page size
+        descending: Newest/highest first (all keys share the direction)
+
+    Returns:
+        The paged query
+    """
+    if cursor:
+        values = decode_cursor(cursor, len(keys))
+        bound = tuple_(*(literal(v, type_=k.type) for k, v in zip(keys, values)))
+        row = tuple_(*keys)
+        query = query.filter(row < bound if descending else row > bound)
+    order = [k.desc() if descending else k.asc() for k in keys]
+    return query.order_by(*order).limit(limit)
+
+
+def next_cursor(
+    rows: Sequence[Any], keys: Sequence[InstrumentedAttribute], limit: int
+) -> Optional[str]:
+    """Cursor of the page after ``rows``, or None if ``rows`` is the last page"""
+    if len(rows) < limit or not rows:
+        return None
+    last = rows[-1]
+    return encode_cursor([getattr(last, k.key) for k in keys])
+
+
+def set_next_cursor(
+    response: Response, rows: Sequence[Any], keys: Sequence[InstrumentedAttribute], limit: int
+) -> None:
+    """Advertise the next page's cursor in the ``X-Next-Cursor`` response header"""
+    cursor = next_cursor(rows, keys, limit)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -0,0 +1,48 @@
+"""Column projections: load only the columns a response model serialises"""
+
+from functools import lru_cache
+from typing import Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm.interfaces import LoaderOption
+
+
+@lru_cache(maxsize=None)
+def projected_columns(model: type, schema: Type[BaseModel]) -> Tuple[str, ...]:
+    """
+    Names of ``model``'s column attributes that ``schema`` reads.
+
+    Every schema field must be a mapped column; anything else (a relationship
+    or Python property) could quietly load deferred columns per row, so it
+    raises instead.
+
+    Args:
+        model: SQLAlchemy model class
+        schema: Pydantic response model built ``from_attributes``
+
+    Returns:
+        Column attribute names, in schema field order
+    """
+    columns = inspect(model).column_attrs
+    missing = [name for name in schema.model_fields if name not in columns]
+    if missing:
+        raise ValueError(
+            f"{schema.__name__} fields are not {model.__name__} columns: {', '.join(missing)}"
+        )
+    return tuple(schema.model_fields)
+
+
+def load_only_for(model: type, schema: Type[BaseModel]) -> LoaderOption:
+    """
+    Query option loading only the columns ``schema`` serialises.
+
+    The other columns are deferred with raiseload, so code that reads one of
+    them from a projected row fails loudly instead of issuing a query per row.
+
+    Usage:
+        db.query(Scenario).options(load_only_for(Scenario, ScenarioListItem))
+    """
+    columns = projected_columns(model, schema)
+    return load_only(*(getattr(model, name) for name in columns), raiseload=True)
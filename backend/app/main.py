@@ -1,7 +1,10 @@
 """Main FastAPI application"""
 
+import asyncio
 import base64
 import logging
+import time
+import uuid
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,7 +13,14 @@ from sqlalchemy import text
 from app.core.azure_services import azure_speech_service
 from app.core.config import settings
 from app.core.database import AsyncSessionLocal, init_db
+from app.services.job_queue import job_queue
 from app.services.scenario_engine import ScenarioEngine
+from app.services.scenario_registry import (
+    ScenarioSnapshot,
+    scenario_registry,
+    session_scenario_data,
+)
+from app.services.session_bootstrap import SessionBootstrap, session_bootstrap_cache
 
 # Configure logging
 logging.basicConfig(
@@ -35,6 +45,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let browser clients read the revalidation and pagination headers
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
 
@@ -51,11 +63,17 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
 
+    # Start background job workers
+    if settings.JOB_WORKERS_ENABLED:
+        job_queue.start()
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down Coach AI backend...")
+    # Running jobs go back to the queue for the next worker
+    await job_queue.stop()
 
 
 # Health check endpoint
@@ -95,6 +113,8 @@ class ConnectionManager:
     def __init__(self):
         self.active_connections: dict[str, WebSocket] = {}
         self.scenario_engines: dict[str, ScenarioEngine] = {}
+        # In-flight turn per session: (turn_id, task)
+        self.turn_tasks: dict[str, tuple[str, asyncio.Task]] = {}
 
     async def connect(self, session_id: str, websocket: WebSocket):
         """Connect a client to a scenario session"""
@@ -106,8 +126,13 @@ class ConnectionManager:
         """Disconnect a client from a scenario session"""
         if session_id in self.active_connections:
             del self.active_connections[session_id]
-        if session_id in self.scenario_engines:
-            del self.scenario_engines[session_id]
+        cancelled_turn = self.cancel_turn(session_id)
+        if cancelled_turn:
+            logger.info(f"Cancelled turn {cancelled_turn} of disconnected session {session_id}")
+        engine = self.scenario_engines.pop(session_id, None)
+        if engine:
+            # Persist the turns still held in the engine's in-memory window
+            engine.close()
         logger.info(f"Client disconnected from session {session_id}")
 
     def set_engine(self, session_id: str, engine: ScenarioEngine):
@@ -118,6 +143,33 @@ class ConnectionManager:
         """Get the scenario engine for a session"""
         return self.scenario_engines.get(session_id)
 
+    def start_turn(self, session_id: str, turn_id: str, turn) -> asyncio.Task:
+        """Run a turn coroutine as the session's in-flight, cancellable task"""
+        task = asyncio.create_task(turn)
+        self.turn_tasks[session_id] = (turn_id, task)
+
+        def _finished(done: asyncio.Task):
+            current = self.turn_tasks.get(session_id)
+            if current and current[1] is done:
+                del self.turn_tasks[session_id]
+
+        task.add_done_callback(_finished)
+        return task
+
+    def cancel_turn(self, session_id: str) -> str | None:
+        """
+        Cancel the session's in-flight turn, aborting its OpenAI/TTS requests
+
+        Returns:
+            ID of the cancelled turn, or None if nothing was running
+        """
+        current = self.turn_tasks.pop(session_id, None)
+        if not current or current[1].done():
+            return None
+        turn_id, task = current
+        task.cancel()
+        return turn_id
+
     async def send_message(self, session_id: str, message: dict):
         """Send message to a specific scenario session"""
         if session_id in self.active_connections:
@@ -132,6 +184,182 @@ class ConnectionManager:
 # Create connection manager instance
 manager = ConnectionManager()
 
+# Turn ID of the patient's opening line sent on connect
+OPENING_TURN_ID = "opening"
+
+
+async def run_turn(session_id: str, engine: ScenarioEngine, student_message: str, turn_id: str):
+    """
+    Generate and send the patient's reply to one student message.
+
+    The text reply is sent as soon as the LLM returns; audio follows in a
+    separate ``patient_audio`` frame, or is skipped if synthesis misses
+    ``settings.TTS_DEADLINE_SECONDS``. Runs as a task tracked by the connection
+    manager so a newer message or a disconnect can cancel it, which aborts the
+    in-flight OpenAI and TTS calls.
+    """
+    started = time.perf_counter()
+
+    # Generate patient response using scenario engine
+    try:
+        patient_response, metadata = await engine.process_student_input(student_message)
+        logger.info(f"Patient response: {patient_response}")
+    except Exception as e:
+        logger.error(f"Error generating response: {e}")
+        await manager.send_message(
+            session_id,
+            {
+                "type": "patient_response",
+                "turn_id": turn_id,
+                "message": "I'm not sure I understand. Could you rephrase that?",
+                "audio_pending": False,
+                "error": str(e),
+            },
+        )
+        return
+
+    llm_ms = int((time.perf_counter() - started) * 1000)
+    await manager.send_message(
+        session_id,
+        {
+            "type": "patient_response",
+            "turn_id": turn_id,
+            "message": patient_response,
+            "audio_pending": True,
+            "metadata": metadata,
+            "timings": {"llm_ms": llm_ms},
+        },
+    )
+
+    await send_patient_audio(session_id, engine, patient_response, turn_id)
+
+
+async def send_patient_audio(
+    session_id: str,
+    engine: ScenarioEngine,
+    text: str,
+    turn_id: str,
+    synthesis: asyncio.Task | None = None,
+    extra: dict | None = None,
+):
+    """
+    Synthesise a patient line and send it as a ``patient_audio`` frame.
+
+    Synthesis slower than ``settings.TTS_DEADLINE_SECONDS`` is skipped and the
+    frame says so instead of carrying audio.
+
+    Args:
+        session_id: Session ID
+        engine: Session's scenario engine (for the patient's voice profile)
+        text: Line to speak
+        turn_id: Turn the audio belongs to
+        synthesis: Already running synthesis of ``text`` to wait for instead
+        extra: Additional fields for the frame
+    """
+    audio = {"type": "patient_audio", "turn_id": turn_id, "audio_base64": None, **(extra or {})}
+    tts_started = time.perf_counter()
+    try:
+        if synthesis is None:
+            voice_profile = engine.scenario.get("patient_profile", {}).get("voice_profile", {})
+            voice_name = azure_speech_service.get_voice_for_profile(voice_profile)
+            emotional_style = voice_profile.get("emotional_state", "neutral")
+            synthesis = azure_speech_service.synthesize_speech(
+                text=text,
+                voice_name=voice_name,
+                emotional_style=emotional_style,
+            )
+
+        audio_bytes = await asyncio.wait_for(synthesis, timeout=settings.TTS_DEADLINE_SECONDS)
+
+        # Convert to base64 for sending over WebSocket
+        audio["audio_base64"] = base64.b64encode(audio_bytes).decode("utf-8")
+        logger.info(f"Generated {len(audio_bytes)} bytes of audio")
+
+    except asyncio.TimeoutError:
+        logger.warning(
+            f"TTS missed its {settings.TTS_DEADLINE_SECONDS}s deadline for turn {turn_id}; "
+            "skipping audio"
+        )
+        audio["skipped"] = "deadline"
+    except Exception as audio_error:
+        logger.warning(f"TTS failed (continuing without audio): {audio_error}")
+        audio["skipped"] = "error"
+
+    audio["timings"] = {"tts_ms": int((time.perf_counter() - tts_started) * 1000)}
+    await manager.send_message(session_id, audio)
+
+
+async def send_opening(session_id: str, engine: ScenarioEngine, bootstrap: SessionBootstrap | None):
+    """
+    Send the patient's opening line on connect, then its audio.
+
+    Uses the line and any audio pre-synthesised by the session bootstrap;
+    runs as the session's first turn, so a student message barges in on it.
+    Both frames carry ``opening: true`` because a reconnect sends them again.
+    """
+    opening_line = bootstrap.opening_line if bootstrap else engine.get_initial_patient_message()
+    await manager.send_message(
+        session_id,
+        {
+            "type": "patient_response",
+            "turn_id": OPENING_TURN_ID,
+            "opening": True,
+            "message": opening_line,
+            "audio_pending": True,
+            "metadata": {"current_node": engine.current_node_id},
+        },
+    )
+    await send_patient_audio(
+        session_id,
+        engine,
+        opening_line,
+        OPENING_TURN_ID,
+        synthesis=bootstrap.opening_audio if bootstrap else None,
+        extra={"opening": True},
+    )
+
+
+async def load_session_scenario(session_id: str) -> ScenarioSnapshot | None:
+    """
+    Resolve a session's scenario snapshot from the database.
+
+    Reads the session's scenario and its current version (a light query); the
+    scenario body comes from the shared registry and is only fetched when this
+    version is not cached yet.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            text(
+                """
+                SELECT s.id, s.scenario_id, sc.updated_at
+                FROM sessions s
+                JOIN scenarios sc ON s.scenario_id = sc.id
+                WHERE s.session_id = :session_id
+            """
+            ),
+            {"session_id": session_id},
+        )
+        row = result.fetchone()
+        if not row:
+            return None
+
+        async def load_scenario():
+            scenario_result = await db.execute(
+                text(
+                    """
+                    SELECT sc.title, sc.specialty, sc.patient_profile, sc.dialogue_tree,
+                           sc.compiled_dialogue, sc.assessment_rubric
+                    FROM scenarios sc
+                    WHERE sc.id = :scenario_pk
+                """
+                ),
+                {"scenario_pk": row.scenario_id},
+            )
+            sc = scenario_result.fetchone()
+            return session_scenario_data(row.scenario_id, sc) if sc else None
+
+        return await scenario_registry.get_or_load(row.scenario_id, row.updated_at, load_scenario)
+
 
 # WebSocket endpoint for scenario interactions
 @app.websocket("/ws/{session_id}")
@@ -146,39 +374,27 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
     await manager.connect(session_id, websocket)
 
     try:
-        # Load session and scenario data from database
-        async with AsyncSessionLocal() as db:
-            # Get session with scenario data
-            result = await db.execute(
-                text(
-                    """
-                    SELECT s.id, s.scenario_id, sc.title, sc.specialty,
-                           sc.patient_profile, sc.dialogue_tree, sc.assessment_rubric
-                    FROM sessions s
-                    JOIN scenarios sc ON s.scenario_id = sc.id
-                    WHERE s.session_id = :session_id
-                """
-                ),
-                {"session_id": session_id},
+        # Sessions created by this worker moments ago come with everything
+        # prepared; otherwise load the scenario through the registry
+        bootstrap = session_bootstrap_cache.pop(session_id)
+        scenario_data = bootstrap.scenario if bootstrap else await load_session_scenario(session_id)
+
+        if scenario_data:
+            # Create and store scenario engine
+            engine = ScenarioEngine(scenario_data, session_id=session_id)
+            if not bootstrap:
+                # Possibly a reconnect: earlier turns are already stored
+                await engine.resume_conversation()
+            manager.set_engine(session_id, engine)
+            logger.info(
+                f"Loaded scenario '{scenario_data['title']}' for session {session_id}"
+                + (" from bootstrap" if bootstrap else "")
             )
-            row = result.fetchone()
-
-            if row:
-                scenario_data = {
-                    "id": str(row.scenario_id),
-                    "title": row.title,
-                    "specialty": row.specialty,
-                    "patient_profile": row.patient_profile or {},
-                    "dialogue_tree": row.dialogue_tree or {},
-                    "assessment_rubric": row.assessment_rubric or {},
-                }
-
-                # Create and store scenario engine
-                engine = ScenarioEngine(scenario_data)
-                manager.set_engine(session_id, engine)
-                logger.info(f"Loaded scenario '{row.title}' for session {session_id}")
-            else:
-                logger.warning(f"No session found for {session_id}")
+            manager.start_turn(
+                session_id, OPENING_TURN_ID, send_opening(session_id, engine, bootstrap)
+            )
+        else:
+            logger.warning(f"No session found for {session_id}")
 
         while True:
             # Receive message from client
@@ -190,60 +406,32 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             engine = manager.get_engine(session_id)
 
             if data.get("type") == "student_message" and engine:
-                student_message = data.get("message", "")
-
-                # Generate patient response using scenario engine
-                try:
-                    patient_response, metadata = await engine.process_student_input(student_message)
-
-                    logger.info(f"Patient response: {patient_response}")
-
-                    # Generate TTS audio for the response (optional)
-                    audio_base64 = None
-                    try:
-                        scenario_data = engine.scenario
-                        voice_profile = scenario_data.get("patient_profile", {}).get(
-                            "voice_profile", {}
-                        )
-                        voice_name = azure_speech_service.get_voice_for_profile(voice_profile)
-                        emotional_style = voice_profile.get("emotional_state", "neutral")
-
-                        audio_bytes = await azure_speech_service.synthesize_speech(
-                            text=patient_response,
-                            voice_name=voice_name,
-                            emotional_style=emotional_style,
-                        )
-
-                        # Convert to base64 for sending over WebSocket
-                        audio_base64 = base64.b64encode(audio_bytes).decode("utf-8")
-                        logger.info(f"Generated {len(audio_bytes)} bytes of audio")
-
-                    except Exception as audio_error:
-                        logger.warning(f"TTS failed (continuing without audio): {audio_error}")
-
-                    response = {
-                        "type": "patient_response",
-                        "message": patient_response,
-                        "audio_base64": audio_base64,
-                        "metadata": metadata,
-                    }
-
-                except Exception as e:
-                    logger.error(f"Error generating response: {e}")
-                    response = {
-                        "type": "patient_response",
-                        "message": "I'm not sure I understand. Could you rephrase that?",
-                        "audio_base64": None,
-                        "error": str(e),
-                    }
+                # A new message supersedes (barges in on) the turn still running
+                cancelled_turn = manager.cancel_turn(session_id)
+                if cancelled_turn:
+                    await manager.send_message(
+                        session_id,
+                        {
+                            "type": "turn_cancelled",
+                            "turn_id": cancelled_turn,
+                            "reason": "superseded",
+                        },
+                    )
+
+                turn_id = uuid.uuid4().hex[:12]
+                manager.start_turn(
+                    session_id,
+                    turn_id,
+                    run_turn(session_id, engine, data.get("message", ""), turn_id),
+                )
             else:
-                response = {
-                    "type": "error",
-                    "message": "Invalid message type or no scenario engine available",
-                }
-
-            # Send response back to client
-            await manager.send_message(session_id, response)
+                await manager.send_message(
+                    session_id,
+                    {
+                        "type": "error",
+                        "message": "Invalid message type or no scenario engine available",
+                    },
+                )
 
     except WebSocketDisconnect:
         manager.disconnect(session_id)
@@ -259,6 +447,7 @@ from app.api import (  # noqa: E402
     assessments,
     clark,
     guidelines,
+    jobs,
     scenarios,
     sessions,
     users,
@@ -277,6 +466,7 @@ app.include_router(
     guidelines.router, prefix=f"{settings.API_V1_STR}/guidelines", tags=["guidelines"]
 )
 app.include_router(clark.router, prefix=f"{settings.API_V1_STR}/clark", tags=["clark"])
+app.include_router(jobs.router, prefix=f"{settings.API_V1_STR}/jobs", tags=["jobs"])
 
 
 if __name__ == "__main__":
@@ -1,6 +1,9 @@
 """Database models"""
 
 from app.models.assessment import Assessment, SkillProgress
+from app.models.clark import ClarkConsultation, ClarkSyncState
+from app.models.job import Job, JobStatus
+from app.models.leaderboard import LeaderboardEntry
 from app.models.scenario import Scenario, ScenarioStatus
 from app.models.session import ConversationMessage, Session, SessionStatus
 from app.models.user import ExperienceLevel, Student, User, UserRole
@@ -17,4 +20,9 @@ __all__ = [
     "SkillProgress",
     "Scenario",
     "ScenarioStatus",
+    "ClarkConsultation",
+    "ClarkSyncState",
+    "Job",
+    "JobStatus",
+    "LeaderboardEntry",
 ]
@@ -2,7 +2,17 @@
 
 from datetime import datetime
 
-from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -66,6 +76,13 @@ class Assessment(Base):
     user = relationship("User", back_populates="assessments")
     session = relationship("Session", back_populates="assessment")
 
+    __table_args__ = (
+        # Keyset pages of a user's assessments, most recent first
+        Index("idx_assessments_user_created_at_id", "user_id", "created_at", "id"),
+        # Outer join from sessions in the history and dashboard queries
+        Index("idx_assessments_session_id", "session_id"),
+    )
+
     # Backwards compatibility property
     @property
     def student_id(self):
@@ -95,11 +112,16 @@ class SkillProgress(Base):
     trend = Column(String, nullable=True)  # "improving", "stable", "declining"
     sessions_count = Column(Integer, default=0)
     last_score = Column(Integer, nullable=True)
-    average_score = Column(Integer, nullable=True)
+    average_score = Column(Integer, nullable=True)  # score_sum / sessions_count
+    score_sum = Column(Integer, nullable=False, default=0)  # Sum of all scores
 
     # Timestamps
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        UniqueConstraint("user_id", "skill_name", name="skill_progress_user_id_skill_name_key"),
+    )
+
     def __repr__(self):
         return f"<SkillProgress {self.skill_name}: {self.current_level}>"
@@ -0,0 +1,69 @@
+"""Local cache of Clark consultations and incremental sync state"""
+
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, Text
+
+from app.core.database import Base
+
+
+class ClarkConsultation(Base):
+    """Clark consultation listing entry cached locally for browsing and filtering"""
+
+    __tablename__ = "clark_consultations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    consultation_id = Column(String, unique=True, index=True, nullable=False)
+
+    # Denormalised fields used for filtering and ordering
+    consultation_date = Column(DateTime, nullable=True)
+    specialty = Column(String, nullable=True)  # From Clark, or inferred locally
+    diagnosis = Column(String, nullable=True)
+    presenting_complaint = Column(Text, nullable=True)
+    status = Column(String, nullable=True)
+
+    # Listing payload as returned by Clark
+    data = Column(JSON, default=dict)
+
+    # Timestamps
+    first_seen_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_clark_consultations_date", "consultation_date", "consultation_id"),
+        Index(
+            "idx_clark_consultations_specialty_date",
+            "specialty",
+            "consultation_date",
+            "consultation_id",
+        ),
+    )
+
+    def __repr__(self):
+        return f"<ClarkConsultation {self.consultation_id}>"
+
+
+class ClarkSyncState(Base):
+    """Watermark for incremental Clark syncs (one row per synced feed)"""
+
+    __tablename__ = "clark_sync_state"
+
+    id = Column(Integer, primary_key=True, index=True)
+    feed = Column(String, unique=True, nullable=False)  # e.g., "anonymized_consultations"
+
+    # Newest consultation seen so far
+    last_consultation_date = Column(DateTime, nullable=True)
+    last_consultation_id = Column(String, nullable=True)
+
+    # Progress of a sync that stopped before reaching the watermark: the
+    # listing offset to resume from and the newest consultation it has seen
+    resume_offset = Column(Integer, nullable=True)
+    pending_consultation_date = Column(DateTime, nullable=True)
+    pending_consultation_id = Column(String, nullable=True)
+
+    # Sync bookkeeping
+    last_synced_at = Column(DateTime, nullable=True)
+    consultations_seen = Column(Integer, default=0)
+
+    def __repr__(self):
+        return f"<ClarkSyncState {self.feed}: {self.last_consultation_id}>"
@@ -0,0 +1,64 @@
+"""Persistent background job model"""
+
+import enum
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String, Text
+
+from app.core.database import Base
+
+
+class JobStatus(str, enum.Enum):
+    """Job status"""
+
+    PENDING = "pending"  # Waiting for run_at (new, or retrying after a failure)
+    RUNNING = "running"  # Claimed by a worker
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"  # Out of attempts
+
+
+class Job(Base):
+    """Unit of background work picked up by the job queue workers"""
+
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(String, unique=True, index=True, nullable=False)
+
+    # What to run
+    queue = Column(String, nullable=False)  # Concurrency is limited per queue
+    kind = Column(String, nullable=False, index=True)  # Registered handler name
+    payload = Column(JSON, default=dict)
+    # Optional idempotency key: a second enqueue with the same key returns the first job
+    dedupe_key = Column(String, unique=True, nullable=True)
+
+    # Scheduling and retries (status values are JobStatus)
+    status = Column(String(20), nullable=False, default=JobStatus.PENDING.value)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # Lease held by the worker running the job, renewed while it runs
+    locked_by = Column(String, nullable=True)
+    locked_at = Column(DateTime, nullable=True)
+
+    # Outcome
+    progress = Column(JSON, nullable=True)  # Reported by long-running handlers
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Claim query: due pending jobs of one queue, oldest first
+        Index("idx_jobs_queue_status_run_at", "queue", "status", "run_at"),
+        # Stale lease recovery
+        Index("idx_jobs_status_locked_at", "status", "locked_at"),
+    )
+
+    def __repr__(self):
+        return f"<Job {self.job_id} ({self.kind}): {self.status}>"
@@ -0,0 +1,59 @@
+"""Materialised leaderboard model"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String, UniqueConstraint
+
+from app.core.database import Base
+
+# Specialty value of the rows ranking users across all specialties
+ALL_SPECIALTIES = ""
+
+
+class LeaderboardEntry(Base):
+    """
+    A user's running assessment totals, overall and per specialty.
+
+    Updated in the same transaction as each new assessment, so the leaderboard
+    reads the top entries from an index instead of averaging all assessments.
+    """
+
+    __tablename__ = "leaderboard_entries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    specialty = Column(String(100), nullable=False, default=ALL_SPECIALTIES)
+
+    # Copied from the user so institution filters stay on the index
+    institution = Column(String(255), nullable=True)
+
+    # Running totals of the user's overall scores
+    score_sum = Column(Integer, nullable=False, default=0)
+    assessments_count = Column(Integer, nullable=False, default=0)
+    average_score = Column(Float, nullable=False, default=0)  # score_sum / assessments_count
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("specialty", "user_id", name="uq_leaderboard_entries_specialty_user"),
+        # Ranking reads scan these backwards (highest average first)
+        Index(
+            "idx_leaderboard_entries_rank",
+            "specialty",
+            "average_score",
+            "assessments_count",
+            "user_id",
+        ),
+        Index(
+            "idx_leaderboard_entries_institution_rank",
+            "specialty",
+            "institution",
+            "average_score",
+            "assessments_count",
+            "user_id",
+        ),
+    )
+
+    def __repr__(self):
+        specialty = self.specialty or "all"
+        return f"<LeaderboardEntry {self.user_id} ({specialty}): {self.average_score}>"
@@ -1,7 +1,7 @@
 """Scenario models"""
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, JSON, Enum, Index, text
 from sqlalchemy.orm import relationship
 import enum
 
@@ -63,6 +63,7 @@ class Scenario(Base):
     #     "branches": [...]
     #   }
     # }
+    compiled_dialogue = Column(JSON, nullable=True)  # Flat node index built from dialogue_tree
 
     # Learning objectives
     learning_objectives = Column(JSON, default=list)
@@ -100,5 +101,30 @@ class Scenario(Base):
     # Relationships
     sessions = relationship("Session", back_populates="scenario", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pages of the catalogue (published by default)
+        Index("idx_scenarios_status_id", "status", "id"),
+        # Catalogue filtered by specialty and difficulty
+        Index(
+            "idx_scenarios_status_specialty_difficulty", "status", "specialty", "difficulty", "id"
+        ),
+        # Published catalogue filtered by specialty only (the enum stores member names)
+        Index(
+            "idx_scenarios_published_specialty",
+            "specialty",
+            "id",
+            postgresql_where=text("status = 'PUBLISHED'"),
+            sqlite_where=text("status = 'PUBLISHED'"),
+        ),
+        # At most one scenario per Clark consultation
+        Index(
+            "idx_scenarios_source_clark_consultation_id",
+            "source_clark_consultation_id",
+            unique=True,
+            postgresql_where=text("source_clark_consultation_id IS NOT NULL"),
+            sqlite_where=text("source_clark_consultation_id IS NOT NULL"),
+        ),
+    )
+
     def __repr__(self):
         return f"<Scenario {self.scenario_id}: {self.title}>"
@@ -3,7 +3,18 @@
 import enum
 from datetime import datetime
 
-from sqlalchemy import JSON, Boolean, Column, DateTime, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+)
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -66,6 +77,13 @@ class Session(Base):
         "Assessment", back_populates="session", uselist=False, cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        # Keyset pages of a user's sessions, most recent first
+        Index("idx_sessions_user_started_at_id", "user_id", "started_at", "id"),
+        # A user's sessions in one status (dashboard totals, recommendations)
+        Index("idx_sessions_user_status", "user_id", "status"),
+    )
+
     # Backwards compatibility property
     @property
     def student_id(self):
@@ -97,7 +115,8 @@ class ConversationMessage(Base):
 
     # Metadata
     node_id = Column(String, nullable=True)  # Dialogue node this relates to
-    message_metadata = Column(JSON, default=dict)  # Additional metadata
+    # Mapped to the "metadata" column (the attribute name is reserved by SQLAlchemy)
+    message_metadata = Column("metadata", JSON, default=dict)  # Additional metadata
 
     def __repr__(self):
         return f"<Message {self.role}: {self.message[:50]}>"
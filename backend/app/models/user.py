@@ -3,7 +3,7 @@
 from datetime import datetime
 from enum import Enum as PyEnum
 
-from sqlalchemy import JSON, Boolean, Column, DateTime, Enum, Integer, String
+from sqlalchemy import JSON, Boolean, Column, DateTime, Enum, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -76,6 +76,11 @@ class User(Base):
     sessions = relationship("Session", back_populates="user", cascade="all, delete-orphan")
     assessments = relationship("Assessment", back_populates="user", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pages of the admin user list filtered by experience level
+        Index("idx_users_experience_level_id", "experience_level", "id"),
+    )
+
     @property
     def full_name(self) -> str:
         """Computed property for backwards compatibility"""
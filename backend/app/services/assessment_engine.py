@@ -1,27 +1,56 @@
 """Assessment and scoring engine"""
 
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
+# Skills scored for every assessment, in the order the overall score sums them
+SKILLS = ("history_taking", "clinical_reasoning", "management", "communication", "efficiency")
+
+
+def validate_score_weights(weights: Dict[str, float]) -> Dict[str, float]:
+    """
+    Check overall-score weights: one non-negative weight per skill, summing to 1.
+
+    Raises:
+        ValueError: If the weights are invalid
+    """
+    if set(weights) != set(SKILLS):
+        raise ValueError(f"Weights must be given for exactly these skills: {', '.join(SKILLS)}")
+    if any(weight < 0 for weight in weights.values()):
+        raise ValueError("Weights must not be negative")
+    if abs(sum(weights.values()) - 1.0) > 1e-6:
+        raise ValueError("Weights must sum to 1")
+    return {skill: float(weights[skill]) for skill in SKILLS}
+
 
 class AssessmentEngine:
     """
     Calculates scores and generates feedback for student performance
     """
 
-    def __init__(self, scenario: Dict[str, Any], session_data: Dict[str, Any]):
+    def __init__(
+        self,
+        scenario: Dict[str, Any],
+        session_data: Dict[str, Any],
+        weights: Optional[Dict[str, float]] = None
+    ):
         """
         Initialize assessment engine
 
         Args:
             scenario: Scenario data with rubric
             session_data: Session data with student performance
+            weights: Overall-score weight per skill (defaults to
+                settings.ASSESSMENT_SCORE_WEIGHTS)
         """
         self.scenario = scenario
         self.session_data = session_data
         self.rubric = scenario.get("assessment_rubric", {})
+        self.weights = weights or settings.ASSESSMENT_SCORE_WEIGHTS
 
     def calculate_assessment(self) -> Dict[str, Any]:
         """
@@ -39,37 +68,20 @@ class AssessmentEngine:
 
         # Calculate overall score (weighted average)
         overall_score = int(
-            history_score * 0.30 +
-            reasoning_score * 0.25 +
-            management_score * 0.20 +
-            communication_score * 0.15 +
-            efficiency_score * 0.10
-        )
-
-        # Generate feedback
-        feedback_summary = self._generate_feedback_summary(
-            history_score,
-            reasoning_score,
-            management_score,
-            communication_score,
-            efficiency_score
+            history_score * self.weights["history_taking"] +
+            reasoning_score * self.weights["clinical_reasoning"] +
+            management_score * self.weights["management"] +
+            communication_score * self.weights["communication"] +
+            efficiency_score * self.weights["efficiency"]
         )
 
-        strengths = self._identify_strengths({
-            "history_taking": history_score,
-            "clinical_reasoning": reasoning_score,
-            "management": management_score,
-            "communication": communication_score,
-            "efficiency": efficiency_score
-        })
-
-        areas_for_improvement = self._identify_areas_for_improvement({
+        scores = {
             "history_taking": history_score,
             "clinical_reasoning": reasoning_score,
             "management": management_score,
             "communication": communication_score,
             "efficiency": efficiency_score
-        })
+        }
 
         return {
             "overall_score": overall_score,
@@ -78,32 +90,48 @@ class AssessmentEngine:
             "management_score": management_score,
             "communication_score": communication_score,
             "efficiency_score": efficiency_score,
+            "metrics": self.session_data,
+            **self.build_feedback(scores)
+        }
+
+    def build_feedback(self, scores: Dict[str, int]) -> Dict[str, Any]:
+        """
+        Build the skills breakdown and feedback text for a set of skill scores
+
+        Args:
+            scores: Score per skill
+
+        Returns:
+            skills_breakdown, feedback_summary, strengths and areas_for_improvement
+        """
+        return {
             "skills_breakdown": {
                 "history_taking": {
-                    "score": history_score,
+                    "score": scores["history_taking"],
                     "details": self._get_history_taking_details()
                 },
                 "clinical_reasoning": {
-                    "score": reasoning_score,
+                    "score": scores["clinical_reasoning"],
                     "details": self._get_clinical_reasoning_details()
                 },
                 "management": {
-                    "score": management_score,
+                    "score": scores["management"],
                     "details": self._get_management_details()
                 },
                 "communication": {
-                    "score": communication_score,
+                    "score": scores["communication"],
                     "details": self._get_communication_details()
                 },
                 "efficiency": {
-                    "score": efficiency_score,
+                    "score": scores["efficiency"],
                     "details": self._get_efficiency_details()
                 }
             },
-            "metrics": self.session_data,
-            "feedback_summary": feedback_summary,
-            "strengths": strengths,
-            "areas_for_improvement": areas_for_improvement
+            "feedback_summary": self._generate_feedback_summary(
+                *(scores[skill] for skill in SKILLS)
+            ),
+            "strengths": self._identify_strengths(scores),
+            "areas_for_improvement": self._identify_areas_for_improvement(scores)
         }
 
     def _calculate_history_taking_score(self) -> int:
@@ -0,0 +1,338 @@
+"""Vectorised assessment scoring for re-scoring historical assessments in bulk"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select, update
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.assessment import Assessment
+from app.models.scenario import Scenario
+from app.models.session import Session as SessionModel
+from app.services.assessment_engine import SKILLS, AssessmentEngine, validate_score_weights
+from app.services.job_queue import JobContext, job_queue
+from app.services.leaderboard import leaderboard_service
+from app.services.skill_progress import skill_progress_service
+
+logger = logging.getLogger(__name__)
+
+ASSESSMENT_RESCORE_JOB = "assessment_rescore"
+
+SCORE_COLUMNS = {skill: f"{skill}_score" for skill in SKILLS}
+
+
+class RubricRules:
+    """Rubric fields the scores depend on, pre-converted for repeated use"""
+
+    __slots__ = ("rubric", "must_ask", "red_flags", "time_limit")
+
+    def __init__(self, rubric: Optional[Mapping[str, Any]]):
+        self.rubric = rubric = rubric or {}
+        self.must_ask = frozenset(rubric.get("must_ask", []))
+        self.red_flags = frozenset(rubric.get("red_flags", []))
+        self.time_limit = rubric.get("time_limit", 15)
+
+
+class ScoringBatch:
+    """
+    Columnar scoring inputs for many assessments.
+
+    Each row holds the numbers ``AssessmentEngine`` derives from one session's
+    metrics and its scenario rubric. Topic and red-flag coverage are reduced
+    to counts while loading, so scoring only touches flat arrays.
+    """
+
+    FIELDS = (
+        "questions_asked",
+        "relevant_questions",
+        "relevance_percentage",
+        "duration",
+        "diagnosis_correct",
+        "must_ask_total",
+        "must_ask_covered",
+        "red_flags_total",
+        "red_flags_caught",
+        "time_limit",
+    )
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns["duration"])
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[Mapping[str, Any], RubricRules]]) -> "ScoringBatch":
+        """
+        Build a batch from (session metrics, rubric rules) pairs.
+
+        Metrics use the keys and defaults of ``AssessmentEngine`` session data.
+        """
+        values: Dict[str, List[float]] = {field: [] for field in cls.FIELDS}
+        for metrics, rules in rows:
+            metrics = metrics or {}
+            values["questions_asked"].append(metrics.get("questions_asked", 0) or 0)
+            values["relevant_questions"].append(metrics.get("relevant_questions", 0) or 0)
+            relevance = metrics.get("relevance_percentage", 50)
+            values["relevance_percentage"].append(50 if relevance is None else relevance)
+            values["duration"].append(metrics.get("duration", 0) or 0)
+            values["diagnosis_correct"].append(bool(metrics.get("diagnosis_correct", False)))
+            values["must_ask_total"].append(len(rules.must_ask))
+            values["must_ask_covered"].append(
+                len(rules.must_ask.intersection(metrics.get("topics_covered", [])))
+            )
+            values["red_flags_total"].append(len(rules.red_flags))
+            values["red_flags_caught"].append(
+                len(rules.red_flags.intersection(metrics.get("red_flags_caught", [])))
+            )
+            values["time_limit"].append(rules.time_limit)
+
+        columns = {field: np.asarray(values[field], dtype=np.float64) for field in cls.FIELDS}
+        columns["diagnosis_correct"] = columns["diagnosis_correct"].astype(bool)
+        return cls(columns)
+
+
+def _clip(scores: np.ndarray) -> np.ndarray:
+    return np.clip(scores, 0, 100)
+
+
+def score_batch(
+    batch: ScoringBatch, weights: Optional[Dict[str, float]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Compute the five skill scores and the overall score for a whole batch.
+
+    Mirrors ``AssessmentEngine``'s per-session rules branch for branch
+    (``np.where`` in place of ``if``, ``np.trunc`` in place of ``int()``), so
+    results are identical to scoring each session on its own.
+
+    Args:
+        batch: Scoring inputs
+        weights: Overall-score weight per skill (defaults to
+            settings.ASSESSMENT_SCORE_WEIGHTS)
+
+    Returns:
+        Skill name -> int64 score array, plus ``overall``
+    """
+    weights = weights or settings.ASSESSMENT_SCORE_WEIGHTS
+    c = batch.columns
+    questions = c["questions_asked"]
+    correct = c["diagnosis_correct"]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # History taking: must-ask coverage and question relevance
+        coverage = c["must_ask_covered"] / c["must_ask_total"] * 100
+        history = np.where(
+            c["must_ask_total"] == 0,
+            75,
+            _clip(np.trunc(coverage * 0.7 + c["relevance_percentage"] * 0.3)),
+        )
+
+        # Clinical reasoning: red flags caught and diagnosis
+        red_flag_score = np.where(
+            c["red_flags_total"] == 0, 75, c["red_flags_caught"] / c["red_flags_total"] * 100
+        )
+        diagnosis_score = np.where(correct, 100, 30)
+        reasoning = _clip(np.trunc(red_flag_score * 0.4 + diagnosis_score * 0.6))
+
+        # Management follows the diagnosis
+        management = np.where(correct, 80, 50).astype(np.float64)
+
+        # Communication: share of relevant questions, penalising too few or too many
+        communication = np.trunc(c["relevant_questions"] / questions * 100)
+        communication = communication - np.where(questions < 5, 20, np.where(questions > 30, 10, 0))
+        communication = np.where(questions == 0, 50, _clip(communication))
+
+        # Efficiency: duration against the rubric time limit, then question count
+        time_limit = c["time_limit"] * 60
+        duration = c["duration"]
+        over_percentage = (duration - time_limit) / time_limit * 100
+        efficiency = np.select(
+            [
+                (time_limit * 0.5 <= duration) & (duration <= time_limit * 0.9),
+                duration < time_limit * 0.5,
+                duration <= time_limit,
+            ],
+            [100, 70, 85],
+            default=np.maximum(50, 100 - np.trunc(over_percentage)),
+        )
+        efficiency = efficiency - np.where(
+            questions > 0, np.where(questions < 8, 10, np.where(questions > 25, 15, 0)), 0
+        )
+        efficiency = np.where(duration == 0, 70, _clip(efficiency))
+
+    scores = {
+        "history_taking": history,
+        "clinical_reasoning": reasoning,
+        "management": management,
+        "communication": communication,
+        "efficiency": efficiency,
+    }
+    # Same left-to-right float sum as the per-session engine, then truncate
+    overall = np.zeros(len(batch))
+    for skill in SKILLS:
+        overall = overall + scores[skill] * weights[skill]
+    scores["overall"] = np.trunc(overall)
+
+    return {name: values.astype(np.int64) for name, values in scores.items()}
+
+
+class AssessmentRescoringService:
+    """
+    Re-scores stored assessments with the current rubrics and given weights.
+
+    Assessments are read in keyset pages of ``batch_size`` (metrics plus the
+    scenario rubric), scored with ``score_batch`` and only the rows whose
+    scores changed are written back, one executemany UPDATE per page. Rows
+    whose skill scores moved also get their breakdown and feedback rebuilt
+    through ``AssessmentEngine.build_feedback``. The leaderboard and skill
+    progress, both sums of scores, are then rebuilt set-based.
+    """
+
+    def rescore(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        scenario_pk: Optional[int] = None,
+        batch_size: int = 5000,
+        dry_run: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Re-score all assessments, or those of one scenario.
+
+        Args:
+            weights: Overall-score weight per skill (defaults to
+                settings.ASSESSMENT_SCORE_WEIGHTS)
+            scenario_pk: Only re-score assessments of this scenario
+            batch_size: Assessments per page
+            dry_run: Count changes without writing them
+
+        Returns:
+            Counts of scored and changed assessments and the throughput
+        """
+        weights = validate_score_weights(weights or settings.ASSESSMENT_SCORE_WEIGHTS)
+        started = time.perf_counter()
+        rubrics: Dict[int, RubricRules] = {}
+        scored = changed = 0
+        last_id = 0
+
+        db = SessionLocal()
+        try:
+            while True:
+                query = (
+                    select(
+                        Assessment.id,
+                        Assessment.metrics,
+                        Assessment.overall_score,
+                        *(getattr(Assessment, column) for column in SCORE_COLUMNS.values()),
+                        SessionModel.scenario_id,
+                    )
+                    .join(SessionModel, SessionModel.session_id == Assessment.session_id)
+                    .where(Assessment.id > last_id)
+                    .order_by(Assessment.id)
+                    .limit(batch_size)
+                )
+                if scenario_pk is not None:
+                    query = query.where(SessionModel.scenario_id == scenario_pk)
+                rows = db.execute(query).all()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+
+                self._load_rubrics(db, rubrics, {row.scenario_id for row in rows})
+                rules = [rubrics[row.scenario_id] for row in rows]
+                batch = ScoringBatch.from_rows(zip((row.metrics for row in rows), rules))
+                updates = self._changed_rows(rows, rules, score_batch(batch, weights))
+
+                scored += len(rows)
+                changed += len(updates)
+                if updates and not dry_run:
+                    db.execute(update(Assessment), updates)
+                    db.commit()
+
+            # Leaderboard totals and skill progress are sums of the scores
+            if changed and not dry_run:
+                leaderboard_service.rebuild(db)
+                skill_progress_service.rebuild(db)
+                db.commit()
+        finally:
+            db.close()
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Re-scored {scored} assessments in {elapsed:.2f}s: {changed} changed "
+            f"(dry_run={dry_run})"
+        )
+        return {
+            "scored": scored,
+            "changed": changed,
+            "dry_run": dry_run,
+            "weights": weights,
+            "elapsed_seconds": round(elapsed, 3),
+            "assessments_per_second": round(scored / elapsed) if elapsed else None,
+        }
+
+    @staticmethod
+    def _load_rubrics(db, rubrics: Dict[int, RubricRules], scenario_pks: set):
+        missing = scenario_pks - rubrics.keys()
+        if not missing:
+            return
+        for scenario_pk, rubric in db.execute(
+            select(Scenario.id, Scenario.assessment_rubric).where(Scenario.id.in_(missing))
+        ):
+            rubrics[scenario_pk] = RubricRules(rubric)
+        for scenario_pk in missing - rubrics.keys():
+            rubrics[scenario_pk] = RubricRules(None)
+
+    @staticmethod
+    def _changed_rows(
+        rows: Sequence[Any], rules: Sequence[RubricRules], scores: Dict[str, np.ndarray]
+    ) -> List[Dict[str, Any]]:
+        """UPDATE parameters for the rows whose stored scores differ from ``scores``"""
+        stored = {
+            name: np.array([-1 if value is None else value for value in values])
+            for name, values in [
+                ("overall", [row.overall_score for row in rows]),
+                *(
+                    (skill, [getattr(row, column) for row in rows])
+                    for skill, column in SCORE_COLUMNS.items()
+                ),
+            ]
+        }
+        skills_changed = np.zeros(len(rows), dtype=bool)
+        for skill in SKILLS:
+            skills_changed |= stored[skill] != scores[skill]
+        overall_changed = stored["overall"] != scores["overall"]
+
+        updates = []
+        for i in np.flatnonzero(skills_changed | overall_changed):
+            row = rows[i]
+            values: Dict[str, Any] = {"id": row.id, "overall_score": int(scores["overall"][i])}
+            if skills_changed[i]:
+                skill_scores = {skill: int(scores[skill][i]) for skill in SKILLS}
+                for skill, score in skill_scores.items():
+                    values[SCORE_COLUMNS[skill]] = score
+                engine = AssessmentEngine({"assessment_rubric": rules[i].rubric}, row.metrics or {})
+                values.update(engine.build_feedback(skill_scores))
+            updates.append(values)
+        return updates
+
+
+@job_queue.handler(ASSESSMENT_RESCORE_JOB, queue="default")
+async def run_assessment_rescore_job(ctx: JobContext) -> Dict[str, Any]:
+    """Job handler: payload holds the ``AssessmentRescoringService.rescore`` options"""
+    params = ctx.payload
+    return await asyncio.to_thread(
+        assessment_rescoring_service.rescore,
+        weights=params.get("weights"),
+        scenario_pk=params.get("scenario_pk"),
+        batch_size=params.get("batch_size", 5000),
+        dry_run=params.get("dry_run", False),
+    )
+
+
+# Create singleton instance
+assessment_rescoring_service = AssessmentRescoringService()
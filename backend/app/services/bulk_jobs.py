@@ -0,0 +1,184 @@
+"""Progress tracking for long-running admin bulk jobs run on the job queue"""
+
+import asyncio
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.models.job import Job, JobStatus
+from app.services.job_queue import JobContext
+
+
+class BulkJob:
+    """
+    Progress record for a single bulk job (enrichment, import, ...).
+
+    Counters are updated by the job coroutine as it works; ``checkpoint`` holds
+    the last position that was durably written so an interrupted job can be
+    resumed from there.
+    """
+
+    MAX_ITEM_RESULTS = 1000
+
+    def __init__(self, kind: str, params: Dict[str, Any], job_id: Optional[str] = None):
+        self.job_id = job_id or f"{kind}_{uuid.uuid4().hex[:12]}"
+        self.kind = kind
+        self.params = params
+        self.status = "pending"  # pending, running, completed, failed
+        self.dry_run = bool(params.get("dry_run", False))
+
+        self.total: Optional[int] = None
+        self.processed = 0
+        self.succeeded = 0
+        self.skipped = 0
+        self.failed = 0
+
+        self.checkpoint: Optional[Any] = None
+        self.items: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+
+        self.created_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    def record_item(self, item_id: Any, status: str, **details: Any):
+        """Record the outcome for a single item (bounded to MAX_ITEM_RESULTS)"""
+        self.processed += 1
+        if status == "failed":
+            self.failed += 1
+        elif status == "skipped":
+            self.skipped += 1
+        else:
+            self.succeeded += 1
+
+        if len(self.items) < self.MAX_ITEM_RESULTS:
+            self.items.append({"id": item_id, "status": status, **details})
+
+    def to_dict(self, include_items: bool = True) -> Dict[str, Any]:
+        """Serialise job progress for API responses"""
+        data = {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "dry_run": self.dry_run,
+            "params": self.params,
+            "total": self.total,
+            "processed": self.processed,
+            "succeeded": self.succeeded,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "checkpoint": self.checkpoint,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+        if include_items:
+            data["items"] = self.items
+        return data
+
+
+class BulkJobRegistry:
+    """
+    Keeps the progress of recent bulk jobs in memory.
+
+    Bulk jobs run as ``jobs`` table entries on the job queue; while one runs
+    in this process its live ``BulkJob`` is kept here, and the job queue
+    saves ``to_dict()`` snapshots as the job's progress and result so status
+    survives restarts. Only the most recent ``max_jobs`` jobs are retained.
+    """
+
+    def __init__(self, max_jobs: int = 50):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, BulkJob]" = OrderedDict()
+
+    def create(self, kind: str, params: Dict[str, Any], job_id: Optional[str] = None) -> BulkJob:
+        """Create and register a new job"""
+        job = BulkJob(kind, params, job_id=job_id)
+        self._jobs.pop(job.job_id, None)
+        self._jobs[job.job_id] = job
+
+        while len(self._jobs) > self.max_jobs:
+            old_id, old_job = next(iter(self._jobs.items()))
+            if old_job.status in ("pending", "running"):
+                break
+            self._jobs.pop(old_id)
+
+        return job
+
+    def get(self, job_id: str) -> Optional[BulkJob]:
+        """Get a job by ID"""
+        return self._jobs.get(job_id)
+
+    def list(self, kind: Optional[str] = None) -> List[BulkJob]:
+        """List retained jobs, most recent first"""
+        jobs = reversed(self._jobs.values())
+        return [j for j in jobs if kind is None or j.kind == kind]
+
+    async def run(
+        self, ctx: JobContext, runner: Callable[[BulkJob], Awaitable[None]]
+    ) -> Dict[str, Any]:
+        """
+        Run one attempt of a queued bulk job, tracking its progress.
+
+        Args:
+            ctx: Job queue context (its payload becomes the job params)
+            runner: Coroutine function doing the work on the ``BulkJob``
+
+        Returns:
+            Final job state, stored as the queued job's result
+        """
+        job = self.create(ctx.kind, ctx.payload, job_id=ctx.job_id)
+        ctx.report(lambda: job.to_dict(include_items=False))
+
+        job.status = "running"
+        job.started_at = datetime.utcnow()
+        try:
+            await runner(job)
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "failed"
+            job.error = "Cancelled"
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            raise
+        finally:
+            job.finished_at = datetime.utcnow()
+        return job.to_dict()
+
+    def describe(self, queued: Job, include_items: bool = True) -> Dict[str, Any]:
+        """
+        Progress of a queued bulk job for API responses.
+
+        Live progress is used while the job runs in this process; otherwise
+        the last snapshot saved by the job queue. ``status`` is the queue
+        status (pending, running, succeeded, failed).
+        """
+        live = self.get(queued.job_id)
+        if live is not None and queued.status == JobStatus.RUNNING.value:
+            data = live.to_dict(include_items=include_items)
+        else:
+            data = dict(queued.result or queued.progress or {})
+            if not include_items:
+                data.pop("items", None)
+
+        data.update(
+            {
+                "job_id": queued.job_id,
+                "kind": queued.kind,
+                "status": queued.status,
+                "attempts": queued.attempts,
+                "max_attempts": queued.max_attempts,
+                "params": queued.payload,
+                "error": queued.error or data.get("error"),
+                "created_at": queued.created_at.isoformat() if queued.created_at else None,
+            }
+        )
+        return data
+
+
+# Create singleton instance
+bulk_job_registry = BulkJobRegistry()
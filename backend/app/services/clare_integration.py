@@ -22,12 +22,15 @@ class ClareIntegrationService:
         self.api_key = settings.CLARE_API_KEY
         self.headers = {"X-API-Key": self.api_key, "Content-Type": "application/json"}
 
-    async def search_guidelines(self, query: str) -> Optional[Dict[str, Any]]:
+    async def search_guidelines(
+        self, query: str, client: Optional[httpx.AsyncClient] = None
+    ) -> Optional[Dict[str, Any]]:
         """
         Search Clare for guidelines related to a clinical query.
 
         Args:
             query: Clinical condition, diagnosis, or question
+            client: Optional shared HTTP client (bulk callers reuse one connection pool)
 
         Returns:
             Clare response with answer and sources, or None on error
@@ -37,15 +40,22 @@ class ClareIntegrationService:
             return None
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            if client is not None:
                 response = await client.post(
                     f"{self.api_url}/search",
                     headers=self.headers,
                     json={"query": query},
                 )
+            else:
+                async with httpx.AsyncClient(timeout=30.0) as own_client:
+                    response = await own_client.post(
+                        f"{self.api_url}/search",
+                        headers=self.headers,
+                        json={"query": query},
+                    )
 
-                response.raise_for_status()
-                return response.json()
+            response.raise_for_status()
+            return response.json()
 
         except httpx.TimeoutException:
             logger.error(f"Timeout searching Clare for: {query}")
@@ -94,8 +104,18 @@ class ClareIntegrationService:
         if not result:
             return []
 
-        sources = result.get("sources", [])
+        return self.format_guidelines(result.get("sources", []))
+
+    def format_guidelines(self, sources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Format Clare sources as Coach AI guideline entries.
 
+        Args:
+            sources: Raw ``sources`` list from a Clare search response
+
+        Returns:
+            Deduplicated list of guidelines with metadata
+        """
         # Format guidelines for Coach AI frontend
         # Deduplicate by guideline title (same guideline may appear multiple times for different chapters)
         seen_titles = set()
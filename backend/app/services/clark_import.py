@@ -0,0 +1,312 @@
+"""Bulk import of Clark consultations as draft scenarios"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import httpx
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.core.database import SessionLocal
+from app.models.scenario import DifficultyLevel, Scenario, ScenarioStatus
+from app.services.bulk_jobs import BulkJob, bulk_job_registry
+from app.services.clark_integration import ClarkIntegrationService, clark_service
+from app.services.dialogue_graph import compile_dialogue_tree
+from app.services.job_queue import JobContext, PermanentJobError, job_queue
+
+logger = logging.getLogger(__name__)
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def build_scenario_row(
+    scenario_data: Dict[str, Any],
+    created_by: Optional[str] = None,
+    difficulty: Optional[DifficultyLevel] = None,
+) -> Dict[str, Any]:
+    """
+    Build column values for a draft scenario from converted consultation data.
+
+    Args:
+        scenario_data: Output of ``ClarkIntegrationService.convert_to_scenario``
+        created_by: Creator user ID
+        difficulty: Optional difficulty override
+
+    Returns:
+        Dict of ``Scenario`` column values
+    """
+    now = datetime.utcnow()
+    dialogue_tree = scenario_data.get("dialogue_tree", {})
+    return {
+        "scenario_id": f"scenario_{uuid.uuid4().hex[:12]}",
+        "title": scenario_data.get("title", "Imported Scenario"),
+        "description": scenario_data.get(
+            "description", "Scenario imported from Clark consultation"
+        ),
+        "specialty": scenario_data.get("specialty", "General Practice"),
+        "difficulty": DifficultyLevel(
+            difficulty or scenario_data.get("difficulty", "intermediate")
+        ),
+        "status": ScenarioStatus.DRAFT,
+        "patient_profile": scenario_data.get("patient_profile", {}),
+        "dialogue_tree": dialogue_tree,
+        "compiled_dialogue": compile_dialogue_tree(dialogue_tree, strict=False),
+        "learning_objectives": scenario_data.get("learning_objectives", []),
+        "correct_diagnosis": scenario_data.get("correct_diagnosis", ""),
+        "differential_diagnoses": scenario_data.get("differential_diagnoses", []),
+        "assessment_rubric": scenario_data.get("assessment_rubric", {}),
+        "clare_guidelines": scenario_data.get("clare_guideline_ids", []),
+        "clare_guideline_urls": [],
+        "source_clark_consultation_id": scenario_data.get("source_clark_consultation_id"),
+        "created_by": created_by,
+        "created_at": now,
+        "updated_at": now,
+        "times_played": 0,
+    }
+
+
+class ClarkBulkImportService:
+    """
+    Imports many Clark consultations as draft scenarios in one job.
+
+    Listing pages are fetched concurrently, consultations whose listing entry
+    lacks structured data are fetched individually behind a semaphore, and
+    conversion runs in the default executor so the event loop stays free.
+    Drafts are inserted with one multi-row INSERT per batch; if a batch fails
+    it is retried row by row so failures are reported per consultation.
+    Consultations already imported (matched on ``source_clark_consultation_id``)
+    are skipped: known ones before their details are fetched, and ones another
+    import wrote meanwhile by ``ON CONFLICT DO NOTHING`` against the unique
+    index on that column. Database work runs in a thread so it never blocks
+    the event loop.
+    """
+
+    # Maximum number of values per IN (...) lookup
+    LOOKUP_CHUNK_SIZE = 500
+
+    def __init__(self, clark: ClarkIntegrationService = clark_service):
+        self.clark = clark
+
+    async def run(
+        self,
+        job: BulkJob,
+        max_consultations: int = 500,
+        concurrency: int = 4,
+        batch_size: int = 50,
+        difficulty: Optional[DifficultyLevel] = None,
+        created_by: Optional[str] = None,
+        dry_run: bool = False,
+    ):
+        """
+        Run a bulk import, recording per-consultation progress on ``job``.
+
+        Args:
+            job: Bulk job used for progress reporting
+            max_consultations: Upper bound on consultations to consider
+            concurrency: Parallel Clark requests (listing pages and detail fetches)
+            batch_size: Drafts per INSERT batch
+            difficulty: Optional difficulty override for all drafts
+            created_by: Creator user ID recorded on the drafts
+            dry_run: Convert and report without inserting
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(timeout=30.0, limits=limits) as client:
+            listing = await self.clark.fetch_all_consultations(
+                max_consultations=max_consultations, concurrency=concurrency, client=client
+            )
+            if not listing.get("success"):
+                if not listing.get("consultations"):
+                    raise RuntimeError(f"Failed to list consultations: {listing.get('error')}")
+                logger.warning(
+                    f"Clark listing stopped early ({listing.get('error')}); "
+                    f"importing {len(listing['consultations'])} consultations fetched so far"
+                )
+
+            pending = self._dedupe_listing(job, listing.get("consultations", []))
+            job.total = len(pending)
+
+            already_imported = await asyncio.to_thread(
+                self._existing_source_ids, [c_id for c_id, _ in pending]
+            )
+            todo = []
+            for consultation_id, consultation in pending:
+                if consultation_id in already_imported:
+                    job.record_item(consultation_id, "skipped", reason="Already imported")
+                else:
+                    todo.append((consultation_id, consultation))
+
+            async def prepare(consultation_id: str, consultation: Dict[str, Any]):
+                try:
+                    if not consultation.get("structured_data"):
+                        async with semaphore:
+                            result = await self.clark.get_consultation(
+                                consultation_id, client=client
+                            )
+                        if not result.get("success") or not result.get("consultation"):
+                            job.record_item(
+                                consultation_id, "failed", error=result.get("error", "Not found")
+                            )
+                            return None
+                        consultation = result["consultation"]
+
+                    scenario_data = await loop.run_in_executor(
+                        None, self.clark.convert_to_scenario, consultation
+                    )
+                    scenario_data["source_clark_consultation_id"] = consultation_id
+                    return build_scenario_row(scenario_data, created_by, difficulty)
+                except Exception as e:
+                    job.record_item(consultation_id, "failed", error=str(e))
+                    return None
+
+            for start in range(0, len(todo), batch_size):
+                chunk = todo[start : start + batch_size]
+                rows = [
+                    row for row in await asyncio.gather(*(prepare(*item) for item in chunk)) if row
+                ]
+
+                if dry_run:
+                    for row in rows:
+                        job.record_item(
+                            row["source_clark_consultation_id"],
+                            "would_import",
+                            title=row["title"],
+                            specialty=row["specialty"],
+                        )
+                elif rows:
+                    await asyncio.to_thread(self._insert_batch, job, rows)
+
+                job.checkpoint = chunk[-1][0]
+
+        logger.info(
+            f"Clark bulk import {job.job_id} finished: {job.succeeded} imported, "
+            f"{job.skipped} skipped, {job.failed} failed (dry_run={dry_run})"
+        )
+
+    def _dedupe_listing(
+        self, job: BulkJob, consultations: List[Dict[str, Any]]
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """Key listing entries by consultation ID, dropping duplicates and unkeyed entries"""
+        seen: Dict[str, Dict[str, Any]] = {}
+        for consultation in consultations:
+            consultation_id = self.clark.get_consultation_id(consultation)
+            if not consultation_id:
+                job.record_item(None, "failed", error="Consultation has no ID")
+                continue
+            seen.setdefault(consultation_id, consultation)
+        return list(seen.items())
+
+    def _existing_source_ids(self, consultation_ids: Iterable[str]) -> Set[str]:
+        """Return the consultation IDs that already have a scenario"""
+        ids = list(consultation_ids)
+        existing: Set[str] = set()
+        if not ids:
+            return existing
+
+        db = SessionLocal()
+        try:
+            for start in range(0, len(ids), self.LOOKUP_CHUNK_SIZE):
+                chunk = ids[start : start + self.LOOKUP_CHUNK_SIZE]
+                rows = (
+                    db.query(Scenario.source_clark_consultation_id)
+                    .filter(Scenario.source_clark_consultation_id.in_(chunk))
+                    .all()
+                )
+                existing.update(r[0] for r in rows)
+        finally:
+            db.close()
+
+        return existing
+
+    def _insert_batch(self, job: BulkJob, rows: List[Dict[str, Any]]):
+        """Insert a batch of drafts, falling back to per-row inserts on failure"""
+        db = SessionLocal()
+        try:
+            try:
+                inserted = self._insert_new(db, rows)
+                db.commit()
+                self._record_inserted(job, rows, inserted)
+                return
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Batch insert failed ({e}); retrying {len(rows)} rows singly")
+
+            for row in rows:
+                try:
+                    inserted = self._insert_new(db, [row])
+                    db.commit()
+                    self._record_inserted(job, [row], inserted)
+                except Exception as row_error:
+                    db.rollback()
+                    job.record_item(
+                        row["source_clark_consultation_id"], "failed", error=str(row_error)
+                    )
+        finally:
+            db.close()
+
+    @staticmethod
+    def _insert_new(db, rows: List[Dict[str, Any]]) -> Set[str]:
+        """
+        Insert drafts whose consultation has no scenario yet.
+
+        Returns:
+            Consultation IDs of the rows actually inserted
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect not in _INSERTS:
+            raise NotImplementedError(f"Clark import is not supported on {dialect}")
+        stmt = (
+            _INSERTS[dialect](Scenario)
+            .values(rows)
+            .on_conflict_do_nothing()
+            .returning(Scenario.source_clark_consultation_id)
+        )
+        return set(db.execute(stmt).scalars())
+
+    @staticmethod
+    def _record_inserted(job: BulkJob, rows: List[Dict[str, Any]], inserted: Set[str]):
+        for row in rows:
+            consultation_id = row["source_clark_consultation_id"]
+            if consultation_id in inserted:
+                job.record_item(consultation_id, "imported", scenario_id=row["scenario_id"])
+            else:
+                # Imported by a concurrent run or a single import since the check
+                job.record_item(consultation_id, "skipped", reason="Already imported")
+
+
+# Create singleton instance
+clark_bulk_import_service = ClarkBulkImportService()
+
+
+CLARK_IMPORT_JOB = "clark_import"
+
+
+@job_queue.handler(CLARK_IMPORT_JOB, queue="imports")
+async def run_clark_import_job(ctx: JobContext) -> Dict[str, Any]:
+    """
+    Job handler: payload holds the ``ClarkBulkImportService.run`` options.
+
+    Retries are safe because consultations that already have a scenario are
+    skipped.
+    """
+    if not clark_service.is_authenticated():
+        # The Clark login lives in process memory and does not survive restarts
+        raise PermanentJobError("Not logged in to Clark")
+
+    params = ctx.payload
+    return await bulk_job_registry.run(
+        ctx,
+        lambda job: clark_bulk_import_service.run(
+            job,
+            max_consultations=params.get("max_consultations", 500),
+            concurrency=params.get("concurrency", 4),
+            batch_size=params.get("batch_size", 50),
+            difficulty=DifficultyLevel(params["difficulty"]) if params.get("difficulty") else None,
+            created_by=params.get("created_by"),
+            dry_run=params.get("dry_run", False),
+        ),
+    )
@@ -1,8 +1,9 @@
 """Clark integration for importing anonymized consultations"""
 
+import asyncio
 import logging
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import httpx
 
@@ -24,6 +25,9 @@ class ClarkIntegrationService:
     3. Token expires after 24 hours, requiring re-authentication
     """
 
+    # Clark caps page size for the anonymized listing
+    MAX_PAGE_SIZE = 50
+
     def __init__(self):
         self.api_url = settings.CLARK_API_URL.rstrip("/")
         self._token: Optional[str] = None
@@ -118,7 +122,11 @@ class ClarkIntegrationService:
         logger.info("Logged out from Clark API")
 
     async def fetch_consultations(
-        self, specialty: Optional[str] = None, limit: int = 10, offset: int = 0
+        self,
+        specialty: Optional[str] = None,
+        limit: int = 10,
+        offset: int = 0,
+        client: Optional[httpx.AsyncClient] = None,
     ) -> Dict[str, Any]:
         """
         Fetch anonymized consultations from Clark.
@@ -127,6 +135,7 @@ class ClarkIntegrationService:
             specialty: Filter by specialty (not yet implemented in Clark API)
             limit: Maximum number of consultations to fetch (max 50)
             offset: Number of consultations to skip for pagination
+            client: Optional shared HTTP client (bulk callers reuse one connection pool)
 
         Returns:
             Dict with consultations list or error information
@@ -135,34 +144,41 @@ class ClarkIntegrationService:
             return {"success": False, "error": "Not authenticated", "code": "NOT_AUTHENTICATED"}
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                params = {
-                    "limit": min(limit, 50),
-                    "offset": offset,
-                    "status": "all",  # Get all statuses, filter in UI if needed
-                }
+            params = {
+                "limit": min(limit, self.MAX_PAGE_SIZE),
+                "offset": offset,
+                "status": "all",  # Get all statuses, filter in UI if needed
+            }
 
+            if client is not None:
                 response = await client.get(
                     f"{self.api_url}/api/v1/consultations/anonymized",
                     headers=self._get_auth_headers(),
                     params=params,
                 )
-
-                if response.status_code == 401:
-                    self._token = None
-                    return {"success": False, "error": "Session expired", "code": "TOKEN_EXPIRED"}
-
-                response.raise_for_status()
-                data = response.json()
-
-                if data.get("success"):
-                    return {
-                        "success": True,
-                        "consultations": data.get("consultations", []),
-                        "count": data.get("count", 0),
-                    }
-                else:
-                    return {"success": False, "error": data.get("error"), "code": data.get("code")}
+            else:
+                async with httpx.AsyncClient(timeout=30.0) as own_client:
+                    response = await own_client.get(
+                        f"{self.api_url}/api/v1/consultations/anonymized",
+                        headers=self._get_auth_headers(),
+                        params=params,
+                    )
+
+            if response.status_code == 401:
+                self._token = None
+                return {"success": False, "error": "Session expired", "code": "TOKEN_EXPIRED"}
+
+            response.raise_for_status()
+            data = response.json()
+
+            if data.get("success"):
+                return {
+                    "success": True,
+                    "consultations": data.get("consultations", []),
+                    "count": data.get("count", 0),
+                }
+            else:
+                return {"success": False, "error": data.get("error"), "code": data.get("code")}
 
         except httpx.HTTPStatusError as e:
             logger.error(f"Clark API HTTP error {e.response.status_code}")
@@ -174,12 +190,68 @@ class ClarkIntegrationService:
             logger.error(f"Error fetching consultations from Clark: {e}")
             return {"success": False, "error": str(e)}
 
-    async def get_consultation(self, consultation_id: str) -> Dict[str, Any]:
+    async def fetch_all_consultations(
+        self,
+        max_consultations: int = 500,
+        concurrency: int = 4,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> Dict[str, Any]:
+        """
+        Page through Clark's consultation listing with bounded parallelism.
+
+        Pages are requested in waves of ``concurrency`` offsets; paging stops at
+        the first short page or once ``max_consultations`` have been collected.
+
+        Args:
+            max_consultations: Upper bound on consultations to collect
+            concurrency: Number of pages requested in parallel
+            client: Optional shared HTTP client
+
+        Returns:
+            Dict with consultations list, or error information if a page failed
+        """
+        page_size = self.MAX_PAGE_SIZE
+        consultations: List[Dict[str, Any]] = []
+        offset = 0
+
+        while offset < max_consultations:
+            offsets = [
+                offset + i * page_size
+                for i in range(concurrency)
+                if offset + i * page_size < max_consultations
+            ]
+            pages = await asyncio.gather(
+                *(
+                    self.fetch_consultations(limit=page_size, offset=o, client=client)
+                    for o in offsets
+                )
+            )
+
+            exhausted = False
+            for page in pages:
+                if not page.get("success"):
+                    return {**page, "consultations": consultations}
+                items = page.get("consultations", [])
+                consultations.extend(items)
+                if len(items) < page_size:
+                    exhausted = True
+                    break
+
+            if exhausted:
+                break
+            offset = offsets[-1] + page_size
+
+        return {"success": True, "consultations": consultations[:max_consultations]}
+
+    async def get_consultation(
+        self, consultation_id: str, client: Optional[httpx.AsyncClient] = None
+    ) -> Dict[str, Any]:
         """
         Get a specific anonymized consultation by ID.
 
         Args:
             consultation_id: Consultation ID
+            client: Optional shared HTTP client
 
         Returns:
             Dict with consultation data or error information
@@ -188,30 +260,31 @@ class ClarkIntegrationService:
             return {"success": False, "error": "Not authenticated", "code": "NOT_AUTHENTICATED"}
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    f"{self.api_url}/api/v1/consultations/{consultation_id}/anonymized",
-                    headers=self._get_auth_headers(),
-                )
-
-                if response.status_code == 401:
-                    self._token = None
-                    return {"success": False, "error": "Session expired", "code": "TOKEN_EXPIRED"}
+            url = f"{self.api_url}/api/v1/consultations/{consultation_id}/anonymized"
+            if client is not None:
+                response = await client.get(url, headers=self._get_auth_headers())
+            else:
+                async with httpx.AsyncClient(timeout=30.0) as own_client:
+                    response = await own_client.get(url, headers=self._get_auth_headers())
+
+            if response.status_code == 401:
+                self._token = None
+                return {"success": False, "error": "Session expired", "code": "TOKEN_EXPIRED"}
+
+            if response.status_code == 404:
+                return {
+                    "success": False,
+                    "error": "Consultation not found",
+                    "code": "NOT_FOUND",
+                }
 
-                if response.status_code == 404:
-                    return {
-                        "success": False,
-                        "error": "Consultation not found",
-                        "code": "NOT_FOUND",
-                    }
+            response.raise_for_status()
+            data = response.json()
 
-                response.raise_for_status()
-                data = response.json()
-
-                if data.get("success"):
-                    return {"success": True, "consultation": data.get("consultation")}
-                else:
-                    return {"success": False, "error": data.get("error"), "code": data.get("code")}
+            if data.get("success"):
+                return {"success": True, "consultation": data.get("consultation")}
+            else:
+                return {"success": False, "error": data.get("error"), "code": data.get("code")}
 
         except httpx.HTTPStatusError as e:
             logger.error(f"Clark API HTTP error {e.response.status_code}")
@@ -240,6 +313,68 @@ class ClarkIntegrationService:
         except Exception:
             return False
 
+    @staticmethod
+    def get_consultation_id(consultation: Dict[str, Any]) -> Optional[str]:
+        """Get the Clark consultation ID from a listing item or full consultation."""
+        metadata = consultation.get("metadata") or {}
+        consultation_id = (
+            metadata.get("consultation_id")
+            or consultation.get("consultation_id")
+            or consultation.get("id")
+        )
+        return str(consultation_id) if consultation_id is not None else None
+
+    def summarise_consultation(self, consultation: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extract the fields used to index a consultation listing entry locally.
+
+        Args:
+            consultation: Listing entry (or full consultation) from Clark
+
+        Returns:
+            Dict with consultation_id, date, specialty, diagnosis,
+            presenting_complaint and status
+        """
+        metadata = consultation.get("metadata") or {}
+        structured = consultation.get("structured_data") or {}
+
+        diagnosis = (
+            consultation.get("diagnosis")
+            or consultation.get("diagnosis_preview")
+            or structured.get("Diagnosis")
+            or structured.get("diagnosis")
+            or ""
+        )
+        presenting_complaint = (
+            consultation.get("presenting_complaint_preview")
+            or structured.get("Presenting Complaint")
+            or structured.get("presenting_complaint")
+            or consultation.get("summary")
+            or ""
+        )
+
+        date_str = (
+            metadata.get("date") or consultation.get("date") or consultation.get("created_at")
+        )
+        consultation_date = None
+        if date_str:
+            try:
+                consultation_date = datetime.fromisoformat(
+                    str(date_str).replace("Z", "+00:00")
+                ).replace(tzinfo=None)
+            except ValueError:
+                logger.warning(f"Unparseable Clark consultation date: {date_str}")
+
+        return {
+            "consultation_id": self.get_consultation_id(consultation),
+            "date": consultation_date,
+            "specialty": consultation.get("specialty")
+            or self._infer_specialty(diagnosis, presenting_complaint),
+            "diagnosis": diagnosis or None,
+            "presenting_complaint": presenting_complaint or None,
+            "status": metadata.get("status") or consultation.get("status"),
+        }
+
     def convert_to_scenario(self, consultation: Dict[str, Any]) -> Dict[str, Any]:
         """
         Convert an anonymized Clark consultation to a Coach scenario.
@@ -0,0 +1,270 @@
+"""Incremental sync of Clark consultations into the local cache"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.clark import ClarkConsultation, ClarkSyncState
+from app.models.scenario import Scenario
+from app.services.clark_integration import ClarkIntegrationService, clark_service
+
+logger = logging.getLogger(__name__)
+
+Watermark = Tuple[datetime, str]
+
+
+class ClarkSyncService:
+    """
+    Keeps a local, indexed copy of Clark's anonymized consultation listing.
+
+    Clark lists consultations newest first, so a sync pages forward from
+    offset 0 only until it reaches an entry at or below the stored watermark
+    (last consultation date/id). New entries are upserted into
+    ``clark_consultations``; browsing and specialty filtering are then served
+    from that table instead of re-listing Clark.
+
+    The watermark only advances once a sync has reached it (or the end of the
+    feed), so an interrupted sync never skips consultations. A sync that runs
+    out of pages (or fails) saves the offset it got to and the newest entry
+    it saw, and the next sync resumes there instead of at offset 0, so a
+    backlog larger than ``max_pages`` is worked through over several runs.
+    Entries added to the head of the listing meanwhile only shift older ones
+    to later offsets, so resuming re-reads a few entries but skips none.
+    """
+
+    FEED = "anonymized_consultations"
+
+    def __init__(self, clark: ClarkIntegrationService = clark_service):
+        self.clark = clark
+
+    @staticmethod
+    def _key(summary: Dict[str, Any]) -> Watermark:
+        return (summary["date"] or datetime.min, summary["consultation_id"])
+
+    def _get_state(self, db: Session) -> ClarkSyncState:
+        state = db.query(ClarkSyncState).filter(ClarkSyncState.feed == self.FEED).first()
+        if not state:
+            state = ClarkSyncState(feed=self.FEED, consultations_seen=0)
+            db.add(state)
+            db.flush()
+        return state
+
+    def get_status(self, db: Session) -> Dict[str, Any]:
+        """Get the current watermark and cache size"""
+        state = db.query(ClarkSyncState).filter(ClarkSyncState.feed == self.FEED).first()
+        return {
+            "last_consultation_date": (
+                state.last_consultation_date.isoformat()
+                if state and state.last_consultation_date
+                else None
+            ),
+            "last_consultation_id": state.last_consultation_id if state else None,
+            "last_synced_at": (
+                state.last_synced_at.isoformat() if state and state.last_synced_at else None
+            ),
+            "resume_offset": state.resume_offset if state else None,
+            "cached_consultations": db.query(ClarkConsultation.id).count(),
+        }
+
+    @staticmethod
+    def _save_progress(
+        state: ClarkSyncState, offset: Optional[int], newest: Optional[Watermark]
+    ) -> None:
+        """Record where an unfinished sync got to (``None`` clears it)"""
+        state.resume_offset = offset
+        state.pending_consultation_date, state.pending_consultation_id = (
+            _unkey(newest) if newest is not None else (None, None)
+        )
+
+    async def sync(self, max_pages: int = 20, full: bool = False) -> Dict[str, Any]:
+        """
+        Fetch consultations newer than the watermark into the local cache.
+
+        Args:
+            max_pages: Maximum listing pages to request in this sync
+            full: Ignore the watermark and re-list from the start
+
+        Returns:
+            Dict with success flag, counts and the resulting watermark
+        """
+        if not self.clark.is_authenticated():
+            return {"success": False, "error": "Not authenticated", "code": "NOT_AUTHENTICATED"}
+
+        page_size = self.clark.MAX_PAGE_SIZE
+        db = SessionLocal()
+        try:
+            state = self._get_state(db)
+            watermark: Optional[Watermark] = None
+            if not full and state.last_consultation_id:
+                watermark = (
+                    state.last_consultation_date or datetime.min,
+                    state.last_consultation_id,
+                )
+
+            newest = watermark
+            start = 0
+            if not full and state.resume_offset:
+                start = state.resume_offset
+                if state.pending_consultation_id:
+                    pending = (
+                        state.pending_consultation_date or datetime.min,
+                        state.pending_consultation_id,
+                    )
+                    newest = max(newest, pending) if newest else pending
+
+            offset = start
+            fetched = 0
+            new_count = 0
+            complete = False
+            error = None
+
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                for _ in range(max_pages):
+                    result = await self.clark.fetch_consultations(
+                        limit=page_size, offset=offset, client=client
+                    )
+                    if not result.get("success"):
+                        error = result
+                        break
+
+                    items = result.get("consultations", [])
+                    fetched += len(items)
+
+                    reached_watermark = False
+                    batch = []
+                    for consultation in items:
+                        summary = self.clark.summarise_consultation(consultation)
+                        if not summary["consultation_id"]:
+                            continue
+                        key = self._key(summary)
+                        if watermark is not None and key <= watermark:
+                            reached_watermark = True
+                            continue
+                        batch.append((consultation, summary))
+                        if newest is None or key > newest:
+                            newest = key
+
+                    new_count += self._upsert(db, batch)
+                    offset += page_size
+                    self._save_progress(state, offset, newest)
+                    db.commit()
+
+                    if reached_watermark or len(items) < page_size:
+                        complete = True
+                        break
+
+            if complete:
+                if newest is not None:
+                    state.last_consultation_date, state.last_consultation_id = _unkey(newest)
+                self._save_progress(state, None, None)
+            state.last_synced_at = datetime.utcnow()
+            state.consultations_seen = (state.consultations_seen or 0) + new_count
+            db.commit()
+
+            response = {
+                "success": error is None,
+                "complete": complete,
+                "started_at_offset": start,
+                "fetched": fetched,
+                "new": new_count,
+                **self.get_status(db),
+            }
+            if error is not None:
+                response["error"] = error.get("error")
+                response["code"] = error.get("code")
+            return response
+        finally:
+            db.close()
+
+    def _upsert(self, db: Session, batch: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> int:
+        """Insert or refresh cached entries; returns the number of new entries"""
+        if not batch:
+            return 0
+
+        ids = [summary["consultation_id"] for _, summary in batch]
+        existing = {
+            row.consultation_id: row
+            for row in db.query(ClarkConsultation)
+            .filter(ClarkConsultation.consultation_id.in_(ids))
+            .all()
+        }
+
+        new_count = 0
+        for consultation, summary in batch:
+            row = existing.get(summary["consultation_id"])
+            if row is None:
+                row = ClarkConsultation(consultation_id=summary["consultation_id"])
+                db.add(row)
+                existing[summary["consultation_id"]] = row
+                new_count += 1
+
+            row.consultation_date = summary["date"]
+            row.specialty = summary["specialty"]
+            row.diagnosis = summary["diagnosis"]
+            row.presenting_complaint = summary["presenting_complaint"]
+            row.status = summary["status"]
+            row.data = consultation
+
+        return new_count
+
+    def list_cached(
+        self,
+        db: Session,
+        specialty: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """
+        List cached consultations, newest first, optionally filtered by specialty.
+
+        Returns:
+            Dict with consultations (listing payloads annotated with specialty and
+            import status) and the total matching count
+        """
+        query = db.query(ClarkConsultation)
+        if specialty:
+            query = query.filter(ClarkConsultation.specialty == specialty)
+
+        total = query.count()
+        rows = (
+            query.order_by(
+                ClarkConsultation.consultation_date.desc(),
+                ClarkConsultation.consultation_id.desc(),
+            )
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+
+        imported = {}
+        if rows:
+            imported = dict(
+                db.query(Scenario.source_clark_consultation_id, Scenario.scenario_id)
+                .filter(
+                    Scenario.source_clark_consultation_id.in_([r.consultation_id for r in rows])
+                )
+                .all()
+            )
+
+        consultations = []
+        for row in rows:
+            item = dict(row.data or {})
+            item.setdefault("id", row.consultation_id)
+            item["specialty"] = row.specialty
+            item["imported_scenario_id"] = imported.get(row.consultation_id)
+            consultations.append(item)
+
+        return {"consultations": consultations, "count": len(consultations), "total": total}
+
+
+def _unkey(key: Watermark) -> Tuple[Optional[datetime], str]:
+    """Split a watermark key into its stored date and id columns"""
+    return (key[0] if key[0] != datetime.min else None, key[1])
+
+
+# Create singleton instance
+clark_sync_service = ClarkSyncService()
@@ -0,0 +1,189 @@
+"""Streaming export of cohort sessions, transcripts and assessment scores"""
+
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.assessment import Assessment
+from app.models.scenario import Scenario
+from app.models.session import Session as SessionModel
+from app.models.user import User
+from app.services.assessment_engine import SKILLS
+
+logger = logging.getLogger(__name__)
+
+ExportFormat = Literal["csv", "ndjson"]
+
+MEDIA_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+# Rows fetched per round trip from the server-side cursor
+FETCH_SIZE = 1000
+
+# Encoded output is sent in chunks of about this many bytes
+CHUNK_BYTES = 64 * 1024
+
+SKILL_COLUMNS = tuple(f"{skill}_score" for skill in SKILLS)
+
+
+class CohortExportService:
+    """
+    Streams one row per session for a cohort as CSV or NDJSON.
+
+    Rows come from a single joined query read through a server-side cursor
+    (``yield_per``), and are encoded and sent in chunks as they are fetched,
+    so memory stays constant however many sessions match.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal):
+        self.session_factory = session_factory
+
+    def columns(self, include_transcript: bool) -> List[str]:
+        """Field names of an export, in output order"""
+        names = [
+            "session_id",
+            "user_id",
+            "username",
+            "institution",
+            "scenario_id",
+            "scenario_title",
+            "specialty",
+            "status",
+            "started_at",
+            "completed_at",
+            "duration",
+            "diagnosis_submitted",
+            "diagnosis_correct",
+            "overall_score",
+            *SKILL_COLUMNS,
+        ]
+        return names + ["transcript"] if include_transcript else names
+
+    def query(
+        self,
+        institution: Optional[str] = None,
+        started_from: Optional[datetime] = None,
+        started_to: Optional[datetime] = None,
+        scenario_id: Optional[str] = None,
+        include_transcript: bool = False,
+    ):
+        """
+        The export statement, in session order.
+
+        Args:
+            institution: Only sessions of users at this institution
+            started_from: Only sessions started at or after this time
+            started_to: Only sessions started before this time
+            scenario_id: Only sessions of this scenario (its string ID)
+            include_transcript: Also select the session transcripts
+        """
+        columns = [
+            SessionModel.session_id,
+            SessionModel.user_id,
+            User.username,
+            User.institution,
+            Scenario.scenario_id,
+            Scenario.title.label("scenario_title"),
+            Scenario.specialty,
+            SessionModel.status,
+            SessionModel.started_at,
+            SessionModel.completed_at,
+            SessionModel.duration,
+            SessionModel.diagnosis_submitted,
+            SessionModel.diagnosis_correct,
+            Assessment.overall_score,
+            *(getattr(Assessment, name) for name in SKILL_COLUMNS),
+        ]
+        if include_transcript:
+            columns.append(SessionModel.transcript)
+
+        query = (
+            select(*columns)
+            .join(User, User.id == SessionModel.user_id)
+            .join(Scenario, Scenario.id == SessionModel.scenario_id)
+            .outerjoin(Assessment, Assessment.session_id == SessionModel.session_id)
+            .order_by(SessionModel.id)
+        )
+        if institution:
+            query = query.where(User.institution == institution)
+        if started_from:
+            query = query.where(SessionModel.started_at >= started_from)
+        if started_to:
+            query = query.where(SessionModel.started_at < started_to)
+        if scenario_id:
+            query = query.where(Scenario.scenario_id == scenario_id)
+        return query
+
+    def rows(self, db: Session, query) -> Iterator[Dict[str, Any]]:
+        """Rows of ``query`` as JSON-ready dicts, fetched ``FETCH_SIZE`` at a time"""
+        for row in db.execute(query.execution_options(yield_per=FETCH_SIZE)):
+            record = dict(row._mapping)
+            record["status"] = getattr(record["status"], "value", record["status"])
+            for name in ("started_at", "completed_at"):
+                if record[name] is not None:
+                    record[name] = record[name].isoformat()
+            yield record
+
+    def stream(self, export_format: ExportFormat = "csv", **filters: Any) -> Iterator[bytes]:
+        """
+        Encoded export, in chunks of about ``CHUNK_BYTES``.
+
+        Opens its own database session, as the response outlives the request
+        handler.
+
+        Args:
+            export_format: "csv" (with a header row) or "ndjson"
+            filters: Arguments of ``query``
+        """
+        include_transcript = filters.get("include_transcript", False)
+        encode = self._csv_encoder(include_transcript) if export_format == "csv" else _ndjson
+        db = self.session_factory()
+        count = 0
+        try:
+            buffer: List[str] = [encode(None)] if export_format == "csv" else []
+            size = 0
+            for record in self.rows(db, self.query(**filters)):
+                line = encode(record)
+                buffer.append(line)
+                size += len(line)
+                count += 1
+                if size >= CHUNK_BYTES:
+                    yield "".join(buffer).encode()
+                    buffer, size = [], 0
+            if buffer:
+                yield "".join(buffer).encode()
+        finally:
+            db.close()
+            logger.info(f"Cohort export: {count} sessions as {export_format}")
+
+    def _csv_encoder(self, include_transcript: bool):
+        columns = self.columns(include_transcript)
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+
+        def encode(record: Optional[Dict[str, Any]]) -> str:
+            out.seek(0)
+            out.truncate()
+            if record is None:
+                writer.writerow(columns)
+            else:
+                if include_transcript:
+                    record["transcript"] = json.dumps(record["transcript"] or [])
+                writer.writerow([record[name] for name in columns])
+            return out.getvalue()
+
+        return encode
+
+
+def _ndjson(record: Dict[str, Any]) -> str:
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+# Create singleton instance
+cohort_export_service = CohortExportService()
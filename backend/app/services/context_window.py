@@ -0,0 +1,102 @@
+"""Token-budgeted prompt history with a rolling summary of older turns"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.services.conversation_log import ConversationBuffer, ConversationTurn
+
+logger = logging.getLogger(__name__)
+
+Summariser = Callable[[str, List[Dict[str, str]]], Awaitable[str]]
+
+
+class ContextWindow:
+    """
+    Chooses which conversation turns go into the patient prompt.
+
+    The newest turns are included verbatim until ``history_budget`` tokens are
+    used. Turns that fall outside that window (or out of the conversation
+    buffer) are folded into a rolling summary by a background task, so the
+    turn that triggered it never waits on the summariser. The prompt is then
+    summary + recent turns, whose size stays flat however long the
+    consultation runs.
+    """
+
+    __slots__ = (
+        "history_budget",
+        "summariser",
+        "summary",
+        "summarised_seq",
+        "_queue",
+        "_queued_seq",
+        "_task",
+    )
+
+    # Unsummarised turns kept while the summariser is failing
+    MAX_QUEUE = 50
+
+    def __init__(self, history_budget: int, summariser: Optional[Summariser] = None):
+        self.history_budget = history_budget
+        self.summariser = summariser
+        self.summary = ""
+        self.summarised_seq = 0  # Turns with seq below this are in the summary
+        self._queue: List[ConversationTurn] = []
+        self._queued_seq = 0  # Turns with seq below this are summarised or queued
+        self._task: Optional[asyncio.Task] = None
+
+    def select(self, conversation: ConversationBuffer) -> Tuple[str, List[Dict[str, str]]]:
+        """
+        Build the history for the next prompt.
+
+        Args:
+            conversation: The session's conversation buffer
+
+        Returns:
+            Tuple of (summary of older turns, recent messages oldest first)
+        """
+        turns = list(conversation)
+        used = 0
+        cut = len(turns)
+        while cut > 0 and used + turns[cut - 1].tokens <= self.history_budget:
+            cut -= 1
+            used += turns[cut].tokens
+
+        self.retire(turns[:cut])
+        return self.summary, [turn.to_dict() for turn in turns[cut:]]
+
+    def retire(self, turns: Iterable[ConversationTurn]):
+        """Queue turns that left the verbatim window for summarising"""
+        fresh = [turn for turn in turns if turn.seq >= self._queued_seq]
+        if not fresh:
+            return
+        self._queued_seq = fresh[-1].seq + 1
+        self._queue.extend(fresh)
+        if len(self._queue) > self.MAX_QUEUE:
+            dropped = len(self._queue) - self.MAX_QUEUE
+            logger.warning(f"Dropping {dropped} unsummarised turns")
+            del self._queue[:dropped]
+        self._schedule()
+
+    def _schedule(self):
+        if self.summariser is None or (self._task is not None and not self._task.done()):
+            return
+        self._task = asyncio.create_task(self._summarise())
+
+    async def _summarise(self):
+        while self._queue:
+            batch = list(self._queue)
+            try:
+                summary = await self.summariser(self.summary, [t.to_dict() for t in batch])
+            except Exception as e:
+                # Leave the batch queued; the next retired turn retries
+                logger.warning(f"Conversation summary update failed: {e}")
+                return
+            self.summary = summary.strip()
+            self.summarised_seq = batch[-1].seq + 1
+            self._queue = [t for t in self._queue if t.seq >= self.summarised_seq]
+
+    def close(self):
+        """Cancel any in-flight summary update"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
@@ -0,0 +1,296 @@
+"""Bounded in-memory conversation buffer with spill to conversation_messages"""
+
+import asyncio
+import logging
+import weakref
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import func, insert, select
+
+from app.core.database import AsyncSessionLocal
+from app.models.session import ConversationMessage
+
+logger = logging.getLogger(__name__)
+
+# Per-message overhead of the chat format (role, separators)
+MESSAGE_TOKEN_OVERHEAD = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for English text (~4 characters per token).
+
+    Good enough for budgeting without loading a tokenizer on the hot path.
+    """
+    return (len(text) + 3) // 4 + MESSAGE_TOKEN_OVERHEAD
+
+
+class ConversationTurn:
+    """One message in a session's conversation"""
+
+    __slots__ = ("role", "content", "emotion", "node_id", "timestamp", "tokens", "seq")
+
+    def __init__(
+        self,
+        role: str,
+        content: str,
+        emotion: Optional[str] = None,
+        node_id: Optional[str] = None,
+    ):
+        self.role = role
+        self.content = content
+        self.emotion = emotion
+        self.node_id = node_id
+        self.timestamp = datetime.utcnow()
+        self.tokens = estimate_tokens(content)
+        self.seq = 0  # Position in the conversation, set by ConversationBuffer
+
+    def to_dict(self) -> Dict[str, str]:
+        turn = {"role": self.role, "content": self.content}
+        if self.emotion is not None:
+            turn["emotion"] = self.emotion
+        return turn
+
+    def to_row(self, session_id: str) -> Dict[str, Any]:
+        """Column values for a ``conversation_messages`` row"""
+        return {
+            "session_id": session_id,
+            "role": self.role,
+            "message": self.content,
+            "timestamp": self.timestamp,
+            "node_id": self.node_id,
+            "message_metadata": {"emotion": self.emotion} if self.emotion else {},
+        }
+
+
+class ConversationStore:
+    """
+    Writes spilled conversation turns to ``conversation_messages`` and reads
+    them back.
+
+    Writes run as background tasks chained per session, so they never block a
+    turn and rows for one session are inserted in conversation order.
+
+    Buffers of live sessions register here, so the full conversation of a
+    session can be read back whether or not it is still in progress.
+    """
+
+    # Rows fetched per query when streaming history back
+    READ_BATCH_SIZE = 200
+
+    def __init__(self):
+        self._tails: Dict[str, asyncio.Task] = {}
+        self._live: "weakref.WeakValueDictionary[str, ConversationBuffer]" = (
+            weakref.WeakValueDictionary()
+        )
+
+    def register(self, buffer: "ConversationBuffer"):
+        """Track the buffer of a live session (replaces an earlier connection's)"""
+        self._live[buffer.session_id] = buffer
+
+    def unregister(self, buffer: "ConversationBuffer"):
+        if self._live.get(buffer.session_id) is buffer:
+            del self._live[buffer.session_id]
+
+    def spill(self, session_id: str, turns: List[ConversationTurn]):
+        """Schedule turns for writing (must be called from the event loop)"""
+        if not turns:
+            return
+        rows = [turn.to_row(session_id) for turn in turns]
+        previous = self._tails.get(session_id)
+        task = asyncio.create_task(self._write(session_id, rows, previous))
+        self._tails[session_id] = task
+        task.add_done_callback(lambda t: self._on_written(session_id, t))
+
+    async def _write(
+        self, session_id: str, rows: List[Dict[str, Any]], previous: Optional[asyncio.Task]
+    ):
+        if previous is not None:
+            # Keep per-session insert order; the previous write logs its own failure
+            await asyncio.gather(previous, return_exceptions=True)
+        async with AsyncSessionLocal() as db:
+            await db.execute(insert(ConversationMessage), rows)
+            await db.commit()
+
+    def _on_written(self, session_id: str, task: asyncio.Task):
+        if self._tails.get(session_id) is task:
+            del self._tails[session_id]
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Failed to spill conversation for {session_id}: {task.exception()}")
+
+    async def flush(self, session_id: str):
+        """Wait for pending writes of a session to finish"""
+        tail = self._tails.get(session_id)
+        if tail is not None:
+            await asyncio.gather(tail, return_exceptions=True)
+
+    async def count_messages(self, session_id: str) -> int:
+        """Number of stored messages of a session, once pending writes land"""
+        await self.flush(session_id)
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(func.count(ConversationMessage.id)).where(
+                    ConversationMessage.session_id == session_id
+                )
+            )
+            return result.scalar_one()
+
+    def iter_conversation(self, session_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the full conversation of a session, live or ended.
+
+        A session connected to this process is read through its buffer (stored
+        turns, then the in-memory window); otherwise every turn was spilled
+        when it disconnected and is read from the database.
+        """
+        buffer = self._live.get(session_id)
+        if buffer is not None:
+            return buffer.iter_all()
+        return self.iter_messages(session_id)
+
+    async def iter_messages(self, session_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a session's stored messages in order, one batch per query.
+
+        Args:
+            session_id: Session ID
+
+        Yields:
+            Message dicts with role, content, emotion, node_id and timestamp
+        """
+        await self.flush(session_id)
+
+        last_id = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(ConversationMessage)
+                    .where(
+                        ConversationMessage.session_id == session_id,
+                        ConversationMessage.id > last_id,
+                    )
+                    .order_by(ConversationMessage.id)
+                    .limit(self.READ_BATCH_SIZE)
+                )
+                rows = result.scalars().all()
+
+            for row in rows:
+                message = {"role": row.role, "content": row.message}
+                emotion = (row.message_metadata or {}).get("emotion")
+                if emotion:
+                    message["emotion"] = emotion
+                message["node_id"] = row.node_id
+                message["timestamp"] = row.timestamp.isoformat() if row.timestamp else None
+                yield message
+
+            if len(rows) < self.READ_BATCH_SIZE:
+                return
+            last_id = rows[-1].id
+
+
+class ConversationBuffer:
+    """
+    Fixed-size ring buffer of the most recent turns of one session.
+
+    Only the window the prompt needs stays in memory. Turns pushed out of the
+    window are handed to the store to be written asynchronously; when the
+    buffer has no session ID (e.g. offline use) they are just dropped.
+
+    A new buffer assumes nothing was spilled before it; a buffer resuming a
+    session (e.g. after a reconnect) must ``restore()`` the count from the
+    store.
+    """
+
+    __slots__ = ("session_id", "store", "spilled", "_turns", "__weakref__")
+
+    def __init__(
+        self,
+        capacity: int,
+        session_id: Optional[str] = None,
+        store: Optional[ConversationStore] = None,
+    ):
+        self.session_id = session_id
+        self.store = store
+        self.spilled = 0
+        self._turns: Deque[ConversationTurn] = deque(maxlen=capacity)
+        if session_id and store is not None:
+            store.register(self)
+
+    @property
+    def capacity(self) -> int:
+        return self._turns.maxlen
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def __iter__(self) -> Iterator[ConversationTurn]:
+        return iter(self._turns)
+
+    @property
+    def total(self) -> int:
+        """Number of turns in the whole conversation, including spilled ones"""
+        return self.spilled + len(self._turns)
+
+    def extend(self, turns: Iterable[ConversationTurn]) -> List[ConversationTurn]:
+        """
+        Append turns, spilling any that fall out of the window.
+
+        Returns:
+            The evicted turns
+        """
+        evicted = []
+        for turn in turns:
+            turn.seq = self.total
+            if len(self._turns) == self._turns.maxlen:
+                evicted.append(self._turns[0])
+                self.spilled += 1
+            self._turns.append(turn)
+        self._write(evicted)
+        return evicted
+
+    async def restore(self):
+        """Count the turns a previous connection already stored as spilled"""
+        if self.session_id and self.store is not None:
+            self.spilled = await self.store.count_messages(self.session_id)
+            for seq, turn in enumerate(self._turns, start=self.spilled):
+                turn.seq = seq
+
+    def recent(self, limit: int) -> List[Dict[str, str]]:
+        """Last ``limit`` turns as dicts"""
+        turns = list(self._turns)
+        return [turn.to_dict() for turn in turns[-limit:]] if limit > 0 else []
+
+    def close(self):
+        """Spill every turn still in memory (e.g. when the session disconnects)"""
+        remaining = list(self._turns)
+        self.spilled += len(remaining)
+        self._turns.clear()
+        self._write(remaining)
+        if self.session_id and self.store is not None:
+            self.store.unregister(self)
+
+    def _write(self, turns: List[ConversationTurn]):
+        if not turns:
+            return
+        if self.session_id and self.store is not None:
+            self.store.spill(self.session_id, turns)
+
+    async def iter_all(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the full conversation: spilled turns from the database, then
+        the turns still in memory.
+        """
+        if self.spilled and self.session_id and self.store is not None:
+            async for message in self.store.iter_messages(self.session_id):
+                yield message
+        for turn in list(self._turns):
+            message = turn.to_dict()
+            message["node_id"] = turn.node_id
+            message["timestamp"] = turn.timestamp.isoformat()
+            yield message
+
+
+# Create singleton instance
+conversation_store = ConversationStore()
@@ -0,0 +1,322 @@
+"""Compiled dialogue graph for scenario dialogue trees"""
+
+import logging
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bump when the compiled layout changes so stored artifacts are recompiled
+COMPILED_DIALOGUE_VERSION = 1
+
+
+class DialogueGraphError(ValueError):
+    """Raised when a dialogue tree fails validation"""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("; ".join(errors))
+
+
+class CompiledDialogueGraph:
+    """
+    Flat, validated form of a scenario dialogue tree.
+
+    Dialogue trees are authored as nested dicts: top-level keys (usually just
+    ``root``) hold nodes, nodes hold ``branches`` (a dict keyed by topic or a
+    list of nodes) and may point elsewhere via ``next_nodes``. Compiling walks
+    the tree once and produces:
+
+    - ``nodes``: node ID -> node payload (without nested branches)
+    - ``edges``: node ID -> tuple of reachable node IDs (branches, then next_nodes)
+    - ``expected_topics``: node ID -> frozenset of topics expected at that node
+    - ``triggers``: node ID -> tuple of lowercase trigger keywords
+    - ``aliases``: top-level keys (e.g. ``root``) -> node ID
+
+    so the engine resolves and advances nodes with dict lookups instead of
+    scanning the tree on every turn.
+    """
+
+    def __init__(
+        self,
+        root_id: Optional[str],
+        nodes: Dict[str, Dict[str, Any]],
+        edges: Dict[str, Tuple[str, ...]],
+        expected_topics: Dict[str, FrozenSet[str]],
+        triggers: Dict[str, Tuple[str, ...]],
+        topics: Dict[str, Optional[str]],
+        aliases: Dict[str, str],
+    ):
+        self.root_id = root_id
+        self.nodes = nodes
+        self.edges = edges
+        self.expected_topics = expected_topics
+        self.triggers = triggers
+        self.topics = topics
+        self.aliases = aliases
+
+    @classmethod
+    def compile(cls, dialogue_tree: Dict[str, Any], strict: bool = True) -> "CompiledDialogueGraph":
+        """
+        Compile a nested dialogue tree into a flat graph.
+
+        Args:
+            dialogue_tree: Scenario dialogue tree
+            strict: Raise on duplicate IDs, dangling ``next_nodes`` and cycles.
+                When False, problems are logged, dangling edges are dropped and
+                the first node with a given ID wins.
+
+        Returns:
+            Compiled graph
+
+        Raises:
+            DialogueGraphError: If ``strict`` and the tree is invalid
+        """
+        errors: List[str] = []
+        nodes: Dict[str, Dict[str, Any]] = {}
+        child_edges: Dict[str, List[str]] = {}
+        next_refs: Dict[str, List[str]] = {}
+        topics: Dict[str, Optional[str]] = {}
+        aliases: Dict[str, str] = {}
+
+        if not isinstance(dialogue_tree, dict):
+            raise DialogueGraphError(["Dialogue tree must be an object"])
+
+        # Iterative walk: (node, fallback ID, topic key, parent ID)
+        stack: List[Tuple[Any, str, Optional[str], Optional[str]]] = []
+        for key, node in reversed(list(dialogue_tree.items())):
+            stack.append((node, key, None, None))
+
+        while stack:
+            node, fallback_id, topic, parent_id = stack.pop()
+            if not isinstance(node, dict):
+                errors.append(f"Node '{fallback_id}' must be an object")
+                continue
+
+            node_id = str(node.get("id") or node.get("node_id") or fallback_id)
+            if parent_id is None and node_id != fallback_id:
+                aliases[fallback_id] = node_id
+
+            if node_id in nodes:
+                errors.append(f"Duplicate node ID '{node_id}'")
+                if parent_id is not None:
+                    child_edges[parent_id].append(node_id)
+                continue
+
+            nodes[node_id] = {k: v for k, v in node.items() if k != "branches"}
+            topics[node_id] = topic
+            child_edges[node_id] = []
+            next_refs[node_id] = [str(ref) for ref in node.get("next_nodes") or []]
+            if parent_id is not None:
+                child_edges[parent_id].append(node_id)
+
+            branches = node.get("branches") or {}
+            if isinstance(branches, dict):
+                children = [(child, str(k), str(k)) for k, child in branches.items()]
+            elif isinstance(branches, list):
+                children = [
+                    (
+                        child,
+                        f"{node_id}.{i}",
+                        child.get("topic") if isinstance(child, dict) else None,
+                    )
+                    for i, child in enumerate(branches)
+                ]
+            else:
+                errors.append(f"Node '{node_id}' has invalid branches")
+                children = []
+
+            for child, child_fallback, child_topic in reversed(children):
+                stack.append((child, child_fallback, child_topic, node_id))
+
+        def resolve(ref: str) -> Optional[str]:
+            if ref in nodes:
+                return ref
+            return aliases.get(ref)
+
+        edges: Dict[str, Tuple[str, ...]] = {}
+        for node_id in nodes:
+            targets = list(child_edges[node_id])
+            for ref in next_refs[node_id]:
+                target = resolve(ref)
+                if target is None:
+                    errors.append(f"Node '{node_id}' points to unknown node '{ref}'")
+                elif target not in targets:
+                    targets.append(target)
+            edges[node_id] = tuple(targets)
+
+        cycle = cls._find_cycle(edges)
+        if cycle:
+            errors.append("Cycle between nodes " + " -> ".join(cycle))
+
+        if errors:
+            if strict:
+                raise DialogueGraphError(errors)
+            logger.warning(f"Dialogue tree compiled with problems: {'; '.join(errors)}")
+
+        expected_topics: Dict[str, FrozenSet[str]] = {}
+        triggers: Dict[str, Tuple[str, ...]] = {}
+        for node_id, node in nodes.items():
+            explicit = node.get("expected_topics")
+            if explicit:
+                expected_topics[node_id] = frozenset(str(t) for t in explicit)
+            else:
+                # Topics of the branches the student can open from here
+                expected_topics[node_id] = frozenset(
+                    topics[child] for child in child_edges[node_id] if topics.get(child)
+                )
+            triggers[node_id] = tuple(
+                str(t).lower() for t in node.get("triggers") or [] if str(t).strip()
+            )
+
+        root_id = resolve("root") if nodes else None
+        if root_id is None and nodes:
+            root_id = next(iter(nodes))
+
+        return cls(root_id, nodes, edges, expected_topics, triggers, topics, aliases)
+
+    @staticmethod
+    def _find_cycle(edges: Dict[str, Tuple[str, ...]]) -> Optional[List[str]]:
+        """Return one cycle as a list of node IDs, or None if the graph is acyclic"""
+        visiting, done = 1, 2
+        state: Dict[str, int] = {}
+
+        for start in edges:
+            if start in state:
+                continue
+            path = [start]
+            iterators = [iter(edges.get(start, ()))]
+            state[start] = visiting
+            while iterators:
+                target = next(iterators[-1], None)
+                if target is None:
+                    state[path.pop()] = done
+                    iterators.pop()
+                elif state.get(target) == visiting:
+                    return path[path.index(target) :] + [target]
+                elif target not in state:
+                    state[target] = visiting
+                    path.append(target)
+                    iterators.append(iter(edges.get(target, ())))
+        return None
+
+    def resolve(self, node_id: Optional[str]) -> Optional[str]:
+        """Resolve a node ID or top-level alias to a node ID"""
+        if node_id is None:
+            return None
+        if node_id in self.nodes:
+            return node_id
+        return self.aliases.get(node_id)
+
+    def get_node(self, node_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Get a node payload by ID or alias"""
+        resolved = self.resolve(node_id)
+        return self.nodes.get(resolved) if resolved else None
+
+    def get_expected_topics(self, node_id: Optional[str]) -> FrozenSet[str]:
+        """Get the topics expected at a node"""
+        resolved = self.resolve(node_id)
+        return self.expected_topics.get(resolved, frozenset()) if resolved else frozenset()
+
+    def next_node(self, node_id: Optional[str], message_lower: str) -> Optional[str]:
+        """
+        Pick the node the student's message moves to.
+
+        The current node's edges are tried first, then the root's, so a student
+        can open any top-level topic at any point. The edge whose triggers
+        match most keywords wins; ties keep authoring order.
+
+        Args:
+            node_id: Current node ID
+            message_lower: Lowercased student message
+
+        Returns:
+            Next node ID, or None if no trigger matched
+        """
+        current = self.resolve(node_id)
+        candidates = [current, self.root_id] if current != self.root_id else [current]
+        for source in candidates:
+            if source is None:
+                continue
+            best, best_hits = None, 0
+            for target in self.edges.get(source, ()):
+                hits = sum(
+                    1 for trigger in self.triggers.get(target, ()) if trigger in message_lower
+                )
+                if hits > best_hits:
+                    best, best_hits = target, hits
+            if best is not None:
+                return best
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialise to a JSON-compatible artifact for storage"""
+        return {
+            "version": COMPILED_DIALOGUE_VERSION,
+            "root_id": self.root_id,
+            "aliases": dict(self.aliases),
+            "nodes": {
+                node_id: {
+                    "node": node,
+                    "edges": list(self.edges[node_id]),
+                    "expected_topics": sorted(self.expected_topics[node_id]),
+                    "triggers": list(self.triggers[node_id]),
+                    "topic": self.topics.get(node_id),
+                }
+                for node_id, node in self.nodes.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompiledDialogueGraph":
+        """Load a stored artifact produced by ``to_dict``"""
+        entries = data.get("nodes", {})
+        return cls(
+            root_id=data.get("root_id"),
+            nodes={node_id: entry["node"] for node_id, entry in entries.items()},
+            edges={node_id: tuple(entry["edges"]) for node_id, entry in entries.items()},
+            expected_topics={
+                node_id: frozenset(entry["expected_topics"]) for node_id, entry in entries.items()
+            },
+            triggers={node_id: tuple(entry["triggers"]) for node_id, entry in entries.items()},
+            topics={node_id: entry.get("topic") for node_id, entry in entries.items()},
+            aliases=dict(data.get("aliases", {})),
+        )
+
+
+def compile_dialogue_tree(dialogue_tree: Dict[str, Any], strict: bool = True) -> Dict[str, Any]:
+    """
+    Validate and compile a dialogue tree into its stored artifact.
+
+    Args:
+        dialogue_tree: Scenario dialogue tree
+        strict: Raise ``DialogueGraphError`` on invalid trees
+
+    Returns:
+        JSON-compatible compiled dialogue
+    """
+    return CompiledDialogueGraph.compile(dialogue_tree, strict=strict).to_dict()
+
+
+def load_dialogue_graph(
+    compiled: Optional[Dict[str, Any]], dialogue_tree: Optional[Dict[str, Any]]
+) -> CompiledDialogueGraph:
+    """
+    Load a stored compiled dialogue, recompiling leniently if it is missing or stale.
+
+    Args:
+        compiled: Stored artifact (``Scenario.compiled_dialogue``), if any
+        dialogue_tree: Source dialogue tree used when the artifact is unusable
+
+    Returns:
+        Compiled graph
+    """
+    if compiled and compiled.get("version") == COMPILED_DIALOGUE_VERSION:
+        try:
+            return CompiledDialogueGraph.from_dict(compiled)
+        except (KeyError, TypeError) as e:
+            logger.warning(f"Stored compiled dialogue is unreadable ({e}); recompiling")
+    try:
+        return CompiledDialogueGraph.compile(dialogue_tree or {}, strict=False)
+    except DialogueGraphError as e:
+        logger.warning(f"Dialogue tree could not be compiled: {e}")
+        return CompiledDialogueGraph(None, {}, {}, {}, {}, {}, {})
@@ -0,0 +1,250 @@
+"""Bulk enrichment of the scenario catalogue with Clare guidelines"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy import update
+
+from app.core.database import SessionLocal
+from app.models.scenario import Scenario, ScenarioStatus
+from app.services.bulk_jobs import BulkJob, bulk_job_registry
+from app.services.clare_integration import ClareIntegrationService, clare_service
+from app.services.job_queue import JobContext, job_queue
+
+logger = logging.getLogger(__name__)
+
+
+class GuidelineEnrichmentService:
+    """
+    Refreshes ``clare_guidelines``/``clare_guideline_urls`` across the catalogue.
+
+    Scenarios are streamed from the database in keyset pages ordered by ``id``.
+    Each distinct diagnosis is only queried once per run (many scenarios share
+    a diagnosis), Clare lookups run concurrently behind a semaphore, and each
+    page is written back with a single bulk UPDATE. After every page the job
+    checkpoint is advanced to the last scenario ``id`` so an interrupted run can
+    be resumed with ``resume_after_id``. Database reads and writes run in a
+    thread so they never block the event loop.
+    """
+
+    def __init__(self, clare: ClareIntegrationService = clare_service):
+        self.clare = clare
+
+    @staticmethod
+    def normalise_diagnosis(diagnosis: Optional[str]) -> str:
+        """Normalise a diagnosis for deduplication"""
+        return " ".join((diagnosis or "").lower().split())
+
+    async def run(
+        self,
+        job: BulkJob,
+        dry_run: bool = False,
+        concurrency: int = 5,
+        batch_size: int = 100,
+        only_missing: bool = False,
+        status: Optional[ScenarioStatus] = None,
+        resume_after_id: Optional[int] = None,
+    ):
+        """
+        Run an enrichment pass, recording progress on ``job``.
+
+        Args:
+            job: Bulk job used for progress reporting
+            dry_run: Compute changes without writing them
+            concurrency: Maximum number of in-flight Clare requests
+            batch_size: Scenarios per page (and per bulk UPDATE)
+            only_missing: Skip scenarios that already have guidelines
+            status: Only enrich scenarios with this status
+            resume_after_id: Resume after this scenario primary key
+        """
+        last_id = resume_after_id or 0
+        job.checkpoint = last_id
+        job.total = await asyncio.to_thread(self._count_candidates, last_id, only_missing, status)
+
+        # Normalised diagnosis -> formatted guidelines (None if the lookup failed)
+        lookups: Dict[str, Optional[List[Dict[str, Any]]]] = {}
+        semaphore = asyncio.Semaphore(concurrency)
+
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(timeout=30.0, limits=limits) as client:
+
+            async def lookup(diagnosis_key: str, diagnosis: str):
+                async with semaphore:
+                    result = await self.clare.search_guidelines(diagnosis, client=client)
+                lookups[diagnosis_key] = (
+                    self.clare.format_guidelines(result.get("sources", []))
+                    if result is not None
+                    else None
+                )
+
+            while True:
+                rows, page_last_id = await asyncio.to_thread(
+                    self._fetch_page, last_id, batch_size, only_missing, status
+                )
+                if page_last_id is None:
+                    break
+
+                pending = {}
+                for row in rows:
+                    key = self.normalise_diagnosis(row.correct_diagnosis)
+                    if key and key not in lookups and key not in pending:
+                        pending[key] = row.correct_diagnosis.strip()
+
+                if pending:
+                    await asyncio.gather(*(lookup(k, d) for k, d in pending.items()))
+
+                updates = self._build_updates(job, rows, lookups, dry_run)
+
+                if updates and not dry_run:
+                    await asyncio.to_thread(self._write_page, updates)
+
+                last_id = page_last_id
+                job.checkpoint = last_id
+
+        logger.info(
+            f"Guideline enrichment {job.job_id} finished: {job.succeeded} updated, "
+            f"{job.skipped} skipped, {job.failed} failed (dry_run={dry_run})"
+        )
+
+    def _build_updates(
+        self,
+        job: BulkJob,
+        rows: List[Any],
+        lookups: Dict[str, Optional[List[Dict[str, Any]]]],
+        dry_run: bool,
+    ) -> List[Dict[str, Any]]:
+        """Diff each scenario against its lookup result and record item outcomes"""
+        now = datetime.utcnow()
+        updates = []
+
+        for row in rows:
+            key = self.normalise_diagnosis(row.correct_diagnosis)
+            if not key:
+                job.record_item(row.scenario_id, "skipped", reason="No diagnosis")
+                continue
+
+            guidelines = lookups.get(key)
+            if guidelines is None:
+                job.record_item(row.scenario_id, "failed", reason="Clare lookup failed")
+                continue
+
+            guideline_ids = [g["guideline_id"] for g in guidelines]
+            guideline_urls = [g["url"] for g in guidelines if g.get("url")]
+
+            if guideline_ids == (row.clare_guidelines or []) and guideline_urls == (
+                row.clare_guideline_urls or []
+            ):
+                job.record_item(row.scenario_id, "skipped", reason="Unchanged")
+                continue
+
+            job.record_item(
+                row.scenario_id,
+                "would_update" if dry_run else "updated",
+                guidelines=guideline_ids,
+            )
+            updates.append(
+                {
+                    "id": row.id,
+                    "clare_guidelines": guideline_ids,
+                    "clare_guideline_urls": guideline_urls,
+                    "updated_at": now,
+                }
+            )
+
+        return updates
+
+    def _write_page(self, updates: List[Dict[str, Any]]):
+        """Write one page of guideline changes with a bulk UPDATE"""
+        db = SessionLocal()
+        try:
+            db.execute(update(Scenario), updates)
+            db.commit()
+        finally:
+            db.close()
+
+    def _fetch_page(
+        self,
+        after_id: int,
+        batch_size: int,
+        only_missing: bool,
+        status: Optional[ScenarioStatus],
+    ) -> Tuple[List[Any], Optional[int]]:
+        """
+        Fetch the next keyset page of candidate scenarios.
+
+        Returns:
+            Tuple of (rows to process, last scenario id scanned or None when exhausted)
+        """
+        db = SessionLocal()
+        try:
+            while True:
+                query = db.query(
+                    Scenario.id,
+                    Scenario.scenario_id,
+                    Scenario.correct_diagnosis,
+                    Scenario.clare_guidelines,
+                    Scenario.clare_guideline_urls,
+                ).filter(Scenario.id > after_id)
+                if status:
+                    query = query.filter(Scenario.status == status)
+
+                rows = query.order_by(Scenario.id).limit(batch_size).all()
+                if not rows:
+                    return [], None
+
+                if not only_missing:
+                    return rows, rows[-1].id
+
+                # JSON emptiness is not portable across backends, so filter here
+                missing = [r for r in rows if not r.clare_guidelines]
+                if missing:
+                    return missing, rows[-1].id
+                after_id = rows[-1].id
+        finally:
+            db.close()
+
+    def _count_candidates(
+        self, after_id: int, only_missing: bool, status: Optional[ScenarioStatus]
+    ) -> Optional[int]:
+        """Count scenarios remaining after ``after_id`` (upper bound when only_missing)"""
+        db = SessionLocal()
+        try:
+            query = db.query(Scenario.id).filter(Scenario.id > after_id)
+            if status:
+                query = query.filter(Scenario.status == status)
+            return query.count()
+        finally:
+            db.close()
+
+
+# Create singleton instance
+guideline_enrichment_service = GuidelineEnrichmentService()
+
+
+GUIDELINE_ENRICHMENT_JOB = "guideline_enrichment"
+
+
+@job_queue.handler(GUIDELINE_ENRICHMENT_JOB, queue="imports")
+async def run_guideline_enrichment_job(ctx: JobContext) -> Dict[str, Any]:
+    """Job handler: payload holds the ``GuidelineEnrichmentService.run`` options"""
+    params = ctx.payload
+    resume_after_id = params.get("resume_after_id")
+    # A retried (or restarted) job continues from the last page it wrote
+    if ctx.progress and ctx.progress.get("checkpoint"):
+        resume_after_id = ctx.progress["checkpoint"]
+
+    return await bulk_job_registry.run(
+        ctx,
+        lambda job: guideline_enrichment_service.run(
+            job,
+            dry_run=params.get("dry_run", False),
+            concurrency=params.get("concurrency", 5),
+            batch_size=params.get("batch_size", 100),
+            only_missing=params.get("only_missing", False),
+            status=ScenarioStatus(params["status"]) if params.get("status") else None,
+            resume_after_id=resume_after_id,
+        ),
+    )
@@ -0,0 +1,477 @@
+"""Persistent background job queue backed by the jobs table"""
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying the job cannot succeed"""
+
+
+class JobContext:
+    """What a handler gets to run one attempt of a job"""
+
+    __slots__ = ("job_id", "kind", "payload", "attempt", "max_attempts", "progress", "_reporter")
+
+    def __init__(
+        self,
+        job_id: str,
+        kind: str,
+        payload: Dict[str, Any],
+        attempt: int,
+        max_attempts: int,
+        progress: Optional[Dict[str, Any]],
+    ):
+        self.job_id = job_id
+        self.kind = kind
+        self.payload = payload
+        self.attempt = attempt
+        self.max_attempts = max_attempts
+        # Progress saved by a previous attempt (e.g. a checkpoint to resume from)
+        self.progress = progress
+        self._reporter: Optional[Callable[[], Dict[str, Any]]] = None
+
+    def report(self, reporter: Callable[[], Dict[str, Any]]):
+        """Set a callable whose result is saved as the job's progress while it runs"""
+        self._reporter = reporter
+
+    def current_progress(self) -> Optional[Dict[str, Any]]:
+        return self._reporter() if self._reporter is not None else self.progress
+
+
+Handler = Callable[[JobContext], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class JobQueue:
+    """
+    Runs background jobs stored in the ``jobs`` table with asyncio workers.
+
+    Jobs are enqueued in the caller's transaction, so they exist exactly when
+    the change that needs them is committed, and survive restarts. Every
+    process runs one poller per queue, which claims due jobs with a
+    conditional UPDATE (``status = 'pending'``) so several processes can share
+    the table without a broker or row locks, on PostgreSQL and SQLite alike.
+    At most ``concurrency[queue]`` jobs of a queue run at once per process.
+
+    A worker renews the lease (``locked_at``) of its running jobs; jobs whose
+    lease expires (the process died) are returned to the queue. Failed
+    attempts are retried with exponential backoff until ``max_attempts``.
+
+    The workers' own database work (claiming, recording outcomes, leases) runs
+    on the sync engine in a thread, one short transaction at a time. A write
+    transaction therefore never waits on the event loop, which request
+    handlers using sync sessions can block; on SQLite that would otherwise
+    leave requests and workers waiting on each other's lock.
+    """
+
+    def __init__(
+        self,
+        concurrency: Dict[str, int],
+        poll_interval: float = 1.0,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 3,
+        retry_backoff: float = 5.0,
+        retry_backoff_max: float = 600.0,
+    ):
+        self.concurrency = dict(concurrency)
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+        self._handlers: Dict[str, Tuple[Handler, str]] = {}
+        self._running: Dict[str, Tuple[asyncio.Task, JobContext]] = {}
+        self._active: Dict[str, int] = {}
+        self._wakeups: Dict[str, asyncio.Event] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ------------------------------------------------------------------
+    # Registration and enqueueing
+    # ------------------------------------------------------------------
+
+    def handler(self, kind: str, queue: str = "default") -> Callable[[Handler], Handler]:
+        """Decorator registering the coroutine function that runs jobs of ``kind``"""
+
+        def register(func: Handler) -> Handler:
+            self._handlers[kind] = (func, queue)
+            return func
+
+        return register
+
+    def enqueue(
+        self,
+        db: Session,
+        kind: str,
+        payload: Optional[Dict[str, Any]] = None,
+        dedupe_key: Optional[str] = None,
+        delay_seconds: float = 0,
+        max_attempts: Optional[int] = None,
+    ) -> Job:
+        """
+        Add a job in the caller's transaction; workers see it once it commits.
+
+        Args:
+            db: Database session (the caller commits)
+            kind: Registered job kind
+            payload: JSON-serialisable handler input
+            dedupe_key: If a job with this key exists, return it instead
+            delay_seconds: Run no earlier than this many seconds from now
+            max_attempts: Attempts before the job is marked failed
+
+        Returns:
+            The new (or deduplicated) job
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        queue = self._handlers[kind][1]
+
+        if dedupe_key:
+            existing = db.query(Job).filter(Job.dedupe_key == dedupe_key).first()
+            if existing:
+                return existing
+
+        job = Job(
+            job_id=f"job_{uuid.uuid4().hex[:12]}",
+            queue=queue,
+            kind=kind,
+            payload=payload or {},
+            dedupe_key=dedupe_key,
+            status=JobStatus.PENDING.value,
+            attempts=0,
+            max_attempts=max_attempts or self.max_attempts,
+            run_at=datetime.utcnow() + timedelta(seconds=delay_seconds),
+        )
+        try:
+            with db.begin_nested():
+                db.add(job)
+        except IntegrityError:
+            # Lost a race on the dedupe key
+            return db.query(Job).filter(Job.dedupe_key == dedupe_key).one()
+
+        if not delay_seconds:
+            event.listen(db, "after_commit", lambda _session: self.notify(queue), once=True)
+        return job
+
+    def notify(self, queue: str):
+        """Wake the queue's poller (safe to call from any thread)"""
+        wakeup = self._wakeups.get(queue)
+        if wakeup is None or self._loop is None or self._loop.is_closed():
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            wakeup.set()
+        else:
+            self._loop.call_soon_threadsafe(wakeup.set)
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Start the pollers and the lease keeper (call from the event loop)"""
+        if self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        queues = set(self.concurrency) | {queue for _, queue in self._handlers.values()}
+        for queue in sorted(queues):
+            self._active[queue] = 0
+            self._wakeups[queue] = asyncio.Event()
+            self._tasks.append(asyncio.create_task(self._poll(queue)))
+        self._tasks.append(asyncio.create_task(self._keep_leases()))
+        logger.info(f"Job workers started as {self.worker_id} for queues {sorted(queues)}")
+
+    async def stop(self):
+        """Stop polling and hand running jobs back to the queue"""
+        for task in self._tasks:
+            task.cancel()
+        running = [task for task, _ in self._running.values()]
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *running, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _poll(self, queue: str):
+        limit = self.concurrency.get(queue, 1)
+        wakeup = self._wakeups[queue]
+        while True:
+            wakeup.clear()
+            free = limit - self._active[queue]
+            if free > 0:
+                try:
+                    for ctx in await self._claim(queue, free):
+                        self._launch(queue, ctx)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Failed to claim jobs from queue '{queue}': {e}")
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self, queue: str, limit: int) -> List[JobContext]:
+        """Claim up to ``limit`` due jobs of a queue"""
+        return await asyncio.to_thread(self._claim_sync, queue, limit)
+
+    def _claim_sync(self, queue: str, limit: int) -> List[JobContext]:
+        now = datetime.utcnow()
+        with SessionLocal() as db:
+            # Read outside any write transaction, then claim in a short one
+            candidates = (
+                db.execute(
+                    select(Job.id)
+                    .where(
+                        Job.queue == queue,
+                        Job.status == JobStatus.PENDING.value,
+                        Job.run_at <= now,
+                    )
+                    .order_by(Job.run_at, Job.id)
+                    .limit(limit * 2)
+                )
+                .scalars()
+                .all()
+            )
+            db.rollback()
+            if not candidates:
+                return []
+
+            claimed = []
+            for job_pk in candidates:
+                if len(claimed) == limit:
+                    break
+                # Only one worker's UPDATE can still see the job as pending
+                result = db.execute(
+                    update(Job)
+                    .where(Job.id == job_pk, Job.status == JobStatus.PENDING.value)
+                    .values(
+                        status=JobStatus.RUNNING.value,
+                        attempts=Job.attempts + 1,
+                        locked_by=self.worker_id,
+                        locked_at=now,
+                        started_at=now,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount == 1:
+                    claimed.append(job_pk)
+            db.commit()
+
+            if not claimed:
+                return []
+            jobs = db.execute(select(Job).where(Job.id.in_(claimed))).scalars().all()
+            return [
+                JobContext(
+                    job.job_id,
+                    job.kind,
+                    dict(job.payload or {}),
+                    job.attempts,
+                    job.max_attempts,
+                    job.progress,
+                )
+                for job in sorted(jobs, key=lambda j: (j.run_at, j.id))
+            ]
+
+    def _launch(self, queue: str, ctx: JobContext):
+        self._active[queue] += 1
+        task = asyncio.create_task(self._run(ctx))
+        self._running[ctx.job_id] = (task, ctx)
+
+        def _finished(_task: asyncio.Task):
+            self._running.pop(ctx.job_id, None)
+            self._active[queue] -= 1
+            self._wakeups[queue].set()
+
+        task.add_done_callback(_finished)
+
+    async def _run(self, ctx: JobContext):
+        entry = self._handlers.get(ctx.kind)
+        logger.info(f"Running job {ctx.job_id} ({ctx.kind}), attempt {ctx.attempt}")
+        try:
+            if entry is None:
+                raise PermanentJobError(f"No handler registered for job kind '{ctx.kind}'")
+            result = await entry[0](ctx)
+        except asyncio.CancelledError:
+            # Shutting down: give the attempt back so another worker reruns the job
+            await self._finish(
+                ctx,
+                status=JobStatus.PENDING,
+                attempts=Job.attempts - 1,
+                run_at=datetime.utcnow(),
+            )
+            raise
+        except Exception as e:
+            retry = not isinstance(e, PermanentJobError) and ctx.attempt < ctx.max_attempts
+            if retry:
+                delay = self.retry_delay(ctx.attempt)
+                logger.warning(
+                    f"Job {ctx.job_id} ({ctx.kind}) failed attempt {ctx.attempt}: {e}; "
+                    f"retrying in {delay:.0f}s"
+                )
+                await self._finish(
+                    ctx,
+                    status=JobStatus.PENDING,
+                    error=str(e),
+                    run_at=datetime.utcnow() + timedelta(seconds=delay),
+                )
+            else:
+                logger.error(f"Job {ctx.job_id} ({ctx.kind}) failed: {e}")
+                await self._finish(
+                    ctx, status=JobStatus.FAILED, error=str(e), finished_at=datetime.utcnow()
+                )
+        else:
+            await self._finish(
+                ctx,
+                status=JobStatus.SUCCEEDED,
+                result=result,
+                error=None,
+                finished_at=datetime.utcnow(),
+            )
+
+    def retry_delay(self, attempt: int) -> float:
+        """Backoff before retrying after the given failed attempt (with jitter)"""
+        delay = min(self.retry_backoff * 2 ** (attempt - 1), self.retry_backoff_max)
+        return delay * random.uniform(0.8, 1.2)  # nosec B311
+
+    async def _finish(self, ctx: JobContext, status: JobStatus, **values: Any):
+        """Record the outcome of an attempt and release the lease"""
+        progress = ctx.current_progress()
+
+        def record():
+            with SessionLocal() as db:
+                db.execute(
+                    update(Job)
+                    .where(Job.job_id == ctx.job_id, Job.locked_by == self.worker_id)
+                    .values(
+                        status=status.value,
+                        progress=progress,
+                        locked_by=None,
+                        locked_at=None,
+                        **values,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                db.commit()
+
+        try:
+            # Shielded so a cancelled attempt still hands its job back
+            await asyncio.shield(asyncio.to_thread(record))
+        except Exception as e:
+            # The lease expires and the job is retried
+            logger.error(f"Failed to record outcome of job {ctx.job_id}: {e}")
+
+    async def _keep_leases(self):
+        """Renew leases of running jobs and requeue jobs whose lease expired"""
+        interval = max(self.lease_seconds / 3, 0.1)
+        while True:
+            try:
+                await asyncio.to_thread(self._renew_leases)
+                await asyncio.to_thread(self._recover_expired)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job lease maintenance failed: {e}")
+            await asyncio.sleep(interval)
+
+    def _renew_leases(self):
+        running = [ctx for _, ctx in list(self._running.values())]
+        if not running:
+            return
+        now = datetime.utcnow()
+        with SessionLocal() as db:
+            for ctx in running:
+                db.execute(
+                    update(Job)
+                    .where(Job.job_id == ctx.job_id, Job.locked_by == self.worker_id)
+                    .values(locked_at=now, progress=ctx.current_progress())
+                    .execution_options(synchronize_session=False)
+                )
+            db.commit()
+
+    def _recover_expired(self):
+        expired_before = datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        stale = (Job.status == JobStatus.RUNNING.value, Job.locked_at < expired_before)
+        with SessionLocal() as db:
+            # Check first so the common case takes no write lock
+            expired = db.execute(select(Job.id).where(*stale).limit(1))
+            if expired.first() is None:
+                return
+            failed = db.execute(
+                update(Job)
+                .where(*stale, Job.attempts >= Job.max_attempts)
+                .values(
+                    status=JobStatus.FAILED.value,
+                    error="Worker lost (lease expired)",
+                    locked_by=None,
+                    locked_at=None,
+                    finished_at=datetime.utcnow(),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            requeued = db.execute(
+                update(Job)
+                .where(*stale)
+                .values(
+                    status=JobStatus.PENDING.value,
+                    error="Worker lost (lease expired)",
+                    locked_by=None,
+                    locked_at=None,
+                    run_at=datetime.utcnow(),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        if failed.rowcount or requeued.rowcount:
+            logger.warning(
+                f"Recovered jobs with expired leases: {requeued.rowcount} requeued, "
+                f"{failed.rowcount} failed"
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Get this process's worker state"""
+        return {
+            "worker_id": self.worker_id,
+            "started": bool(self._tasks),
+            "queues": {
+                queue: {"running": self._active.get(queue, 0), "concurrency": limit}
+                for queue, limit in sorted(
+                    {
+                        **{q: 1 for _, q in self._handlers.values()},
+                        **self.concurrency,
+                    }.items()
+                )
+            },
+            "handlers": {kind: queue for kind, (_, queue) in sorted(self._handlers.items())},
+        }
+
+
+# Create singleton instance
+job_queue = JobQueue(
+    concurrency=settings.JOB_QUEUE_CONCURRENCY,
+    poll_interval=settings.JOB_POLL_INTERVAL_SECONDS,
+    lease_seconds=settings.JOB_LEASE_SECONDS,
+    max_attempts=settings.JOB_MAX_ATTEMPTS,
+    retry_backoff=settings.JOB_RETRY_BACKOFF_SECONDS,
+    retry_backoff_max=settings.JOB_RETRY_BACKOFF_MAX_SECONDS,
+)
@@ -0,0 +1,234 @@
+"""Incrementally maintained leaderboard"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import Float, cast, delete, func, insert, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.assessment import Assessment
+from app.models.leaderboard import ALL_SPECIALTIES, LeaderboardEntry
+from app.models.scenario import Scenario
+from app.models.session import Session as SessionModel
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# Cached pages kept before the snapshot cache is cleared
+MAX_CACHED_PAGES = 512
+
+
+class LeaderboardService:
+    """
+    Keeps ``leaderboard_entries`` current and serves ranked pages from it.
+
+    Each new assessment adds its overall score to two rows, the user's
+    overall row and their row for the scenario's specialty, with one
+    ``INSERT ... ON CONFLICT DO UPDATE`` in the assessment's transaction.
+    Reading a page is then an index scan of ``offset + limit`` rows instead
+    of averaging every assessment. Pages are also kept for
+    ``LEADERBOARD_CACHE_SECONDS`` and returned with the time they were read.
+    """
+
+    def __init__(self, cache_seconds: float):
+        self.cache_seconds = cache_seconds
+        self._cache: Dict[Tuple, Tuple[float, Dict[str, Any]]] = {}
+
+    def record_assessment(
+        self, db: Session, user_id: int, session_id: str, overall_score: int
+    ) -> None:
+        """
+        Add an assessment's overall score to the user's leaderboard entries.
+
+        Runs in the caller's transaction, like the assessment insert.
+
+        Args:
+            db: Database session
+            user_id: Assessed user
+            session_id: Assessed session (determines the specialty)
+            overall_score: The assessment's overall score
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect not in _INSERTS:
+            raise NotImplementedError(f"Leaderboard upsert is not supported on {dialect}")
+
+        institution, specialty = db.execute(
+            select(User.institution, Scenario.specialty)
+            .select_from(User)
+            .outerjoin(SessionModel, SessionModel.session_id == session_id)
+            .outerjoin(Scenario, Scenario.id == SessionModel.scenario_id)
+            .where(User.id == user_id)
+        ).one()
+
+        now = datetime.utcnow()
+        row = {
+            "user_id": user_id,
+            "institution": institution,
+            "score_sum": overall_score,
+            "assessments_count": 1,
+            "average_score": float(overall_score),
+            "updated_at": now,
+        }
+        specialties = [ALL_SPECIALTIES] + ([specialty] if specialty else [])
+        stmt = _INSERTS[dialect](LeaderboardEntry).values(
+            [{**row, "specialty": name} for name in specialties]
+        )
+
+        score_sum = LeaderboardEntry.score_sum + stmt.excluded.score_sum
+        assessments_count = LeaderboardEntry.assessments_count + 1
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LeaderboardEntry.specialty, LeaderboardEntry.user_id],
+            set_={
+                "institution": stmt.excluded.institution,
+                "score_sum": score_sum,
+                "assessments_count": assessments_count,
+                "average_score": cast(score_sum, Float) / assessments_count,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        db.execute(stmt)
+
+    def set_institution(self, db: Session, user_id: int, institution: Optional[str]) -> None:
+        """Copy a user's new institution onto their entries (caller commits)"""
+        db.execute(
+            update(LeaderboardEntry)
+            .where(LeaderboardEntry.user_id == user_id)
+            .values(institution=institution)
+        )
+
+    def rebuild(self, db: Session) -> int:
+        """
+        Recompute every entry from the assessments table (caller commits).
+
+        Used after assessments are re-scored, and to repair the table.
+
+        Returns:
+            Number of entries written
+        """
+        now = datetime.utcnow()
+        score_sum = func.sum(Assessment.overall_score)
+        assessments_count = func.count(Assessment.id)
+        columns = [
+            LeaderboardEntry.user_id,
+            LeaderboardEntry.specialty,
+            LeaderboardEntry.institution,
+            LeaderboardEntry.score_sum,
+            LeaderboardEntry.assessments_count,
+            LeaderboardEntry.average_score,
+            LeaderboardEntry.updated_at,
+        ]
+
+        def totals(specialty):
+            return (
+                select(
+                    Assessment.user_id,
+                    specialty,
+                    User.institution,
+                    score_sum,
+                    assessments_count,
+                    cast(score_sum, Float) / assessments_count,
+                    literal(now),
+                )
+                .join(User, User.id == Assessment.user_id)
+                .group_by(Assessment.user_id, User.institution)
+            )
+
+        overall = totals(literal(ALL_SPECIALTIES))
+        by_specialty = (
+            totals(Scenario.specialty)
+            .join(SessionModel, SessionModel.session_id == Assessment.session_id)
+            .join(Scenario, Scenario.id == SessionModel.scenario_id)
+            .group_by(Scenario.specialty)
+        )
+
+        db.execute(delete(LeaderboardEntry))
+        written = 0
+        for source in (overall, by_specialty):
+            written += db.execute(insert(LeaderboardEntry).from_select(columns, source)).rowcount
+        self._cache.clear()
+
+        logger.info(f"Rebuilt leaderboard: {written} entries")
+        return written
+
+    def get_page(
+        self,
+        db: Session,
+        specialty: Optional[str] = None,
+        institution: Optional[str] = None,
+        offset: int = 0,
+        limit: int = 10,
+    ) -> Dict[str, Any]:
+        """
+        Get one page of the leaderboard, highest average score first.
+
+        Args:
+            db: Database session
+            specialty: Rank within this specialty (default: all specialties)
+            institution: Only rank users of this institution
+            offset: Entries to skip
+            limit: Entries to return
+
+        Returns:
+            The ranked entries, whether more follow, and when they were read
+        """
+        key = (specialty or ALL_SPECIALTIES, institution, offset, limit)
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        query = (
+            select(
+                LeaderboardEntry.user_id,
+                LeaderboardEntry.institution,
+                LeaderboardEntry.average_score,
+                LeaderboardEntry.assessments_count,
+                User.first_name,
+                User.last_name,
+            )
+            .join(User, User.id == LeaderboardEntry.user_id)
+            .where(LeaderboardEntry.specialty == (specialty or ALL_SPECIALTIES))
+            .order_by(
+                LeaderboardEntry.average_score.desc(),
+                LeaderboardEntry.assessments_count.desc(),
+                LeaderboardEntry.user_id.desc(),
+            )
+            .offset(offset)
+            .limit(limit + 1)
+        )
+        if institution:
+            query = query.where(LeaderboardEntry.institution == institution)
+        rows = db.execute(query).all()
+
+        page = {
+            "specialty": specialty,
+            "institution": institution,
+            "offset": offset,
+            "limit": limit,
+            "has_more": len(rows) > limit,
+            "generated_at": datetime.utcnow().isoformat(),
+            "entries": [
+                {
+                    "rank": offset + idx + 1,
+                    "user_name": f"{r.first_name} {r.last_name}",
+                    "institution": r.institution,
+                    "average_score": round(r.average_score, 1),
+                    "scenarios_completed": r.assessments_count,
+                }
+                for idx, r in enumerate(rows[:limit])
+            ],
+        }
+
+        if len(self._cache) >= MAX_CACHED_PAGES:
+            self._cache.clear()
+        self._cache[key] = (time.monotonic() + self.cache_seconds, page)
+        return page
+
+
+# Create singleton instance
+leaderboard_service = LeaderboardService(settings.LEADERBOARD_CACHE_SECONDS)
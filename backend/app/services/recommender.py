@@ -0,0 +1,270 @@
+"""Scenario recommendations targeting a user's weakest skills"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.assessment import Assessment, SkillProgress
+from app.models.scenario import Scenario, ScenarioStatus
+from app.models.session import Session as SessionModel
+from app.models.session import SessionStatus
+from app.services.assessment_engine import SKILLS
+
+logger = logging.getLogger(__name__)
+
+# Weakness assumed for skills a user has no progress for yet
+DEFAULT_WEAKNESS = 0.5
+
+# Share of a scenario's skill emphasis taken from its rubric; the rest comes
+# from how hard students have found each skill in it
+RUBRIC_SHARE = 0.5
+
+
+def rubric_emphasis(rubric: Optional[Mapping[str, Any]]) -> np.ndarray:
+    """
+    Relative emphasis of each skill implied by a scenario's rubric.
+
+    More must-ask topics weigh towards history taking, more red flags towards
+    clinical reasoning, more management steps towards management, and a
+    tighter time limit towards efficiency. Communication gets a fixed share.
+
+    Returns:
+        Non-negative vector over SKILLS summing to 1
+    """
+    rubric = rubric or {}
+    time_limit = rubric.get("time_limit") or 15
+    raw = np.array(
+        [
+            1 + len(rubric.get("must_ask") or []),
+            1 + 1.5 * len(rubric.get("red_flags") or []),
+            1 + len(rubric.get("management_steps") or []),
+            2.0,
+            2.0 * 15 / max(time_limit, 1),
+        ],
+        dtype=np.float64,
+    )
+    return raw / raw.sum()
+
+
+class ScenarioSkillIndex:
+    """
+    Skill-emphasis vectors of all published scenarios, as one matrix.
+
+    Row ``i`` describes scenario ``pks[i]``: a blend of its rubric emphasis
+    and, where students have played it, how far below 100 they scored in each
+    skill, normalised to sum to 1.
+    """
+
+    def __init__(
+        self,
+        pks: np.ndarray,
+        emphasis: np.ndarray,
+        popularity: np.ndarray,
+        details: List[Dict[str, Any]],
+    ):
+        self.pks = pks
+        self.emphasis = emphasis
+        self.popularity = popularity  # times_played, only used to break ties
+        self.details = details
+        self.positions = {int(pk): i for i, pk in enumerate(pks)}
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls, db: Session) -> "ScenarioSkillIndex":
+        """Load published scenarios and their per-skill score averages (two queries)"""
+        scenarios = db.execute(
+            select(
+                Scenario.id,
+                Scenario.scenario_id,
+                Scenario.title,
+                Scenario.specialty,
+                Scenario.difficulty,
+                Scenario.average_score,
+                Scenario.times_played,
+                Scenario.assessment_rubric,
+            )
+            .where(Scenario.status == ScenarioStatus.PUBLISHED)
+            .order_by(Scenario.id)
+        ).all()
+
+        score_columns = [getattr(Assessment, f"{skill}_score") for skill in SKILLS]
+        averages = {
+            row[0]: np.array([np.nan if v is None else float(v) for v in row[1:]])
+            for row in db.execute(
+                select(SessionModel.scenario_id, *(func.avg(c) for c in score_columns))
+                .join(SessionModel, SessionModel.session_id == Assessment.session_id)
+                .group_by(SessionModel.scenario_id)
+            )
+        }
+
+        count = len(scenarios)
+        rubric = np.empty((count, len(SKILLS)))
+        difficulty = np.full((count, len(SKILLS)), np.nan)
+        for i, scenario in enumerate(scenarios):
+            rubric[i] = rubric_emphasis(scenario.assessment_rubric)
+            if scenario.id in averages:
+                difficulty[i] = 1 - averages[scenario.id] / 100
+
+        # Skills with no history take the scenario's rubric emphasis instead
+        difficulty = np.clip(np.where(np.isnan(difficulty), rubric, difficulty), 0, None)
+        totals = difficulty.sum(axis=1, keepdims=True)
+        difficulty = np.divide(difficulty, totals, out=rubric.copy(), where=totals > 0)
+        emphasis = RUBRIC_SHARE * rubric + (1 - RUBRIC_SHARE) * difficulty
+
+        details = [
+            {
+                "scenario_id": s.scenario_id,
+                "title": s.title,
+                "specialty": s.specialty,
+                "difficulty": s.difficulty,
+                "average_score": s.average_score,
+            }
+            for s in scenarios
+        ]
+        return cls(
+            pks=np.array([s.id for s in scenarios], dtype=np.int64),
+            emphasis=emphasis,
+            popularity=np.array([s.times_played or 0 for s in scenarios], dtype=np.float64),
+            details=details,
+        )
+
+
+class RecommendationService:
+    """
+    Ranks unplayed scenarios by how much they exercise a user's weak skills.
+
+    A user's weakness vector (100 minus their current level per skill, from
+    ``skill_progress``) is scored against every scenario's emphasis vector in
+    one matrix-vector product. The scenario index is rebuilt every
+    ``index_ttl`` seconds. Each user's top list is cached until one of their
+    assessments is created in this process (``invalidate_user``) or, for
+    assessments stored by other processes, until ``cache_ttl`` expires.
+    """
+
+    def __init__(self, index_ttl: float, cache_ttl: float, cache_size: int):
+        self.index_ttl = index_ttl
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._index: Optional[ScenarioSkillIndex] = None
+        # user_id -> (expires at, entries ranked, ranked entries)
+        self._cache: Dict[int, Tuple[float, int, List[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+
+    def get_index(self, db: Session) -> ScenarioSkillIndex:
+        index = self._index
+        if index is None or time.monotonic() - index.built_at > self.index_ttl:
+            index = ScenarioSkillIndex.build(db)
+            self._index = index
+            logger.info(f"Built scenario skill index: {len(index.pks)} scenarios")
+        return index
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop a user's cached recommendations (called when an assessment lands)"""
+        with self._lock:
+            self._cache.pop(user_id, None)
+
+    def invalidate_index(self) -> None:
+        """Rebuild the scenario index on next use"""
+        self._index = None
+        with self._lock:
+            self._cache.clear()
+
+    def recommend(self, db: Session, user_id: int, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Get a user's top scenario recommendations.
+
+        Args:
+            db: Database session
+            user_id: User ID
+            limit: Number of scenarios to recommend
+
+        Returns:
+            Scenario summaries with the reason each was recommended
+        """
+        with self._lock:
+            cached = self._cache.get(user_id)
+        if cached and cached[0] > time.monotonic() and cached[1] >= limit:
+            return cached[2][:limit]
+
+        count = max(limit, self.cache_size)
+        ranked = self._rank(db, user_id, count)
+        with self._lock:
+            self._cache[user_id] = (time.monotonic() + self.cache_ttl, count, ranked)
+        return ranked[:limit]
+
+    def _rank(self, db: Session, user_id: int, count: int) -> List[Dict[str, Any]]:
+        index = self.get_index(db)
+        if not len(index.pks):
+            return []
+
+        levels = dict(
+            db.execute(
+                select(SkillProgress.skill_name, SkillProgress.current_level).where(
+                    SkillProgress.user_id == user_id
+                )
+            ).all()
+        )
+        weakness = np.array(
+            [
+                DEFAULT_WEAKNESS if levels.get(skill) is None else 1 - levels[skill] / 100
+                for skill in SKILLS
+            ]
+        )
+        weakness = np.clip(weakness, 0, 1)
+
+        completed = db.execute(
+            select(SessionModel.scenario_id)
+            .where(
+                SessionModel.user_id == user_id,
+                SessionModel.status == SessionStatus.COMPLETED,
+            )
+            .distinct()
+        ).scalars()
+        available = np.ones(len(index.pks), dtype=bool)
+        for pk in completed:
+            position = index.positions.get(pk)
+            if position is not None:
+                available[position] = False
+
+        contributions = index.emphasis * weakness  # per scenario and skill
+        scores = contributions.sum(axis=1)
+        candidates = np.flatnonzero(available)
+        # Highest score first, then most played
+        order = candidates[np.lexsort((-index.popularity[candidates], -scores[candidates]))]
+
+        has_progress = bool(levels)
+        results = []
+        for position in order[:count]:
+            # Name the skills driving the match: the top one, and the runner-up
+            # if it contributes at least half as much
+            skill_contributions = contributions[position]
+            top_skills = [
+                i
+                for i in np.argsort(-skill_contributions)[:2]
+                if skill_contributions[i] >= skill_contributions.max() / 2
+            ]
+            names = " and ".join(SKILLS[i].replace("_", " ") for i in top_skills)
+            results.append(
+                {
+                    **index.details[position],
+                    "match_score": round(float(scores[position]), 3),
+                    "reason": (
+                        f"Recommended to improve {names}" if has_progress else "Popular scenario"
+                    ),
+                }
+            )
+        return results
+
+
+# Create singleton instance
+recommendation_service = RecommendationService(
+    index_ttl=settings.RECOMMENDER_INDEX_TTL_SECONDS,
+    cache_ttl=settings.RECOMMENDATION_CACHE_SECONDS,
+    cache_size=settings.RECOMMENDATION_CACHE_SIZE,
+)
@@ -1,45 +1,226 @@
 """Scenario dialogue engine"""
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 
 from app.core.azure_services import azure_openai_service
+from app.core.config import settings
+from app.services.context_window import ContextWindow
+from app.services.conversation_log import ConversationBuffer, ConversationTurn, conversation_store
+from app.services.dialogue_graph import load_dialogue_graph
 
 logger = logging.getLogger(__name__)
 
 
+# Keyword tables for topic and red-flag detection (can be enhanced with NLP)
+TOPIC_KEYWORDS = {
+    "pain_quality": ["sharp", "dull", "aching", "stabbing", "crushing", "pressure"],
+    "pain_location": ["chest", "arm", "jaw", "back", "shoulder"],
+    "pain_severity": ["severe", "mild", "moderate", "scale", "out of 10"],
+    "pain_duration": ["how long", "when did", "duration", "started"],
+    "radiation": ["spread", "radiate", "move", "travel"],
+    "associated_symptoms": ["nausea", "vomiting", "sweating", "breathless", "dizzy"],
+    "past_medical_history": ["medical history", "conditions", "diagnosed", "previous"],
+    "medications": ["medication", "tablets", "drugs", "taking"],
+    "allergies": ["allergies", "allergic", "allergy"],
+    "social_history": ["smoke", "alcohol", "drink", "occupation", "job"],
+    "family_history": ["family", "mother", "father", "siblings"],
+}
+
+RED_FLAG_KEYWORDS = {
+    "crushing_pain": ["crushing", "heavy", "pressure", "tight"],
+    "radiation_to_arm": ["arm", "jaw", "shoulder"],
+    "sweating": ["sweating", "clammy", "perspiring"],
+    "breathlessness": ["breathless", "breath", "breathing"],
+    "duration_over_15min": ["hour", "hours"],
+}
+
+
+class TopicVocabulary:
+    """
+    Fixed set of names mapped to bit positions.
+
+    Sessions track which topics/red flags they have seen as a single int
+    bitmask over a shared vocabulary instead of per-session lists of strings.
+    """
+
+    __slots__ = ("names", "bits", "_patterns")
+
+    def __init__(self, keywords: Dict[str, List[str]]):
+        self.names: Tuple[str, ...] = tuple(keywords)
+        self.bits: Dict[str, int] = {name: 1 << i for i, name in enumerate(self.names)}
+        self._patterns: Tuple[Tuple[int, Tuple[str, ...]], ...] = tuple(
+            (self.bits[name], tuple(words)) for name, words in keywords.items()
+        )
+
+    def match(self, message_lower: str) -> int:
+        """Bitmask of entries with a keyword in the message"""
+        mask = 0
+        for bit, words in self._patterns:
+            if any(word in message_lower for word in words):
+                mask |= bit
+        return mask
+
+    def mask(self, names: Iterable[str]) -> int:
+        """Bitmask for the given names (names outside the vocabulary are ignored)"""
+        mask = 0
+        for name in names:
+            mask |= self.bits.get(name, 0)
+        return mask
+
+    def names_for(self, mask: int) -> List[str]:
+        """Names set in a bitmask, in vocabulary order"""
+        return [name for name in self.names if mask & self.bits[name]]
+
+
+TOPIC_VOCABULARY = TopicVocabulary(TOPIC_KEYWORDS)
+RED_FLAG_VOCABULARY = TopicVocabulary(RED_FLAG_KEYWORDS)
+
+
+class SessionState:
+    """Compact mutable state of one live session"""
+
+    __slots__ = (
+        "current_node_id",
+        "nodes_visited",
+        "topics_mask",
+        "red_flags_mask",
+        "questions_asked",
+        "relevant_questions",
+        "conversation",
+        "context",
+    )
+
+    def __init__(self, root_node_id: str, conversation: ConversationBuffer, context: ContextWindow):
+        self.current_node_id = root_node_id
+        self.nodes_visited: List[str] = [root_node_id]
+        self.topics_mask = 0
+        self.red_flags_mask = 0
+        self.questions_asked = 0
+        self.relevant_questions = 0
+        self.conversation = conversation
+        self.context = context
+
+
 class ScenarioEngine:
     """
     Manages the dialogue flow and branching logic for clinical scenarios.
     Each scenario has multiple paths based on student choices.
+
+    Scenario data and the compiled dialogue graph are shared; per-session
+    progress lives in a ``SessionState``. The list-valued attributes
+    (``topics_covered``, ``conversation_history``...) are built on access and
+    are copies, so callers cannot mutate the session through them.
     """
 
-    def __init__(self, scenario: Dict[str, Any]):
+    __slots__ = ("scenario", "dialogue_tree", "dialogue_graph", "state")
+
+    def __init__(self, scenario: Mapping[str, Any], session_id: Optional[str] = None):
         """
         Initialize scenario engine
 
         Args:
-            scenario: Complete scenario data including dialogue tree
+            scenario: Complete scenario data including dialogue tree (a dict or a
+                read-only ``ScenarioSnapshot``, which must not be mutated)
+            session_id: Session the conversation belongs to; turns that leave the
+                in-memory window are spilled to ``conversation_messages`` under it
         """
         self.scenario = scenario
         self.dialogue_tree = scenario.get("dialogue_tree", {})
-        self.current_node_id = "root"
-        self.conversation_history: List[Dict[str, str]] = []
-        self.topics_covered: List[str] = []
-        self.red_flags_identified: List[str] = []
-        self.questions_asked = 0
-        self.relevant_questions = 0
+        # Registry snapshots carry a graph shared by all sessions on the scenario
+        self.dialogue_graph = getattr(scenario, "dialogue_graph", None) or load_dialogue_graph(
+            scenario.get("compiled_dialogue"), self.dialogue_tree
+        )
+        conversation = ConversationBuffer(
+            settings.CONVERSATION_BUFFER_SIZE, session_id=session_id, store=conversation_store
+        )
+        context = ContextWindow(settings.CONTEXT_HISTORY_TOKEN_BUDGET, self._summarise)
+        self.state = SessionState(self.dialogue_graph.root_id or "root", conversation, context)
+
+    @property
+    def current_node_id(self) -> str:
+        return self.state.current_node_id
+
+    @property
+    def nodes_visited(self) -> List[str]:
+        return list(self.state.nodes_visited)
+
+    @property
+    def topics_covered(self) -> List[str]:
+        return TOPIC_VOCABULARY.names_for(self.state.topics_mask)
+
+    @property
+    def red_flags_identified(self) -> List[str]:
+        return RED_FLAG_VOCABULARY.names_for(self.state.red_flags_mask)
+
+    @property
+    def questions_asked(self) -> int:
+        return self.state.questions_asked
+
+    @property
+    def relevant_questions(self) -> int:
+        return self.state.relevant_questions
+
+    @property
+    def conversation(self) -> ConversationBuffer:
+        return self.state.conversation
+
+    @property
+    def conversation_history(self) -> List[Dict[str, str]]:
+        """Messages still in the in-memory window (see ``ConversationStore.iter_conversation``)"""
+        return self.state.conversation.recent(len(self.state.conversation))
+
+    def recent_history(self, limit: int) -> List[Dict[str, str]]:
+        """Last ``limit`` conversation messages as dicts"""
+        return self.state.conversation.recent(limit)
+
+    async def resume_conversation(self):
+        """Pick up the turns an earlier connection to this session already stored"""
+        await self.state.conversation.restore()
+
+    def close(self):
+        """Persist the turns still in memory; call when the session ends or disconnects"""
+        self.state.context.close()
+        self.state.conversation.close()
+
+    @staticmethod
+    async def _summarise(previous_summary: str, messages: List[Dict[str, str]]) -> str:
+        return await azure_openai_service.summarise_conversation(
+            previous_summary, messages, max_tokens=settings.CONTEXT_SUMMARY_MAX_TOKENS
+        )
+
+    def get_system_prompt(self) -> str:
+        """
+        Get the patient system prompt, compiling it at most once per snapshot.
+
+        Registry snapshots keep the compiled prompt so every session on the
+        scenario (and the session bootstrap cache) shares one copy.
+        """
+        system_prompt = getattr(self.scenario, "system_prompt", None)
+        if system_prompt is None:
+            system_prompt = azure_openai_service.build_system_prompt(self.scenario)
+            if hasattr(self.scenario, "system_prompt"):
+                self.scenario.system_prompt = system_prompt
+        return system_prompt
 
     def get_current_node(self) -> Optional[Dict[str, Any]]:
         """Get the current dialogue node"""
-        node = self.dialogue_tree.get(self.current_node_id)
-        return node
+        return self.dialogue_graph.get_node(self.current_node_id)
 
     def get_initial_patient_message(self) -> str:
         """Get the initial patient greeting/complaint"""
-        root_node = self.dialogue_tree.get("root", {})
+        root_node = self.dialogue_graph.get_node(self.dialogue_graph.root_id) or {}
         return root_node.get("patient_says", "Hello, doctor.")
 
+    def _advance_node(self, message_lower: str):
+        """Move to the node whose triggers best match the student's message"""
+        state = self.state
+        next_node_id = self.dialogue_graph.next_node(state.current_node_id, message_lower)
+        if next_node_id and next_node_id != state.current_node_id:
+            state.current_node_id = next_node_id
+            state.nodes_visited.append(next_node_id)
+
     async def process_student_input(
         self, student_message: str, session_context: Optional[Dict[str, Any]] = None
     ) -> Tuple[str, Dict[str, Any]]:
@@ -53,27 +234,34 @@ class ScenarioEngine:
         Returns:
             Tuple of (patient_response, metadata)
         """
-        self.questions_asked += 1
+        state = self.state
+        state.questions_asked += 1
+        message_lower = student_message.lower()
 
         # Analyze student input
-        analysis = self._analyze_student_input(student_message)
-
-        # Update topics covered
-        for topic in analysis["topics"]:
-            if topic not in self.topics_covered:
-                self.topics_covered.append(topic)
+        topics_mask, red_flags_mask, analysis = self._analyze(message_lower)
 
-        # Check for red flags
-        for red_flag in analysis["red_flags"]:
-            if red_flag not in self.red_flags_identified:
-                self.red_flags_identified.append(red_flag)
+        # Update topics covered and red flags
+        state.topics_mask |= topics_mask
+        state.red_flags_mask |= red_flags_mask
 
         # Determine if question is relevant
         if analysis["is_relevant"]:
-            self.relevant_questions += 1
+            state.relevant_questions += 1
+
+        self._advance_node(message_lower)
 
         # Get patient response using AI
-        response_data = await self._generate_patient_response(student_message, analysis)
+        try:
+            response_data = await self._generate_patient_response(student_message, analysis)
+        except asyncio.CancelledError:
+            # Interrupted (barge-in or disconnect): the student still asked it
+            state.context.retire(
+                state.conversation.extend(
+                    (ConversationTurn("student", student_message, node_id=state.current_node_id),)
+                )
+            )
+            raise
 
         # Handle both string (legacy/fallback) and dict (new) responses
         if isinstance(response_data, dict):
@@ -84,21 +272,22 @@ class ScenarioEngine:
             emotion = "neutral"
 
         # Add to conversation history
-        self.conversation_history.append({"role": "student", "content": student_message})
-        self.conversation_history.append(
-            {
-                "role": "patient",
-                "content": patient_text,
-                "emotion": emotion,  # Store emotion in history
-            }
+        evicted = state.conversation.extend(
+            (
+                ConversationTurn("student", student_message, node_id=state.current_node_id),
+                ConversationTurn("patient", patient_text, emotion, node_id=state.current_node_id),
+            )
         )
+        # Turns that left memory before reaching the summary still need folding in
+        state.context.retire(evicted)
 
-        # Prepare metadata
+        # Prepare metadata (fresh lists, not views of session state)
         metadata = {
             "topics_covered": self.topics_covered,
             "red_flags_identified": self.red_flags_identified,
-            "questions_asked": self.questions_asked,
-            "relevant_questions": self.relevant_questions,
+            "questions_asked": state.questions_asked,
+            "relevant_questions": state.relevant_questions,
+            "current_node_id": state.current_node_id,
             "analysis": analysis,
             "emotion": emotion,  # Pass emotion to frontend
         }
@@ -115,55 +304,26 @@ class ScenarioEngine:
         Returns:
             Analysis results
         """
-        message_lower = student_message.lower()
-
-        # Get expected topics from current node
-        current_node = self.get_current_node() or {}
-        expected_topics = current_node.get("expected_topics", [])
-
-        # Simple keyword matching for topics (can be enhanced with NLP)
-        topics_found = []
-        topic_keywords = {
-            "pain_quality": ["sharp", "dull", "aching", "stabbing", "crushing", "pressure"],
-            "pain_location": ["chest", "arm", "jaw", "back", "shoulder"],
-            "pain_severity": ["severe", "mild", "moderate", "scale", "out of 10"],
-            "pain_duration": ["how long", "when did", "duration", "started"],
-            "radiation": ["spread", "radiate", "move", "travel"],
-            "associated_symptoms": ["nausea", "vomiting", "sweating", "breathless", "dizzy"],
-            "past_medical_history": ["medical history", "conditions", "diagnosed", "previous"],
-            "medications": ["medication", "tablets", "drugs", "taking"],
-            "allergies": ["allergies", "allergic", "allergy"],
-            "social_history": ["smoke", "alcohol", "drink", "occupation", "job"],
-            "family_history": ["family", "mother", "father", "siblings"],
-        }
-
-        for topic, keywords in topic_keywords.items():
-            if any(keyword in message_lower for keyword in keywords):
-                topics_found.append(topic)
-
-        # Check for red flags
-        red_flags = []
-        red_flag_keywords = {
-            "crushing_pain": ["crushing", "heavy", "pressure", "tight"],
-            "radiation_to_arm": ["arm", "jaw", "shoulder"],
-            "sweating": ["sweating", "clammy", "perspiring"],
-            "breathlessness": ["breathless", "breath", "breathing"],
-            "duration_over_15min": ["hour", "hours"],
-        }
+        return self._analyze(student_message.lower())[2]
 
-        for red_flag, keywords in red_flag_keywords.items():
-            if any(keyword in message_lower for keyword in keywords):
-                red_flags.append(red_flag)
+    def _analyze(self, message_lower: str) -> Tuple[int, int, Dict[str, Any]]:
+        """Analyze a lowercased message; returns (topics mask, red flags mask, analysis)"""
+        topics_mask = TOPIC_VOCABULARY.match(message_lower)
+        red_flags_mask = RED_FLAG_VOCABULARY.match(message_lower)
+        topics_found = TOPIC_VOCABULARY.names_for(topics_mask)
 
         # Determine if question is relevant (overlaps with expected topics)
-        is_relevant = len(set(topics_found) & set(expected_topics)) > 0 or len(topics_found) > 0
+        expected_topics = self.dialogue_graph.get_expected_topics(self.state.current_node_id)
+        expected_covered = len(expected_topics.intersection(topics_found))
+        is_relevant = expected_covered > 0 or len(topics_found) > 0
 
-        return {
+        analysis = {
             "topics": topics_found,
-            "red_flags": red_flags,
+            "red_flags": RED_FLAG_VOCABULARY.names_for(red_flags_mask),
             "is_relevant": is_relevant,
-            "expected_topics_covered": len(set(topics_found) & set(expected_topics)),
+            "expected_topics_covered": expected_covered,
         }
+        return topics_mask, red_flags_mask, analysis
 
     async def _generate_patient_response(
         self, student_message: str, analysis: Dict[str, Any]
@@ -179,10 +339,14 @@ class ScenarioEngine:
             Patient's response
         """
         try:
+            # Recent turns within the token budget, plus a summary of older ones
+            summary, history = self.state.context.select(self.state.conversation)
             response = await azure_openai_service.generate_patient_response(
                 scenario_context=self.scenario,
                 student_message=student_message,
-                conversation_history=self.conversation_history[-6:],  # Last 3 exchanges
+                conversation_history=history,
+                conversation_summary=summary or None,
+                system_prompt=self.get_system_prompt(),
             )
 
             return response
@@ -200,27 +364,34 @@ class ScenarioEngine:
             Assessment data dictionary
         """
         rubric = self.scenario.get("assessment_rubric", {})
+        state = self.state
 
         # Calculate coverage of must-ask questions
-        must_ask = rubric.get("must_ask", [])
-        must_ask_covered = len(set(self.topics_covered) & set(must_ask))
+        must_ask = set(rubric.get("must_ask", []))
+        must_ask_covered = bin(state.topics_mask & TOPIC_VOCABULARY.mask(must_ask)).count("1")
         must_ask_percentage = (must_ask_covered / len(must_ask) * 100) if must_ask else 0
 
         # Calculate red flag identification
-        expected_red_flags = rubric.get("red_flags", [])
-        red_flags_missed = len(set(expected_red_flags) - set(self.red_flags_identified))
+        expected_red_flags = set(rubric.get("red_flags", []))
+        red_flags_missed = len(expected_red_flags) - bin(
+            state.red_flags_mask & RED_FLAG_VOCABULARY.mask(expected_red_flags)
+        ).count("1")
 
         return {
             "topics_covered": self.topics_covered,
             "must_ask_percentage": must_ask_percentage,
             "red_flags_caught": self.red_flags_identified,
             "red_flags_missed_count": red_flags_missed,
-            "questions_asked": self.questions_asked,
-            "relevant_questions": self.relevant_questions,
+            "questions_asked": state.questions_asked,
+            "relevant_questions": state.relevant_questions,
+            "nodes_visited": self.nodes_visited,
             "relevance_percentage": (
-                self.relevant_questions / self.questions_asked * 100
-                if self.questions_asked > 0
+                state.relevant_questions / state.questions_asked * 100
+                if state.questions_asked > 0
                 else 0
             ),
+            # Only the in-memory window; stream the full record with
+            # conversation_store.iter_conversation()
             "conversation_history": self.conversation_history,
+            "conversation_length": state.conversation.total,
         }
@@ -0,0 +1,200 @@
+"""Process-wide registry of shared, read-only scenario snapshots"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import Mapping
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.services.dialogue_graph import CompiledDialogueGraph, load_dialogue_graph
+
+logger = logging.getLogger(__name__)
+
+ScenarioVersion = Tuple[int, Optional[datetime]]
+
+
+def session_scenario_data(scenario_pk: int, row: Any) -> Dict[str, Any]:
+    """
+    Build registry data from a scenario row.
+
+    Args:
+        scenario_pk: Scenario primary key
+        row: ORM ``Scenario`` or a result row with the same column names
+
+    Returns:
+        Data for ``ScenarioRegistry.put``
+    """
+    return {
+        "id": str(scenario_pk),
+        "title": row.title,
+        "specialty": row.specialty,
+        "patient_profile": row.patient_profile or {},
+        "dialogue_tree": row.dialogue_tree or {},
+        "compiled_dialogue": row.compiled_dialogue,
+        "assessment_rubric": row.assessment_rubric or {},
+    }
+
+
+def freeze(value: Any) -> Any:
+    """
+    Recursively convert JSON data into read-only equivalents.
+
+    Dicts become ``MappingProxyType`` views and lists become tuples, so a
+    snapshot shared between sessions cannot be mutated by any one of them.
+    """
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class ScenarioSnapshot(Mapping):
+    """
+    Immutable view of the scenario fields a live session needs.
+
+    Behaves as a read-only mapping (``snapshot.get("dialogue_tree")``) so it can
+    be passed wherever scenario context dicts were used. The compiled dialogue
+    graph is built once per snapshot and shared by every engine using it, as
+    is the patient system prompt once it has been compiled.
+    """
+
+    __slots__ = ("version", "dialogue_graph", "system_prompt", "_data")
+
+    def __init__(
+        self,
+        version: ScenarioVersion,
+        data: Dict[str, Any],
+        dialogue_graph: CompiledDialogueGraph,
+    ):
+        self.version = version
+        self.dialogue_graph = dialogue_graph
+        self.system_prompt: Optional[str] = None  # Compiled on first use
+        self._data = freeze(data)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self):
+        return f"<ScenarioSnapshot {self._data.get('id')} @ {self.version[1]}>"
+
+
+class ScenarioRegistry:
+    """
+    Bounded LRU of scenario snapshots keyed by (scenario PK, updated_at).
+
+    Sessions on the same scenario share one snapshot by reference instead of
+    each holding its own copy of the dialogue tree, profile and rubric. A
+    lookup with a newer ``updated_at`` than the cached snapshot reloads it;
+    edits, archiving and deletion also invalidate explicitly. Concurrent
+    misses for the same scenario share a single load.
+    """
+
+    def __init__(self, max_size: int = 128):
+        self.max_size = max_size
+        self._snapshots: "OrderedDict[int, ScenarioSnapshot]" = OrderedDict()
+        self._loading: Dict[ScenarioVersion, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, scenario_pk: int, updated_at: Optional[datetime]) -> Optional[ScenarioSnapshot]:
+        """Get the cached snapshot if it matches the given version"""
+        snapshot = self._snapshots.get(scenario_pk)
+        if snapshot is None or snapshot.version != (scenario_pk, updated_at):
+            return None
+        self._snapshots.move_to_end(scenario_pk)
+        return snapshot
+
+    def put(
+        self, scenario_pk: int, updated_at: Optional[datetime], data: Dict[str, Any]
+    ) -> ScenarioSnapshot:
+        """Build and cache a snapshot from scenario data"""
+        dialogue_graph = load_dialogue_graph(
+            data.get("compiled_dialogue"), data.get("dialogue_tree")
+        )
+        fields = {k: v for k, v in data.items() if k != "compiled_dialogue"}
+        snapshot = ScenarioSnapshot((scenario_pk, updated_at), fields, dialogue_graph)
+
+        self._snapshots[scenario_pk] = snapshot
+        self._snapshots.move_to_end(scenario_pk)
+        while len(self._snapshots) > self.max_size:
+            evicted, _ = self._snapshots.popitem(last=False)
+            logger.debug(f"Evicted scenario {evicted} from registry")
+        return snapshot
+
+    async def get_or_load(
+        self,
+        scenario_pk: int,
+        updated_at: Optional[datetime],
+        loader: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+    ) -> Optional[ScenarioSnapshot]:
+        """
+        Get a snapshot, loading it with ``loader`` on a miss.
+
+        Args:
+            scenario_pk: Scenario primary key
+            updated_at: Current ``updated_at`` of the scenario row
+            loader: Coroutine function returning the scenario data, or None
+
+        Returns:
+            Shared snapshot, or None if the loader found nothing
+        """
+        snapshot = self.get(scenario_pk, updated_at)
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+
+        version = (scenario_pk, updated_at)
+        pending = self._loading.get(version)
+        if pending is not None:
+            self.hits += 1
+            return await asyncio.shield(pending)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._loading[version] = future
+        try:
+            data = await loader()
+            snapshot = self.put(scenario_pk, updated_at, data) if data is not None else None
+            future.set_result(snapshot)
+            return snapshot
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody else awaited is not logged
+            future.exception()
+            raise
+        finally:
+            del self._loading[version]
+
+    def invalidate(self, scenario_pk: int):
+        """Drop the cached snapshot for a scenario"""
+        self._snapshots.pop(scenario_pk, None)
+
+    def clear(self):
+        """Drop all cached snapshots"""
+        self._snapshots.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get registry size and hit/miss counters"""
+        return {
+            "size": len(self._snapshots),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Create singleton instance
+scenario_registry = ScenarioRegistry(max_size=settings.SCENARIO_REGISTRY_SIZE)
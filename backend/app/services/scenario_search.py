@@ -0,0 +1,262 @@
+"""Ranked full-text search over the scenario catalogue"""
+
+import bisect
+import logging
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.orm import Session
+
+from app.core.projection import load_only_for
+from app.models.scenario import DifficultyLevel, Scenario, ScenarioStatus
+
+logger = logging.getLogger(__name__)
+
+# Generated column added by migration 010; not mapped on the model because
+# SQLite dev databases have no tsvector type
+SEARCH_VECTOR = literal_column("scenarios.search_vector")
+
+# Field weights of the in-process index, mirroring the tsvector weights
+# (A: title, B: diagnosis and presenting complaint, C: description and
+# learning objectives) with PostgreSQL's default ts_rank weights
+FIELD_WEIGHTS = {"A": 1.0, "B": 0.4, "C": 0.2}
+
+# Words dropped from queries and documents, as the 'english' config does
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or the to was were with".split()
+)
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-cased words of ``text``, without stopwords"""
+    return [w for w in _WORD.findall((text or "").lower()) if w not in STOPWORDS]
+
+
+def weighted_fields(row: Any) -> Dict[str, str]:
+    """
+    Searchable text of a scenario row, grouped by tsvector weight.
+
+    Args:
+        row: ORM ``Scenario`` or a result row with the same column names
+    """
+    profile = row.patient_profile or {}
+    objectives = row.learning_objectives or []
+    return {
+        "A": row.title or "",
+        "B": f"{row.correct_diagnosis or ''} {profile.get('presenting_complaint') or ''}",
+        "C": f"{row.description or ''} {' '.join(str(o) for o in objectives)}",
+    }
+
+
+def prefix_tsquery(terms: List[str]) -> str:
+    """``to_tsquery`` input matching every term as a prefix (``chest:* & pain:*``)"""
+    # Terms come from tokenize(), so they hold only word characters
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+class InvertedIndex:
+    """
+    In-process inverted index of published scenarios, for databases without
+    PostgreSQL full-text search (SQLite dev setups).
+
+    Maps each word to the weighted number of times it occurs per scenario,
+    and keeps the vocabulary sorted so a query term matches every word it
+    prefixes with two bisections.
+    """
+
+    def __init__(self, version: Tuple):
+        self.version = version
+        self.postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self.vocabulary: List[str] = []
+        self.facets: Dict[int, Tuple[str, DifficultyLevel]] = {}
+
+    @classmethod
+    def build(cls, db: Session, version: Tuple) -> "InvertedIndex":
+        index = cls(version)
+        rows = db.execute(
+            select(
+                Scenario.id,
+                Scenario.title,
+                Scenario.description,
+                Scenario.specialty,
+                Scenario.difficulty,
+                Scenario.correct_diagnosis,
+                Scenario.patient_profile,
+                Scenario.learning_objectives,
+            ).where(Scenario.status == ScenarioStatus.PUBLISHED)
+        )
+        for row in rows:
+            index.facets[row.id] = (row.specialty, row.difficulty)
+            weights: Counter = Counter()
+            for field, text in weighted_fields(row).items():
+                for word in tokenize(text):
+                    weights[word] += FIELD_WEIGHTS[field]
+            for word, weight in weights.items():
+                index.postings[word][row.id] = weight
+        index.vocabulary = sorted(index.postings)
+        return index
+
+    def match(self, terms: List[str]) -> Dict[int, float]:
+        """Scenarios containing a word starting with every term, with their rank"""
+        ranks: Optional[Dict[int, float]] = None
+        for term in terms:
+            start = bisect.bisect_left(self.vocabulary, term)
+            end = bisect.bisect_left(self.vocabulary, term + "\U0010ffff")
+            term_ranks: Dict[int, float] = defaultdict(float)
+            for word in self.vocabulary[start:end]:
+                for pk, weight in self.postings[word].items():
+                    term_ranks[pk] += weight
+            if ranks is None:
+                ranks = dict(term_ranks)
+            else:
+                ranks = {
+                    pk: rank + term_ranks[pk] for pk, rank in ranks.items() if pk in term_ranks
+                }
+            if not ranks:
+                break
+        return ranks or {}
+
+
+class ScenarioSearchService:
+    """
+    Searches published scenarios by title, description, diagnosis, learning
+    objectives and presenting complaint.
+
+    On PostgreSQL the query runs against the ``search_vector`` generated
+    column and its GIN index, ranked with ``ts_rank_cd``. Other databases use
+    an ``InvertedIndex`` rebuilt whenever the catalogue fingerprint (row
+    count, highest id, latest ``updated_at``) changes.
+
+    Every query term is matched as a prefix, so results update as the user
+    types. Facet counts cover all text matches before the specialty and
+    difficulty filters, so the UI can show how many hits each option has.
+    """
+
+    def __init__(self):
+        self._index: Optional[InvertedIndex] = None
+        self._lock = threading.Lock()
+
+    def search(
+        self,
+        db: Session,
+        query: str,
+        specialty: Optional[str] = None,
+        difficulty: Optional[DifficultyLevel] = None,
+        offset: int = 0,
+        limit: int = 20,
+        projection: Any = None,
+    ) -> Dict[str, Any]:
+        """
+        Search published scenarios.
+
+        Args:
+            db: Database session
+            query: Free-text query
+            specialty: Only return scenarios of this specialty
+            difficulty: Only return scenarios of this difficulty
+            offset: Hits to skip
+            limit: Hits to return
+            projection: Response schema whose columns are loaded for the hits
+
+        Returns:
+            Total hit count, the page of (scenario, rank) hits and facet counts
+        """
+        terms = tokenize(query)
+        if not terms:
+            return {"total": 0, "hits": [], "facets": {"specialty": {}, "difficulty": {}}}
+
+        if db.get_bind().dialect.name == "postgresql":
+            return self._search_postgres(
+                db, terms, specialty, difficulty, offset, limit, projection
+            )
+        return self._search_index(db, terms, specialty, difficulty, offset, limit, projection)
+
+    def _search_postgres(self, db, terms, specialty, difficulty, offset, limit, projection):
+        tsquery = func.to_tsquery("english", prefix_tsquery(terms))
+        matched = [
+            Scenario.status == ScenarioStatus.PUBLISHED,
+            SEARCH_VECTOR.op("@@")(tsquery),
+        ]
+
+        facets = {}
+        for name, column in (
+            ("specialty", Scenario.specialty),
+            ("difficulty", Scenario.difficulty),
+        ):
+            counts = db.execute(
+                select(column, func.count(Scenario.id)).where(*matched).group_by(column)
+            ).all()
+            facets[name] = {_facet_key(value): count for value, count in counts}
+
+        filters = list(matched)
+        if specialty:
+            filters.append(Scenario.specialty == specialty)
+        if difficulty:
+            filters.append(Scenario.difficulty == difficulty)
+        total = db.execute(select(func.count(Scenario.id)).where(*filters)).scalar_one()
+
+        rank = func.ts_rank_cd(SEARCH_VECTOR, tsquery).label("rank")
+        hits = db.query(Scenario, rank).filter(*filters)
+        if projection is not None:
+            hits = hits.options(load_only_for(Scenario, projection))
+        hits = hits.order_by(rank.desc(), Scenario.id).offset(offset).limit(limit).all()
+        return {"total": total, "hits": [(s, float(r)) for s, r in hits], "facets": facets}
+
+    def _search_index(self, db, terms, specialty, difficulty, offset, limit, projection):
+        index = self.get_index(db)
+        ranks = index.match(terms)
+
+        facets: Dict[str, Counter] = {"specialty": Counter(), "difficulty": Counter()}
+        for pk in ranks:
+            pk_specialty, pk_difficulty = index.facets[pk]
+            facets["specialty"][_facet_key(pk_specialty)] += 1
+            facets["difficulty"][_facet_key(pk_difficulty)] += 1
+
+        filtered = [
+            (pk, rank)
+            for pk, rank in ranks.items()
+            if (not specialty or index.facets[pk][0] == specialty)
+            and (not difficulty or index.facets[pk][1] == difficulty)
+        ]
+        filtered.sort(key=lambda hit: (-hit[1], hit[0]))
+        page = filtered[offset : offset + limit]
+
+        rows = db.query(Scenario).filter(Scenario.id.in_([pk for pk, _ in page]))
+        if projection is not None:
+            rows = rows.options(load_only_for(Scenario, projection))
+        by_pk = {s.id: s for s in rows}
+        return {
+            "total": len(filtered),
+            "hits": [(by_pk[pk], rank) for pk, rank in page if pk in by_pk],
+            "facets": {name: dict(counts) for name, counts in facets.items()},
+        }
+
+    def get_index(self, db: Session) -> InvertedIndex:
+        """The in-process index, rebuilt if the catalogue has changed"""
+        version = tuple(
+            db.execute(
+                select(
+                    func.count(Scenario.id), func.max(Scenario.id), func.max(Scenario.updated_at)
+                )
+            ).one()
+        )
+        with self._lock:
+            index = self._index
+            if index is None or index.version != version:
+                index = InvertedIndex.build(db, version)
+                self._index = index
+                logger.info(f"Built scenario search index: {len(index.facets)} scenarios")
+        return index
+
+
+def _facet_key(value: Any) -> str:
+    return value.value if isinstance(value, DifficultyLevel) else value
+
+
+# Create singleton instance
+scenario_search_service = ScenarioSearchService()
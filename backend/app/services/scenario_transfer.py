@@ -0,0 +1,301 @@
+"""Streaming NDJSON export and import of the scenario catalogue"""
+
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError, field_validator
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.scenario import DifficultyLevel, Scenario, ScenarioStatus
+from app.services.dialogue_graph import DialogueGraphError, compile_dialogue_tree
+from app.services.recommender import recommendation_service
+from app.services.scenario_registry import scenario_registry
+
+logger = logging.getLogger(__name__)
+
+# Content columns written to and read from NDJSON lines, besides status
+# (authorship, timestamps, usage statistics and compiled_dialogue are local)
+TRANSFER_FIELDS = (
+    "scenario_id",
+    "title",
+    "description",
+    "specialty",
+    "difficulty",
+    "patient_profile",
+    "dialogue_tree",
+    "assessment_rubric",
+    "learning_objectives",
+    "correct_diagnosis",
+    "differential_diagnoses",
+    "clare_guidelines",
+    "clare_guideline_urls",
+    "source_clark_consultation_id",
+)
+
+# Rows fetched per round trip while exporting
+EXPORT_FETCH_SIZE = 200
+
+# Line errors listed in an import report; later ones are only counted
+MAX_REPORTED_ERRORS = 500
+
+
+class ScenarioImportLine(BaseModel):
+    """One NDJSON line of an import (the export format)"""
+
+    scenario_id: str
+    title: str
+    description: Optional[str] = None
+    specialty: str
+    difficulty: DifficultyLevel
+    patient_profile: dict
+    dialogue_tree: dict
+    assessment_rubric: dict
+    learning_objectives: List[str] = []
+    correct_diagnosis: Optional[str] = None
+    differential_diagnoses: List[str] = []
+    clare_guidelines: List[str] = []
+    clare_guideline_urls: List[str] = []
+    source_clark_consultation_id: Optional[str] = None
+    status: ScenarioStatus = ScenarioStatus.DRAFT
+
+    @field_validator(
+        "learning_objectives",
+        "differential_diagnoses",
+        "clare_guidelines",
+        "clare_guideline_urls",
+        mode="before",
+    )
+    @classmethod
+    def null_list(cls, value):
+        # List columns may hold NULL, which exports as null
+        return [] if value is None else value
+
+
+class ImportReport:
+    """Running totals and line errors of one import"""
+
+    def __init__(self):
+        self.lines = 0
+        self.created = 0
+        self.updated = 0
+        self.error_count = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def error(self, line: int, scenario_id: Optional[str], message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "scenario_id": scenario_id, "error": message})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "lines": self.lines,
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.error_count,
+            "errors": self.errors,
+            "errors_truncated": self.error_count > len(self.errors),
+        }
+
+
+class ScenarioTransferService:
+    """
+    Moves scenarios between environments as NDJSON, one scenario per line.
+
+    Export streams rows from a server-side cursor (``yield_per``) and import
+    parses the upload as it arrives, so neither side holds the catalogue in
+    memory. Imports are committed in batches: a failing batch is rolled back
+    and reported line by line without undoing the batches before it.
+    """
+
+    def export_lines(
+        self, status: Optional[ScenarioStatus] = None, specialty: Optional[str] = None
+    ) -> Iterator[bytes]:
+        """
+        Yield the catalogue as NDJSON lines, in id order.
+
+        Opens its own database session, as the response outlives the request
+        handler.
+
+        Args:
+            status: Only export scenarios in this status (default: all)
+            specialty: Only export scenarios of this specialty
+        """
+        query = select(
+            *(getattr(Scenario, name) for name in TRANSFER_FIELDS), Scenario.status
+        ).order_by(Scenario.id)
+        if status:
+            query = query.where(Scenario.status == status)
+        if specialty:
+            query = query.where(Scenario.specialty == specialty)
+
+        db = SessionLocal()
+        try:
+            rows = db.execute(query.execution_options(yield_per=EXPORT_FETCH_SIZE))
+            for row in rows:
+                line = dict(row._mapping)
+                line["difficulty"] = _enum_value(line["difficulty"])
+                line["status"] = _enum_value(line["status"])
+                yield (json.dumps(line, separators=(",", ":")) + "\n").encode()
+        finally:
+            db.close()
+
+    async def import_lines(
+        self,
+        db: Session,
+        chunks: AsyncIterator[bytes],
+        overwrite: bool = False,
+        batch_size: int = 200,
+        created_by: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Import scenarios from a stream of NDJSON bytes.
+
+        Each line is parsed and validated (including its dialogue tree) as
+        soon as it is complete; valid lines are written ``batch_size`` at a
+        time, each batch in its own transaction written from a worker thread
+        so the event loop keeps serving other requests.
+
+        Args:
+            db: Database session
+            chunks: Request body chunks
+            overwrite: Update scenarios whose scenario_id exists (else report
+                them as errors)
+            batch_size: Scenarios per transaction
+            created_by: Recorded on created scenarios
+
+        Returns:
+            Line, created and updated counts and the line errors
+        """
+        report = ImportReport()
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        async for number, text in _ndjson_lines(chunks):
+            report.lines = number
+            row = self._parse_line(number, text, report)
+            if row is None:
+                continue
+            batch.append((number, row))
+            if len(batch) >= batch_size:
+                await asyncio.to_thread(self._write_batch, db, batch, overwrite, created_by, report)
+                batch = []
+        if batch:
+            await asyncio.to_thread(self._write_batch, db, batch, overwrite, created_by, report)
+
+        if report.created or report.updated:
+            recommendation_service.invalidate_index()
+        logger.info(
+            f"Imported scenarios: {report.created} created, {report.updated} updated, "
+            f"{report.error_count} failed of {report.lines} lines"
+        )
+        return report.as_dict()
+
+    def _parse_line(self, number: int, text: str, report: ImportReport) -> Optional[Dict]:
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            report.error(number, None, f"Invalid JSON: {e}")
+            return None
+        scenario_id = data.get("scenario_id") if isinstance(data, dict) else None
+        try:
+            line = ScenarioImportLine.model_validate(data)
+            compiled = compile_dialogue_tree(line.dialogue_tree)
+        except ValidationError as e:
+            problems = "; ".join(
+                f"{'.'.join(str(p) for p in err['loc']) or 'line'}: {err['msg']}"
+                for err in e.errors()
+            )
+            report.error(number, scenario_id, problems)
+            return None
+        except DialogueGraphError as e:
+            report.error(number, scenario_id, f"Invalid dialogue tree: {e}")
+            return None
+        return {**line.model_dump(), "compiled_dialogue": compiled}
+
+    def _write_batch(
+        self,
+        db: Session,
+        batch: List[Tuple[int, Dict[str, Any]]],
+        overwrite: bool,
+        created_by: Optional[str],
+        report: ImportReport,
+    ) -> None:
+        # Later lines win over earlier ones with the same scenario_id
+        latest: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        for number, row in batch:
+            previous = latest.get(row["scenario_id"])
+            if previous:
+                report.error(previous[0], row["scenario_id"], f"Superseded by line {number}")
+            latest[row["scenario_id"]] = (number, row)
+
+        existing = dict(
+            db.execute(
+                select(Scenario.scenario_id, Scenario.id).where(
+                    Scenario.scenario_id.in_(list(latest))
+                )
+            ).all()
+        )
+        now = datetime.utcnow()
+        creates, updates = [], []
+        for scenario_id, (number, row) in latest.items():
+            published_at = now if row["status"] == ScenarioStatus.PUBLISHED else None
+            if scenario_id not in existing:
+                creates.append({**row, "created_by": created_by, "published_at": published_at})
+            elif overwrite:
+                updates.append({**row, "id": existing[scenario_id], "updated_at": now})
+            else:
+                report.error(number, scenario_id, "Scenario already exists")
+
+        try:
+            if creates:
+                db.execute(insert(Scenario), creates)
+            if updates:
+                db.execute(update(Scenario), updates)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Scenario import batch failed: {e}")
+            for number, row in latest.values():
+                if row["scenario_id"] not in existing or overwrite:
+                    report.error(number, row["scenario_id"], f"Batch not written: {e}")
+            return
+
+        report.created += len(creates)
+        report.updated += len(updates)
+        for row in updates:
+            scenario_registry.invalidate(row["id"])
+
+
+async def _ndjson_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Yield (line number, text) for each non-blank line of a byte stream"""
+    # Bytes of the unfinished line; only joined and split once it ends, so a
+    # long line spread over many chunks is not rescanned for every chunk
+    pending: List[bytes] = []
+    number = 0
+    async for chunk in chunks:
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            pending.append(chunk)
+            continue
+        pending.append(chunk[:end])
+        complete = b"".join(pending).split(b"\n")
+        pending = [chunk[end + 1 :]]
+        for raw in complete:
+            number += 1
+            text = raw.decode("utf-8", errors="replace").strip()
+            if text:
+                yield number, text
+    tail = b"".join(pending)
+    if tail.strip():
+        yield number + 1, tail.decode("utf-8", errors="replace").strip()
+
+
+def _enum_value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+# Create singleton instance
+scenario_transfer_service = ScenarioTransferService()
@@ -0,0 +1,130 @@
+"""Post-session assessment, run as a background job"""
+
+import asyncio
+import logging
+from typing import Any, Dict
+
+from app.core.database import SessionLocal
+from app.models.assessment import Assessment
+from app.models.scenario import Scenario
+from app.models.session import Session as SessionModel
+from app.services.assessment_engine import AssessmentEngine
+from app.services.conversation_log import conversation_store
+from app.services.job_queue import JobContext, PermanentJobError, job_queue
+from app.services.leaderboard import leaderboard_service
+from app.services.recommender import recommendation_service
+from app.services.skill_progress import skill_progress_service
+
+logger = logging.getLogger(__name__)
+
+SESSION_ASSESSMENT_JOB = "session_assessment"
+
+
+def create_session_assessment(
+    session_id: str, assessment_id: str, logged_questions: int = 0
+) -> Dict[str, Any]:
+    """
+    Score a completed session and store its assessment.
+
+    Idempotent: if the session already has an assessment it is left as is, so
+    a retried job never creates a second one.
+
+    Args:
+        session_id: Completed session ID
+        assessment_id: ID to give the new assessment (returned to the client
+            when the session was completed)
+        logged_questions: Student messages in the session's conversation log
+            (WebSocket sessions do not update ``questions_asked``)
+
+    Returns:
+        Assessment ID and overall score
+    """
+    db = SessionLocal()
+    try:
+        existing = db.query(Assessment).filter(Assessment.session_id == session_id).first()
+        if existing:
+            return {
+                "assessment_id": existing.assessment_id,
+                "overall_score": existing.overall_score,
+                "created": False,
+            }
+
+        session = db.query(SessionModel).filter(SessionModel.session_id == session_id).first()
+        if not session:
+            raise PermanentJobError(f"Session {session_id} not found")
+
+        scenario = db.query(Scenario).filter(Scenario.id == session.scenario_id).first()
+        if not scenario:
+            raise PermanentJobError(f"Scenario of session {session_id} not found")
+
+        # Build scenario data for assessment engine
+        scenario_data = {
+            "id": scenario.id,
+            "scenario_id": scenario.scenario_id,
+            "title": scenario.title,
+            "assessment_rubric": scenario.assessment_rubric or {},
+        }
+
+        # Build session data for assessment engine
+        questions_asked = max(session.questions_asked or 0, logged_questions)
+        session_data = {
+            "questions_asked": questions_asked,
+            "relevant_questions": questions_asked,  # Simplified: assume all questions are relevant
+            "topics_covered": session.topics_covered or [],
+            "red_flags_caught": session.red_flags_identified or [],
+            "duration": session.duration or 0,
+            "diagnosis_correct": bool(session.diagnosis_correct),
+            "relevance_percentage": 70,  # Default relevance
+        }
+
+        # Calculate assessment using engine
+        engine = AssessmentEngine(scenario_data, session_data)
+        assessment_result = engine.calculate_assessment()
+
+        assessment = Assessment(
+            assessment_id=assessment_id,
+            user_id=session.user_id,
+            session_id=session.session_id,
+            overall_score=assessment_result["overall_score"],
+            history_taking_score=assessment_result["history_taking_score"],
+            clinical_reasoning_score=assessment_result["clinical_reasoning_score"],
+            management_score=assessment_result["management_score"],
+            communication_score=assessment_result["communication_score"],
+            efficiency_score=assessment_result["efficiency_score"],
+            metrics=assessment_result["metrics"],
+            skills_breakdown=assessment_result["skills_breakdown"],
+            feedback_summary=assessment_result["feedback_summary"],
+            strengths=assessment_result["strengths"],
+            areas_for_improvement=assessment_result["areas_for_improvement"],
+        )
+        db.add(assessment)
+        skill_progress_service.record_assessment(
+            db, session.user_id, assessment_result["skills_breakdown"]
+        )
+        leaderboard_service.record_assessment(
+            db, session.user_id, session.session_id, assessment_result["overall_score"]
+        )
+        db.commit()
+        recommendation_service.invalidate_user(session.user_id)
+
+        logger.info(f"Created assessment {assessment_id} for session {session_id}")
+        return {
+            "assessment_id": assessment_id,
+            "overall_score": assessment_result["overall_score"],
+            "created": True,
+        }
+    finally:
+        db.close()
+
+
+@job_queue.handler(SESSION_ASSESSMENT_JOB, queue="assessments")
+async def run_session_assessment_job(ctx: JobContext) -> Dict[str, Any]:
+    """Job handler: payload has ``session_id`` and ``assessment_id``"""
+    session_id = ctx.payload["session_id"]
+    # Streamed, so long conversations are never held in memory at once
+    logged_questions = 0
+    async for message in conversation_store.iter_conversation(session_id):
+        logged_questions += message["role"] == "student"
+    return await asyncio.to_thread(
+        create_session_assessment, session_id, ctx.payload["assessment_id"], logged_questions
+    )
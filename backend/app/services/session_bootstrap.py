@@ -0,0 +1,141 @@
+"""Short-lived per-session bootstrap data warmed when a session is created"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app.core.azure_services import azure_openai_service, azure_speech_service
+from app.core.config import settings
+from app.services.scenario_registry import ScenarioSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class SessionBootstrap:
+    """Everything the WebSocket needs to attach to a new session"""
+
+    __slots__ = ("session_id", "scenario", "opening_line", "opening_audio", "expires_at")
+
+    def __init__(
+        self,
+        session_id: str,
+        scenario: ScenarioSnapshot,
+        opening_line: str,
+        opening_audio: Optional[asyncio.Task],
+        expires_at: float,
+    ):
+        self.session_id = session_id
+        self.scenario = scenario
+        self.opening_line = opening_line
+        self.opening_audio = opening_audio  # Task resolving to audio bytes, if pre-synthesised
+        self.expires_at = expires_at
+
+    @property
+    def system_prompt(self) -> Optional[str]:
+        return self.scenario.system_prompt
+
+    def discard(self):
+        """Cancel pre-synthesis that will no longer be used"""
+        if self.opening_audio is not None and not self.opening_audio.done():
+            self.opening_audio.cancel()
+
+
+class SessionBootstrapCache:
+    """
+    TTL cache of session bootstrap entries keyed by session ID.
+
+    ``create_session`` already has the scenario row loaded, so it resolves the
+    registry snapshot, compiles the patient prompt and picks the opening line
+    there. The WebSocket connect moments later takes the entry and attaches
+    without touching the database. Entries are single-use; a reconnect, a
+    different worker or an expired entry falls back to loading the session
+    from the database.
+    """
+
+    def __init__(self, ttl_seconds: float = 120.0):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, SessionBootstrap] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def warm(
+        self, session_id: str, snapshot: ScenarioSnapshot, presynthesise: bool = False
+    ) -> SessionBootstrap:
+        """
+        Prepare and cache the bootstrap entry for a new session.
+
+        Args:
+            session_id: Session ID
+            snapshot: Registry snapshot of the session's scenario
+            presynthesise: Start synthesising the opening line in the background
+                (requires a running event loop)
+
+        Returns:
+            Cached entry
+        """
+        self._purge_expired()
+
+        if snapshot.system_prompt is None:
+            snapshot.system_prompt = azure_openai_service.build_system_prompt(snapshot)
+
+        graph = snapshot.dialogue_graph
+        root_node = graph.get_node(graph.root_id) or {}
+        opening_line = root_node.get("patient_says", "Hello, doctor.")
+
+        opening_audio = None
+        if presynthesise:
+            opening_audio = asyncio.create_task(self._synthesise(snapshot, opening_line))
+
+        entry = SessionBootstrap(
+            session_id,
+            snapshot,
+            opening_line,
+            opening_audio,
+            time.monotonic() + self.ttl_seconds,
+        )
+        previous = self._entries.pop(session_id, None)
+        if previous is not None:
+            previous.discard()
+        self._entries[session_id] = entry
+        return entry
+
+    def pop(self, session_id: str) -> Optional[SessionBootstrap]:
+        """Take a session's entry, or None if it is missing or expired"""
+        entry = self._entries.pop(session_id, None)
+        if entry is not None and entry.expires_at < time.monotonic():
+            entry.discard()
+            entry = None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    @staticmethod
+    async def _synthesise(snapshot: ScenarioSnapshot, text: str) -> bytes:
+        voice_profile = snapshot.get("patient_profile", {}).get("voice_profile", {})
+        return await azure_speech_service.synthesize_speech(
+            text=text,
+            voice_name=azure_speech_service.get_voice_for_profile(voice_profile),
+            emotional_style=voice_profile.get("emotional_state", "neutral"),
+        )
+
+    def _purge_expired(self):
+        now = time.monotonic()
+        expired = [sid for sid, entry in self._entries.items() if entry.expires_at < now]
+        for session_id in expired:
+            self._entries.pop(session_id).discard()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache size and hit/miss counters"""
+        return {
+            "size": len(self._entries),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# Create singleton instance
+session_bootstrap_cache = SessionBootstrapCache(ttl_seconds=settings.SESSION_BOOTSTRAP_TTL_SECONDS)
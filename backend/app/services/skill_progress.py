@@ -0,0 +1,223 @@
+"""Per-skill progress tracking, updated from every new assessment"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, Mapping
+
+from sqlalchemy import case, func, literal, select, true, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.assessment import Assessment, SkillProgress
+from app.services.assessment_engine import SKILLS
+
+logger = logging.getLogger(__name__)
+
+# Score change (points) from the previous level that counts as a trend
+TREND_THRESHOLD = 5
+
+_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def skill_scores(skills_breakdown: Mapping[str, Any]) -> Dict[str, int]:
+    """
+    Extract the score per skill from an assessment's skills breakdown.
+
+    Args:
+        skills_breakdown: Skill name -> {"score": ..., ...}
+
+    Returns:
+        Skill name -> score (0 when a skill has no score)
+    """
+    return {
+        skill_name: int((skill_data or {}).get("score") or 0)
+        for skill_name, skill_data in skills_breakdown.items()
+    }
+
+
+class SkillProgressService:
+    """
+    Maintains one ``skill_progress`` row per user and skill.
+
+    All skills of an assessment are written with a single multi-row
+    ``INSERT ... ON CONFLICT (user_id, skill_name) DO UPDATE``, so recording
+    an assessment is one statement regardless of how many skills it scores,
+    and concurrent assessments for the same user cannot lose updates. The row
+    keeps the exact running ``score_sum``; ``average_score`` is derived from
+    it on every update instead of being re-averaged from the rounded value.
+    """
+
+    def record_assessment(
+        self, db: Session, user_id: int, skills_breakdown: Mapping[str, Any]
+    ) -> None:
+        """
+        Add an assessment's skill scores to the user's progress.
+
+        Runs in the caller's transaction; the caller commits together with
+        the assessment so progress is counted exactly once per assessment.
+
+        Args:
+            db: Database session
+            user_id: Assessed user
+            skills_breakdown: The assessment's skills breakdown
+        """
+        scores = skill_scores(skills_breakdown or {})
+        if not scores:
+            return
+
+        dialect = db.get_bind().dialect.name
+        if dialect not in _INSERTS:
+            raise NotImplementedError(f"Skill progress upsert is not supported on {dialect}")
+
+        now = datetime.utcnow()
+        stmt = _INSERTS[dialect](SkillProgress).values(
+            [
+                {
+                    "user_id": user_id,
+                    "skill_name": skill_name,
+                    "current_level": score,
+                    "last_score": score,
+                    "average_score": score,
+                    "score_sum": score,
+                    "sessions_count": 1,
+                    "trend": "new",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for skill_name, score in scores.items()
+            ]
+        )
+
+        # In DO UPDATE, SkillProgress columns are the stored row and
+        # ``excluded`` is this assessment's row
+        new = stmt.excluded
+        sessions_count = SkillProgress.sessions_count + 1
+        score_sum = SkillProgress.score_sum + new.score_sum
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SkillProgress.user_id, SkillProgress.skill_name],
+            set_={
+                "previous_level": SkillProgress.current_level,
+                "current_level": new.current_level,
+                "last_score": new.last_score,
+                "sessions_count": sessions_count,
+                "score_sum": score_sum,
+                "average_score": score_sum // sessions_count,
+                "trend": case(
+                    (SkillProgress.current_level.is_(None), SkillProgress.trend),
+                    (
+                        new.current_level > SkillProgress.current_level + TREND_THRESHOLD,
+                        "improving",
+                    ),
+                    (
+                        new.current_level < SkillProgress.current_level - TREND_THRESHOLD,
+                        "declining",
+                    ),
+                    else_="stable",
+                ),
+                "updated_at": new.updated_at,
+            },
+        )
+        db.execute(stmt)
+
+    def rebuild(self, db: Session) -> int:
+        """
+        Recompute the scored skills' rows from the assessments table (caller commits).
+
+        The same set-based rebuild as migration 007: one ``INSERT ... SELECT
+        ... ON CONFLICT DO UPDATE`` over every assessment. Used after
+        assessments are re-scored, and to repair the table. Rows of skills that
+        are not assessment columns are left as they are.
+
+        Returns:
+            Number of rows written
+        """
+        dialect = db.get_bind().dialect.name
+        if dialect not in _INSERTS:
+            raise NotImplementedError(f"Skill progress upsert is not supported on {dialect}")
+
+        # One row per assessment and scored skill
+        scores = union_all(
+            *(
+                select(
+                    Assessment.user_id,
+                    literal(skill).label("skill_name"),
+                    getattr(Assessment, f"{skill}_score").label("score"),
+                    Assessment.created_at,
+                    Assessment.id,
+                ).where(getattr(Assessment, f"{skill}_score").isnot(None))
+                for skill in SKILLS
+            )
+        ).subquery("skill_scores")
+        ranked = select(
+            scores.c.user_id,
+            scores.c.skill_name,
+            scores.c.score,
+            func.row_number()
+            .over(
+                partition_by=(scores.c.user_id, scores.c.skill_name),
+                order_by=(scores.c.created_at.desc(), scores.c.id.desc()),
+            )
+            .label("recency"),
+        ).subquery("ranked")
+        totals = (
+            select(
+                ranked.c.user_id,
+                ranked.c.skill_name,
+                func.count().label("sessions_count"),
+                func.sum(ranked.c.score).label("score_sum"),
+                func.max(case((ranked.c.recency == 1, ranked.c.score))).label("current_level"),
+                func.max(case((ranked.c.recency == 2, ranked.c.score))).label("previous_level"),
+            )
+            .group_by(ranked.c.user_id, ranked.c.skill_name)
+            .subquery("totals")
+        )
+
+        t = totals.c
+        now = datetime.utcnow()
+        source = select(
+            t.user_id,
+            t.skill_name,
+            t.current_level,
+            t.previous_level,
+            case(
+                (t.previous_level.is_(None), "new"),
+                (t.current_level > t.previous_level + TREND_THRESHOLD, "improving"),
+                (t.current_level < t.previous_level - TREND_THRESHOLD, "declining"),
+                else_="stable",
+            ),
+            t.sessions_count,
+            t.current_level,
+            t.score_sum // t.sessions_count,
+            t.score_sum,
+            literal(now),
+            literal(now),
+        ).where(
+            # SQLite needs a WHERE before ON CONFLICT in INSERT ... SELECT
+            true()
+        )
+        columns = [
+            "user_id",
+            "skill_name",
+            "current_level",
+            "previous_level",
+            "trend",
+            "sessions_count",
+            "last_score",
+            "average_score",
+            "score_sum",
+            "created_at",
+            "updated_at",
+        ]
+        stmt = _INSERTS[dialect](SkillProgress).from_select(columns, source)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[SkillProgress.user_id, SkillProgress.skill_name],
+            set_={name: stmt.excluded[name] for name in columns[2:] if name != "created_at"},
+        )
+        written = db.execute(stmt).rowcount
+
+        logger.info(f"Rebuilt skill progress: {written} rows")
+        return written
+
+
+# Create singleton instance
+skill_progress_service = SkillProgressService()
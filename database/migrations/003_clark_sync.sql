@@ -0,0 +1,50 @@
+-- Coach AI Database Schema Migration
+-- Migration 003: Local cache of Clark consultations for incremental sync
+--
+-- clark_consultations holds listing entries fetched from Clark so browsing and
+-- specialty filtering are served locally; clark_sync_state stores the watermark
+-- (newest consultation date/id seen) so each sync only fetches newer entries.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS clark_consultations (
+    id SERIAL PRIMARY KEY,
+    consultation_id VARCHAR(255) UNIQUE NOT NULL,
+    consultation_date TIMESTAMP,
+    specialty VARCHAR(100),
+    diagnosis VARCHAR(255),
+    presenting_complaint TEXT,
+    status VARCHAR(50),
+    data JSONB DEFAULT '{}'::jsonb,
+    first_seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_clark_consultations_date
+    ON clark_consultations(consultation_date, consultation_id);
+CREATE INDEX IF NOT EXISTS idx_clark_consultations_specialty_date
+    ON clark_consultations(specialty, consultation_date, consultation_id);
+
+CREATE TABLE IF NOT EXISTS clark_sync_state (
+    id SERIAL PRIMARY KEY,
+    feed VARCHAR(100) UNIQUE NOT NULL,
+    last_consultation_date TIMESTAMP,
+    last_consultation_id VARCHAR(255),
+    last_synced_at TIMESTAMP,
+    consultations_seen INTEGER DEFAULT 0
+);
+
+-- Lookups from the cache to already-imported scenarios. Unique, so concurrent
+-- imports of one consultation cannot both create a draft (they insert with
+-- ON CONFLICT DO NOTHING); replaces the earlier non-unique index. Existing
+-- duplicate imports must be resolved before this runs.
+DROP INDEX IF EXISTS idx_scenarios_source_clark_consultation_id;
+CREATE UNIQUE INDEX idx_scenarios_source_clark_consultation_id
+    ON scenarios(source_clark_consultation_id)
+    WHERE source_clark_consultation_id IS NOT NULL;
+
+DROP TRIGGER IF EXISTS update_clark_consultations_updated_at ON clark_consultations;
+CREATE TRIGGER update_clark_consultations_updated_at BEFORE UPDATE ON clark_consultations
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+COMMIT;
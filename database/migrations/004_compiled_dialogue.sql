@@ -0,0 +1,13 @@
+-- Coach AI Database Schema Migration
+-- Migration 004: Compiled dialogue graph stored alongside each dialogue tree
+--
+-- compiled_dialogue holds a flat node index (nodes, edges, expected topics,
+-- lowercased triggers) built and validated when a scenario is created or
+-- updated. Rows left NULL (e.g. seeded scenarios) are compiled on load;
+-- scripts/backfill_compiled_dialogue.py stores them after this migration.
+
+BEGIN;
+
+ALTER TABLE scenarios ADD COLUMN IF NOT EXISTS compiled_dialogue JSONB;
+
+COMMIT;
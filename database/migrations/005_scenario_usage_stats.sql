@@ -0,0 +1,32 @@
+-- Coach AI Database Schema Migration
+-- Migration 005: Usage statistics no longer bump scenarios.updated_at
+--
+-- scenarios.updated_at is the version live sessions use to share cached
+-- scenario snapshots. Starting a session increments times_played, which
+-- through update_updated_at_column() moved that version on every play and
+-- forced each new session to reload the scenario. The scenarios trigger now
+-- only stamps updated_at when a column other than the usage statistics
+-- changes, and keeps the old value otherwise.
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION update_scenarios_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF (to_jsonb(NEW) - 'times_played' - 'average_score' - 'average_completion_time' - 'updated_at')
+        IS DISTINCT FROM
+       (to_jsonb(OLD) - 'times_played' - 'average_score' - 'average_completion_time' - 'updated_at')
+    THEN
+        NEW.updated_at = CURRENT_TIMESTAMP;
+    ELSE
+        NEW.updated_at = OLD.updated_at;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS update_scenarios_updated_at ON scenarios;
+CREATE TRIGGER update_scenarios_updated_at BEFORE UPDATE ON scenarios
+    FOR EACH ROW EXECUTE FUNCTION update_scenarios_updated_at_column();
+
+COMMIT;
@@ -0,0 +1,40 @@
+-- Coach AI Database Schema Migration
+-- Migration 006: Persistent background jobs
+--
+-- Post-session assessment and the Clark/Clare bulk jobs run from this table.
+-- Workers in each API process claim due jobs with a conditional UPDATE on
+-- status, renew locked_at while a job runs and return jobs whose lease has
+-- expired to the queue, so no external broker is needed.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id SERIAL PRIMARY KEY,
+    job_id VARCHAR(100) UNIQUE NOT NULL,
+    queue VARCHAR(50) NOT NULL,
+    kind VARCHAR(100) NOT NULL,
+    payload JSONB DEFAULT '{}'::jsonb,
+    dedupe_key VARCHAR(255) UNIQUE,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    run_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_by VARCHAR(255),
+    locked_at TIMESTAMP,
+    progress JSONB,
+    result JSONB,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_kind ON jobs(kind);
+CREATE INDEX IF NOT EXISTS idx_jobs_queue_status_run_at ON jobs(queue, status, run_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_locked_at ON jobs(status, locked_at);
+
+CREATE TRIGGER update_jobs_updated_at BEFORE UPDATE ON jobs
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+COMMIT;
@@ -0,0 +1,87 @@
+-- Coach AI Database Schema Migration
+-- Migration 007: Exact running sums for skill progress
+--
+-- Skill progress is now maintained by one INSERT ... ON CONFLICT (user_id,
+-- skill_name) DO UPDATE per assessment. Each row keeps the exact sum of its
+-- scores in score_sum, and average_score is derived from score_sum and
+-- sessions_count instead of being re-averaged from its rounded value.
+--
+-- Sessions completed through the API never updated skill progress, so the
+-- five scored skills are rebuilt from the assessments table. Other skill
+-- rows keep their counts, with score_sum estimated from the stored average.
+
+BEGIN;
+
+-- The upsert's conflict target (already created by migration 002)
+DO $$ BEGIN
+    ALTER TABLE skill_progress ADD CONSTRAINT skill_progress_user_id_skill_name_key
+        UNIQUE(user_id, skill_name);
+EXCEPTION
+    WHEN duplicate_object OR duplicate_table THEN null;
+END $$;
+
+ALTER TABLE skill_progress ADD COLUMN IF NOT EXISTS score_sum INTEGER NOT NULL DEFAULT 0;
+
+UPDATE skill_progress
+SET score_sum = COALESCE(average_score, 0) * COALESCE(sessions_count, 0)
+WHERE score_sum = 0;
+
+WITH skill_scores AS (
+    SELECT
+        a.user_id,
+        s.skill_name,
+        s.score,
+        ROW_NUMBER() OVER (
+            PARTITION BY a.user_id, s.skill_name ORDER BY a.created_at DESC, a.id DESC
+        ) AS recency
+    FROM assessments a
+    CROSS JOIN LATERAL (VALUES
+        ('history_taking', a.history_taking_score),
+        ('clinical_reasoning', a.clinical_reasoning_score),
+        ('management', a.management_score),
+        ('communication', a.communication_score),
+        ('efficiency', a.efficiency_score)
+    ) AS s(skill_name, score)
+    WHERE s.score IS NOT NULL
+),
+totals AS (
+    SELECT
+        user_id,
+        skill_name,
+        COUNT(*) AS sessions_count,
+        SUM(score) AS score_sum,
+        MAX(score) FILTER (WHERE recency = 1) AS current_level,
+        MAX(score) FILTER (WHERE recency = 2) AS previous_level
+    FROM skill_scores
+    GROUP BY user_id, skill_name
+)
+INSERT INTO skill_progress (
+    user_id, skill_name, current_level, previous_level, trend,
+    sessions_count, last_score, average_score, score_sum
+)
+SELECT
+    user_id,
+    skill_name,
+    current_level,
+    previous_level,
+    CASE
+        WHEN previous_level IS NULL THEN 'new'
+        WHEN current_level > previous_level + 5 THEN 'improving'
+        WHEN current_level < previous_level - 5 THEN 'declining'
+        ELSE 'stable'
+    END,
+    sessions_count,
+    current_level,
+    score_sum / sessions_count,
+    score_sum
+FROM totals
+ON CONFLICT (user_id, skill_name) DO UPDATE SET
+    current_level = EXCLUDED.current_level,
+    previous_level = EXCLUDED.previous_level,
+    trend = EXCLUDED.trend,
+    sessions_count = EXCLUDED.sessions_count,
+    last_score = EXCLUDED.last_score,
+    average_score = EXCLUDED.average_score,
+    score_sum = EXCLUDED.score_sum;
+
+COMMIT;
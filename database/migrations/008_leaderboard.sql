@@ -0,0 +1,51 @@
+-- Coach AI Database Schema Migration
+-- Migration 008: Materialised leaderboard
+--
+-- /analytics/leaderboard averaged every assessment on each request. Each
+-- user now has a running-total row overall (specialty '') and one per
+-- specialty. New assessments update these rows in their own transaction, and
+-- the leaderboard reads the top rows from the ranking indexes.
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS leaderboard_entries (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    specialty VARCHAR(100) NOT NULL DEFAULT '',
+    institution VARCHAR(255),
+    score_sum INTEGER NOT NULL DEFAULT 0,
+    assessments_count INTEGER NOT NULL DEFAULT 0,
+    average_score DOUBLE PRECISION NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_leaderboard_entries_specialty_user UNIQUE (specialty, user_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_leaderboard_entries_user_id ON leaderboard_entries(user_id);
+CREATE INDEX IF NOT EXISTS idx_leaderboard_entries_rank
+    ON leaderboard_entries(specialty, average_score, assessments_count, user_id);
+CREATE INDEX IF NOT EXISTS idx_leaderboard_entries_institution_rank
+    ON leaderboard_entries(specialty, institution, average_score, assessments_count, user_id);
+
+-- Backfill from existing assessments
+INSERT INTO leaderboard_entries (
+    user_id, specialty, institution, score_sum, assessments_count, average_score
+)
+SELECT a.user_id, '', u.institution, SUM(a.overall_score), COUNT(*),
+       SUM(a.overall_score)::DOUBLE PRECISION / COUNT(*)
+FROM assessments a
+JOIN users u ON u.id = a.user_id
+GROUP BY a.user_id, u.institution
+UNION ALL
+SELECT a.user_id, sc.specialty, u.institution, SUM(a.overall_score), COUNT(*),
+       SUM(a.overall_score)::DOUBLE PRECISION / COUNT(*)
+FROM assessments a
+JOIN users u ON u.id = a.user_id
+JOIN sessions s ON s.session_id = a.session_id
+JOIN scenarios sc ON sc.id = s.scenario_id
+GROUP BY a.user_id, u.institution, sc.specialty
+ON CONFLICT (specialty, user_id) DO NOTHING;
+
+CREATE TRIGGER update_leaderboard_entries_updated_at BEFORE UPDATE ON leaderboard_entries
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+COMMIT;
@@ -0,0 +1,29 @@
+-- Coach AI Database Schema Migration
+-- Migration 009: Composite indexes for keyset (cursor) pagination
+--
+-- List endpoints accept a cursor and fetch the rows after the previous
+-- page's last (sort key, id), so each page is an index range scan however
+-- deep it is. These indexes match those orderings. Cursor comparisons never
+-- match NULL sort keys, so the few rows without one are backfilled first.
+
+BEGIN;
+
+UPDATE sessions SET started_at = COALESCE(created_at, CURRENT_TIMESTAMP)
+WHERE started_at IS NULL;
+UPDATE assessments SET created_at = CURRENT_TIMESTAMP WHERE created_at IS NULL;
+
+-- GET /sessions/user/{id} and /sessions/user/{id}/history (newest first)
+CREATE INDEX IF NOT EXISTS idx_sessions_user_started_at_id
+    ON sessions(user_id, started_at, id);
+
+-- GET /assessments/user/{id} (newest first)
+CREATE INDEX IF NOT EXISTS idx_assessments_user_created_at_id
+    ON assessments(user_id, created_at, id);
+
+-- GET /scenarios (published by default, by id)
+CREATE INDEX IF NOT EXISTS idx_scenarios_status_id ON scenarios(status, id);
+
+-- GET /users (admin, optionally by experience level, by id)
+CREATE INDEX IF NOT EXISTS idx_users_experience_level_id ON users(experience_level, id);
+
+COMMIT;
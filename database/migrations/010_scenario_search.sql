@@ -0,0 +1,54 @@
+-- Coach AI Database Schema Migration
+-- Migration 010: Full-text scenario search
+--
+-- GET /scenarios/search matches this generated tsvector with a GIN index.
+-- Weights: A title; B correct diagnosis and presenting complaint; C
+-- description and learning objectives. PostgreSQL keeps the column in step
+-- with every insert and update, so application code never writes it.
+
+BEGIN;
+
+ALTER TABLE scenarios ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(
+            to_tsvector(
+                'english',
+                coalesce(correct_diagnosis, '') || ' ' ||
+                coalesce(patient_profile ->> 'presenting_complaint', '')
+            ),
+            'B'
+        ) ||
+        setweight(
+            to_tsvector(
+                'english',
+                coalesce(description, '') || ' ' || coalesce(learning_objectives::text, '')
+            ),
+            'C'
+        )
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_scenarios_search_vector
+    ON scenarios USING GIN (search_vector);
+
+-- Generated columns are still NULL in NEW inside a BEFORE trigger, so the
+-- usage-stats-only check from migration 005 must ignore search_vector too;
+-- otherwise every times_played bump would look like a content edit
+CREATE OR REPLACE FUNCTION update_scenarios_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF (to_jsonb(NEW) - 'times_played' - 'average_score' - 'average_completion_time'
+            - 'updated_at' - 'search_vector')
+        IS DISTINCT FROM
+       (to_jsonb(OLD) - 'times_played' - 'average_score' - 'average_completion_time'
+            - 'updated_at' - 'search_vector')
+    THEN
+        NEW.updated_at = CURRENT_TIMESTAMP;
+    ELSE
+        NEW.updated_at = OLD.updated_at;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+COMMIT;
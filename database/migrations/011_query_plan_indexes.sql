@@ -0,0 +1,32 @@
+-- Coach AI Database Schema Migration
+-- Migration 011: Composite and partial indexes for the hot read queries
+--
+-- scripts/check_query_plans.py runs EXPLAIN on these queries against a
+-- seeded database and fails if a sequential scan or sort comes back.
+-- Already covered elsewhere:
+--   sessions (user_id, started_at DESC)   idx_sessions_user_started_at_id (009),
+--                                         scanned backwards
+--   assessments (user_id, created_at)     idx_assessments_user_created_at_id (009)
+--   skill_progress (user_id, skill_name)  skill_progress_user_id_skill_name_key (007)
+--
+-- Status columns hold the ORM enum member names ('PUBLISHED', 'COMPLETED').
+
+BEGIN;
+
+-- Dashboard totals and recommendations: a user's completed sessions
+CREATE INDEX IF NOT EXISTS idx_sessions_user_status ON sessions(user_id, status);
+
+-- Session history and dashboard: outer join sessions -> assessments.
+-- Created by 001 already; repeated so databases created from the models
+-- converge on the same index set
+CREATE INDEX IF NOT EXISTS idx_assessments_session_id ON assessments(session_id);
+
+-- Catalogue filtered by specialty and difficulty, in id order
+CREATE INDEX IF NOT EXISTS idx_scenarios_status_specialty_difficulty
+    ON scenarios(status, specialty, difficulty, id);
+
+-- Published catalogue filtered by specialty only, in id order
+CREATE INDEX IF NOT EXISTS idx_scenarios_published_specialty
+    ON scenarios(specialty, id) WHERE status = 'PUBLISHED';
+
+COMMIT;
@@ -0,0 +1,14 @@
+-- Coach AI Database Schema Migration
+-- Migration 012: Resume point for interrupted Clark syncs
+--
+-- A sync that runs out of pages before reaching the watermark now records
+-- the listing offset it got to and the newest consultation it saw, so the
+-- next sync resumes there instead of restarting at offset 0.
+
+BEGIN;
+
+ALTER TABLE clark_sync_state ADD COLUMN IF NOT EXISTS resume_offset INTEGER;
+ALTER TABLE clark_sync_state ADD COLUMN IF NOT EXISTS pending_consultation_date TIMESTAMP;
+ALTER TABLE clark_sync_state ADD COLUMN IF NOT EXISTS pending_consultation_id VARCHAR(255);
+
+COMMIT;
@@ -42,17 +42,17 @@ INSERT INTO scenarios (
                 "pain_location": {
                     "triggers": ["where", "location", "chest"],
                     "patient_says": "It''s right here in the center of my chest, and it feels like a heavy pressure, like an elephant sitting on my chest.",
-                    "next_nodes": ["pain_radiation"]
+                    "next_nodes": []
                 },
                 "pain_character": {
                     "triggers": ["what", "describe", "feel", "type"],
                     "patient_says": "It''s a crushing, heavy pain. I''ve never felt anything like this before. It''s constant and quite severe.",
-                    "next_nodes": ["pain_severity"]
+                    "next_nodes": []
                 },
                 "associated_symptoms": {
                     "triggers": ["other symptoms", "nausea", "sweating", "breathing"],
                     "patient_says": "Yes, I''ve been feeling quite short of breath and I''m sweating a lot. I also feel a bit sick to my stomach.",
-                    "next_nodes": ["risk_factors"]
+                    "next_nodes": []
                 },
                 "past_medical_history": {
                     "triggers": ["medical history", "conditions", "health problems"],
@@ -165,7 +165,7 @@ INSERT INTO scenarios (
                 "gynae_history": {
                     "triggers": ["period", "menstrual", "pregnant", "gynae", "last period"],
                     "patient_says": "My last period was about 2 weeks ago, completely normal. I''m on the contraceptive pill. Definitely not pregnant.",
-                    "next_nodes": ["past_history"]
+                    "next_nodes": []
                 },
                 "past_medical_history": {
                     "triggers": ["medical history", "conditions", "health problems", "operations"],
@@ -270,7 +270,7 @@ INSERT INTO scenarios (
                 "headache_history": {
                     "triggers": ["headaches before", "migraine", "previous"],
                     "patient_says": "I occasionally get tension headaches from work stress, but nothing like this. This is completely different and much, much worse.",
-                    "next_nodes": ["past_history"]
+                    "next_nodes": []
                 },
                 "past_medical_history": {
                     "triggers": ["medical history", "conditions", "health"],
@@ -94,7 +94,8 @@ const ClarkImport: React.FC = () => {
   const loadConsultations = async () => {
     try {
       setLoading(true)
-      const response: ConsultationsResponse = await apiClient.getClarkConsultations(filter || undefined)
+      // Admin page: pull new consultations from Clark before listing the cache
+      const response: ConsultationsResponse = await apiClient.getClarkConsultations(filter || undefined, 20, true)
 
       setConsultations(response.consultations || [])
       setIsMockData(response.is_mock_data || false)
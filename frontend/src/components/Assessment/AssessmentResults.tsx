@@ -15,6 +15,10 @@ interface Assessment {
   skills_breakdown: any
 }
 
+// Wait up to ~30s for the background assessment job
+const ASSESSMENT_POLL_ATTEMPTS = 30
+const ASSESSMENT_POLL_INTERVAL_MS = 1000
+
 const AssessmentResults: React.FC = () => {
   const { sessionId } = useParams<{ sessionId: string }>()
   const navigate = useNavigate()
@@ -30,8 +34,17 @@ const AssessmentResults: React.FC = () => {
       if (!sessionId) return
 
       setLoading(true)
-      const data = await apiClient.getAssessmentBySession(sessionId)
-      setAssessment(data)
+      // The assessment is scored in the background after the session completes
+      for (let attempt = 0; ; attempt++) {
+        try {
+          const data = await apiClient.getAssessmentBySession(sessionId)
+          setAssessment(data)
+          break
+        } catch (error: any) {
+          if (error?.response?.status !== 404 || attempt >= ASSESSMENT_POLL_ATTEMPTS) throw error
+          await new Promise((resolve) => setTimeout(resolve, ASSESSMENT_POLL_INTERVAL_MS))
+        }
+      }
     } catch (error) {
       console.error('Error loading assessment:', error)
     } finally {
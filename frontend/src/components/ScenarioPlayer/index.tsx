@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from 'react'
+import React, { useEffect, useRef, useState } from 'react'
 import { useParams, useNavigate } from 'react-router-dom'
 import apiClient from '../../services/api'
 import wsService from '../../services/websocket'
@@ -37,6 +37,9 @@ const ScenarioPlayer: React.FC = () => {
   const [guidelinesSearch, setGuidelinesSearch] = useState('')
   const [guidelines, setGuidelines] = useState<Guideline[]>([])
   const [guidelinesLoading, setGuidelinesLoading] = useState(false)
+  // The server resends the opening line on every (re)connect; show and play it once
+  const openingShown = useRef(false)
+  const openingPlayed = useRef(false)
 
   useEffect(() => {
     initializeScenario()
@@ -60,23 +63,15 @@ const ScenarioPlayer: React.FC = () => {
       const sessionData = await apiClient.createSession(scenarioId, user.id)
       setSession(sessionData)
 
-      // Connect WebSocket
-      await wsService.connect(sessionData.session_id)
-
-      // Set up message handler
+      // Set up message handler before connecting: the server sends the
+      // patient's opening line (and its audio) as soon as the socket opens
+      openingShown.current = false
+      openingPlayed.current = false
+      setMessages([])
       wsService.onMessage(handleWebSocketMessage)
 
-      // Get initial patient message
-      const initialMessage: Message = {
-        role: 'patient',
-        message: scenarioData.dialogue_tree?.root?.patient_says || 'Hello, doctor.',
-        timestamp: new Date().toISOString(),
-      }
-
-      setMessages([initialMessage])
-
-      // Generate and play initial audio
-      await generateAndPlayAudio(initialMessage.message, scenarioData.patient_profile?.voice_profile)
+      // Connect WebSocket
+      await wsService.connect(sessionData.session_id)
     } catch (error) {
       console.error('Error initializing scenario:', error)
     } finally {
@@ -86,6 +81,11 @@ const ScenarioPlayer: React.FC = () => {
 
   const handleWebSocketMessage = async (data: any) => {
     if (data.type === 'patient_response') {
+      if (data.opening) {
+        if (openingShown.current) return
+        openingShown.current = true
+      }
+
       const newMessage: Message = {
         role: 'patient',
         message: data.message,
@@ -95,39 +95,45 @@ const ScenarioPlayer: React.FC = () => {
 
       setMessages((prev) => [...prev, newMessage])
 
-      // Play audio if available (base64 encoded)
+      // Audio normally follows in a separate patient_audio frame
       if (data.audio_base64) {
-        try {
-          // Convert base64 to Blob
-          const audioData = atob(data.audio_base64)
-          const audioArray = new Uint8Array(audioData.length)
-          for (let i = 0; i < audioData.length; i++) {
-            audioArray[i] = audioData.charCodeAt(i)
-          }
-          const audioBlob = new Blob([audioArray], { type: 'audio/wav' })
-          await audioService.playAudioBlob(audioBlob)
-        } catch (error) {
-          console.error('Error playing audio:', error)
-        }
+        await playBase64Audio(data.audio_base64)
       } else if (data.audio_url) {
         // Fallback to URL-based audio
         audioService.playAudioUrl(data.audio_url)
       }
+    } else if (data.type === 'patient_audio') {
+      if (data.opening) {
+        if (openingPlayed.current) return
+        openingPlayed.current = true
+      }
+
+      // Sent after the text reply; skipped if synthesis missed its deadline
+      if (data.audio_base64) {
+        await playBase64Audio(data.audio_base64)
+      } else if (data.skipped) {
+        console.info(`Patient audio skipped (${data.skipped}) for turn ${data.turn_id}`)
+      }
+    } else if (data.type === 'turn_cancelled') {
+      // Superseded by a newer student message; its reply will never arrive
+      console.info('Patient turn cancelled:', data.turn_id)
     } else if (data.type === 'error') {
       console.error('WebSocket error:', data.message)
     }
   }
 
-  const generateAndPlayAudio = async (text: string, voiceProfile?: any) => {
+  const playBase64Audio = async (audioBase64: string) => {
     try {
-      const audioBlob = await apiClient.synthesizeSpeech(
-        text,
-        voiceProfile?.voice_id,
-        voiceProfile?.emotional_state || 'neutral'
-      )
+      // Convert base64 to Blob
+      const audioData = atob(audioBase64)
+      const audioArray = new Uint8Array(audioData.length)
+      for (let i = 0; i < audioData.length; i++) {
+        audioArray[i] = audioData.charCodeAt(i)
+      }
+      const audioBlob = new Blob([audioArray], { type: 'audio/wav' })
       await audioService.playAudioBlob(audioBlob)
     } catch (error) {
-      console.error('Error generating audio:', error)
+      console.error('Error playing audio:', error)
     }
   }
 
@@ -78,6 +78,17 @@ class ApiClient {
     return response.data
   }
 
+  async searchScenarios(params: { q: string; specialty?: string; difficulty?: string; offset?: number; limit?: number }) {
+    const cleanParams: Record<string, string | number> = {}
+    Object.entries(params).forEach(([key, value]) => {
+      if (value !== undefined && value !== '') {
+        cleanParams[key] = value
+      }
+    })
+    const response = await this.client.get('/scenarios/search', { params: cleanParams })
+    return response.data
+  }
+
   async getScenario(scenarioId: string) {
     const response = await this.client.get(`/scenarios/${scenarioId}`)
     return response.data
@@ -217,9 +228,14 @@ class ApiClient {
     return response.data
   }
 
-  async getProgressTrend(userId: number, skill?: string, days = 30) {
+  async getProgressTrend(
+    userId: number,
+    skill?: string,
+    days = 30,
+    bucket: 'day' | 'week' | 'month' = 'day'
+  ) {
     const response = await this.client.get(`/analytics/user/${userId}/progress-trend`, {
-      params: { skill, days },
+      params: { skill, days, bucket },
     })
     return response.data
   }
@@ -247,9 +263,9 @@ class ApiClient {
     return response.data
   }
 
-  async getLeaderboard(specialty?: string, limit = 10) {
+  async getLeaderboard(specialty?: string, limit = 10, offset = 0, institution?: string) {
     const response = await this.client.get('/analytics/leaderboard', {
-      params: { specialty, limit },
+      params: { specialty, institution, limit, offset },
     })
     return response.data
   }
@@ -304,8 +320,8 @@ class ApiClient {
   }
 
   // Clark Integration - Import Consultations
-  async getClarkConsultations(specialty?: string, limit: number = 20) {
-    const params: Record<string, string | number> = { limit }
+  async getClarkConsultations(specialty?: string, limit: number = 20, sync: boolean = false) {
+    const params: Record<string, string | number | boolean> = { limit, sync }
     if (specialty) params.specialty = specialty
     const response = await this.client.get('/clark/consultations', { params })
     return response.data
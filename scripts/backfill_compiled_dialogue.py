@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Compile dialogue trees for scenarios that have no stored compiled dialogue.
+
+Migration 004 adds ``scenarios.compiled_dialogue`` without filling it; rows
+created before it (including the seeded scenarios) are compiled leniently on
+every load until they are backfilled. This script compiles each such row's
+dialogue tree with ``compile_dialogue_tree`` and stores the result. Trees are
+never modified; problems found while compiling are logged for content owners
+to fix through the scenario editor.
+
+Uses the database configured by ``DATABASE_URL``.
+
+Usage:
+    python scripts/backfill_compiled_dialogue.py [--batch-size 200] [--dry-run]
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.core.database import SessionLocal  # noqa: E402
+from app.models import Scenario  # noqa: E402
+from app.services.dialogue_graph import DialogueGraphError, compile_dialogue_tree  # noqa: E402
+
+logger = logging.getLogger("backfill_compiled_dialogue")
+
+
+def backfill(batch_size: int, dry_run: bool) -> int:
+    """Compile and store missing compiled dialogues, returning the number of rows"""
+    db = SessionLocal()
+    done = 0
+    last_id = 0
+    try:
+        while True:
+            rows = (
+                db.query(Scenario.id, Scenario.scenario_id, Scenario.dialogue_tree)
+                .filter(Scenario.compiled_dialogue.is_(None), Scenario.id > last_id)
+                .order_by(Scenario.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            for row in rows:
+                logger.info(f"Compiling {row.scenario_id}")
+                try:
+                    compiled = compile_dialogue_tree(row.dialogue_tree or {}, strict=False)
+                except DialogueGraphError as e:
+                    logger.warning(f"Skipping {row.scenario_id}: {e}")
+                    continue
+                done += 1
+                if not dry_run:
+                    db.query(Scenario).filter(Scenario.id == row.id).update(
+                        {Scenario.compiled_dialogue: compiled}, synchronize_session=False
+                    )
+            if not dry_run:
+                db.commit()
+    finally:
+        db.close()
+    return done
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--dry-run", action="store_true", help="Compile without storing")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(message)s")
+    done = backfill(args.batch_size, args.dry_run)
+    action = "would be backfilled" if args.dry_run else "backfilled"
+    print(f"{done} scenarios {action}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
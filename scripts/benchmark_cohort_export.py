@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Measure cohort export throughput and memory on a synthetic dataset.
+
+Seeds a database with users across institutions, scenarios, and (by
+default) a million sessions with short transcripts, four in five of them
+assessed. It then streams the cohort export in each format and reports
+rows per second and MB per second. Memory is checked separately: the peak
+Python allocation while exporting a tenth of the sessions (by date range)
+is compared with exporting all of them, and should not grow with the row
+count.
+
+Uses a throwaway SQLite file by default; pass --database-url to measure
+against a scratch PostgreSQL database, where ``yield_per`` uses a
+server-side cursor (tables are created and left there).
+
+Usage:
+    python scripts/benchmark_cohort_export.py [--sessions 1000000] [--users 5000]
+        [--database-url URL] [--skip-memory]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# Settings are required at import time; the benchmark uses its own engine
+for _name, _value in {
+    "DATABASE_URL": "sqlite:///:memory:",
+    "DATABASE_URL_ASYNC": "sqlite+aiosqlite:///:memory:",
+    "AZURE_SPEECH_KEY": "benchmark",
+    "AZURE_OPENAI_KEY": "benchmark",
+    "AZURE_OPENAI_ENDPOINT": "https://benchmark.invalid",
+    "JWT_SECRET_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.core.database import Base  # noqa: E402
+from app.models import Assessment, Scenario, Session, SessionStatus, User  # noqa: E402
+from app.services.cohort_export import CohortExportService  # noqa: E402
+
+INSTITUTIONS = ["Imperial", "UCL", "King's", "Edinburgh", "Manchester"]
+SPECIALTIES = ["Cardiology", "Respiratory", "Gastroenterology", "Neurology", "General"]
+START = datetime(2024, 1, 1)
+BATCH = 20000
+
+
+def seed(db, users: int, scenarios: int, sessions: int) -> None:
+    rng = random.Random(50)
+    db.execute(
+        insert(User),
+        [
+            {
+                "id": pk,
+                "email": f"student{pk}@example.com",
+                "username": f"student{pk}",
+                "first_name": "A",
+                "last_name": "B",
+                "institution": INSTITUTIONS[pk % len(INSTITUTIONS)],
+            }
+            for pk in range(1, users + 1)
+        ],
+    )
+    db.execute(
+        insert(Scenario),
+        [
+            {
+                "id": pk,
+                "scenario_id": f"bench_{pk}",
+                "title": f"Scenario {pk}",
+                "specialty": SPECIALTIES[pk % len(SPECIALTIES)],
+                "patient_profile": {},
+                "dialogue_tree": {},
+                "assessment_rubric": {},
+            }
+            for pk in range(1, scenarios + 1)
+        ],
+    )
+    transcript = [
+        {"role": "student", "message": "What brings you in today?"},
+        {"role": "patient", "message": "I've had chest pain since this morning."},
+    ]
+    for first in range(1, sessions + 1, BATCH):
+        session_rows, assessment_rows = [], []
+        for pk in range(first, min(first + BATCH, sessions + 1)):
+            session_id = f"bench_session_{pk}"
+            completed = pk % 5 != 0
+            session_rows.append(
+                {
+                    "id": pk,
+                    "session_id": session_id,
+                    "user_id": rng.randint(1, users),
+                    "scenario_id": rng.randint(1, scenarios),
+                    "status": SessionStatus.COMPLETED if completed else SessionStatus.IN_PROGRESS,
+                    # Evenly spread over 1000 days, in id order
+                    "started_at": START + timedelta(days=1000 * pk / sessions),
+                    "duration": 600,
+                    "transcript": transcript,
+                }
+            )
+            if completed:
+                assessment_rows.append(
+                    {
+                        "assessment_id": f"bench_assessment_{pk}",
+                        "user_id": session_rows[-1]["user_id"],
+                        "session_id": session_id,
+                        "overall_score": rng.randint(40, 100),
+                        "history_taking_score": rng.randint(40, 100),
+                        "clinical_reasoning_score": rng.randint(40, 100),
+                    }
+                )
+        db.execute(insert(Session), session_rows)
+        db.execute(insert(Assessment), assessment_rows)
+        db.commit()
+
+
+def consume(service, export_format, **filters):
+    """Drain one export; returns (rows, bytes, seconds)"""
+    started = time.perf_counter()
+    size = lines = 0
+    for chunk in service.stream(export_format, **filters):
+        size += len(chunk)
+        lines += chunk.count(b"\n")
+    rows = lines - 1 if export_format == "csv" else lines
+    return rows, size, time.perf_counter() - started
+
+
+def peak_memory(service, **filters) -> float:
+    """Peak traced allocation (MB) while draining one NDJSON export"""
+    tracemalloc.start()
+    consume(service, "ndjson", **filters)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--scenarios", type=int, default=200)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--skip-memory", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{tmp}/benchmark.db"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        Session_ = sessionmaker(bind=engine)
+        started = time.perf_counter()
+        db = Session_()
+        seed(db, args.users, args.scenarios, args.sessions)
+        db.close()
+        print(f"Seeded {args.sessions:,} sessions in {time.perf_counter() - started:.1f}s")
+
+        service = CohortExportService(Session_)
+        cases = {
+            "csv": ("csv", {}),
+            "ndjson": ("ndjson", {}),
+            "ndjson + transcripts": ("ndjson", {"include_transcript": True}),
+            "csv, one institution": ("csv", {"institution": INSTITUTIONS[0]}),
+        }
+        print(f"{'Export':<24}{'rows':>12}{'MB':>9}{'seconds':>10}{'rows/s':>12}{'MB/s':>8}")
+        for name, (export_format, filters) in cases.items():
+            rows, size, seconds = consume(service, export_format, **filters)
+            mb = size / 1024 / 1024
+            print(
+                f"{name:<24}{rows:>12,}{mb:>9.1f}{seconds:>10.2f}"
+                f"{rows / seconds:>12,.0f}{mb / seconds:>8.1f}"
+            )
+
+        if not args.skip_memory:
+            tenth = {"started_to": START + timedelta(days=100)}
+            small = peak_memory(service, include_transcript=True, **tenth)
+            full = peak_memory(service, include_transcript=True)
+            print(f"Peak traced memory: {small:.1f} MB for 10% of sessions, {full:.1f} MB for all")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Compare list-endpoint pages with full rows against column projections.
+
+Seeds a database with scenarios carrying realistic dialogue trees and
+sessions carrying long transcripts, then fetches pages of the scenario list
+and the user session list twice: loading whole ORM rows (the old queries)
+and with ``load_only_for`` the response model. For each it reports the
+bytes of column data fetched per page and the median latency per page,
+including serialisation through the response model.
+
+Uses a throwaway SQLite file by default; pass --database-url to measure
+against a scratch PostgreSQL database (tables are created and left there).
+
+Usage:
+    python scripts/benchmark_list_projection.py [--scenarios 500] [--sessions 2000]
+        [--page-size 50] [--repeat 20] [--database-url URL]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# Settings are required at import time; the benchmark uses its own engine
+for _name, _value in {
+    "DATABASE_URL": "sqlite:///:memory:",
+    "DATABASE_URL_ASYNC": "sqlite+aiosqlite:///:memory:",
+    "AZURE_SPEECH_KEY": "benchmark",
+    "AZURE_OPENAI_KEY": "benchmark",
+    "AZURE_OPENAI_ENDPOINT": "https://benchmark.invalid",
+    "JWT_SECRET_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.api.scenarios import ScenarioListItem  # noqa: E402
+from app.api.sessions import SessionListItem  # noqa: E402
+from app.core.database import Base  # noqa: E402
+from app.core.projection import load_only_for  # noqa: E402
+from app.models import Scenario, ScenarioStatus, Session, SessionStatus, User  # noqa: E402
+
+
+def dialogue_tree(nodes: int) -> dict:
+    return {
+        "root": {
+            "node_id": "greeting",
+            "patient_says": "Doctor, I have this terrible pain in my chest.",
+            "branches": {
+                f"branch_{i}": {
+                    "triggers": ["where", "when", "how long", "describe", f"topic {i}"],
+                    "patient_says": "It started about two hours ago and it's getting worse. " * 3,
+                    "reveals": [f"fact_{i}"],
+                }
+                for i in range(nodes)
+            },
+        }
+    }
+
+
+def transcript(turns: int) -> list:
+    return [
+        {
+            "role": "student" if i % 2 else "patient",
+            "message": "Can you tell me more about when the pain started and what helps? " * 2,
+            "timestamp": "2025-01-15T10:30:00",
+        }
+        for i in range(turns)
+    ]
+
+
+def seed(db, scenarios: int, sessions: int) -> None:
+    db.add(User(id=1, email="bench@example.com", username="bench", first_name="A", last_name="B"))
+    db.commit()
+    tree = dialogue_tree(40)
+    db.execute(
+        insert(Scenario),
+        [
+            {
+                "scenario_id": f"bench_{i}",
+                "title": f"Scenario {i}",
+                "specialty": "Cardiology",
+                "status": ScenarioStatus.PUBLISHED,
+                "patient_profile": {"name": "Patient", "age": 58, "history": "x" * 2000},
+                "dialogue_tree": tree,
+                "assessment_rubric": {"must_ask": [f"topic_{j}" for j in range(20)]},
+            }
+            for i in range(scenarios)
+        ],
+    )
+    log = transcript(40)
+    db.execute(
+        insert(Session),
+        [
+            {
+                "session_id": f"bench_session_{i}",
+                "user_id": 1,
+                "scenario_id": i % scenarios + 1,
+                "status": SessionStatus.COMPLETED,
+                "duration": 600,
+                "transcript": log,
+                "nodes_visited": [f"branch_{j}" for j in range(30)],
+                "topics_covered": [f"topic_{j}" for j in range(15)],
+            }
+            for i in range(sessions)
+        ],
+    )
+    db.commit()
+
+
+def page_bytes(db, query) -> int:
+    """Size of the column values the query fetches (as the driver returns them)"""
+    total = 0
+    for row in db.connection().execute(query.statement):
+        for value in row:
+            if value is not None:
+                total += len(value) if isinstance(value, (str, bytes)) else len(str(value))
+    return total
+
+
+def measure(Session_, build_query, schema, repeat: int):
+    latencies = []
+    for _ in range(repeat):
+        db = Session_()
+        started = time.perf_counter()
+        rows = build_query(db).all()
+        [schema.model_validate(row).model_dump() for row in rows]
+        latencies.append(time.perf_counter() - started)
+        db.close()
+    db = Session_()
+    size = page_bytes(db, build_query(db))
+    db.close()
+    return size, statistics.median(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scenarios", type=int, default=500)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{tmp}/benchmark.db"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        Session_ = sessionmaker(bind=engine)
+        db = Session_()
+        seed(db, args.scenarios, args.sessions)
+        db.close()
+
+        limit = args.page_size
+        cases = {
+            "GET /scenarios": (
+                ScenarioListItem,
+                lambda db: db.query(Scenario)
+                .filter(Scenario.status == ScenarioStatus.PUBLISHED)
+                .limit(limit),
+                lambda db: db.query(Scenario)
+                .options(load_only_for(Scenario, ScenarioListItem))
+                .filter(Scenario.status == ScenarioStatus.PUBLISHED)
+                .limit(limit),
+            ),
+            "GET /sessions/user/{id}": (
+                SessionListItem,
+                lambda db: db.query(Session)
+                .filter(Session.user_id == 1)
+                .order_by(Session.started_at.desc())
+                .limit(limit),
+                lambda db: db.query(Session)
+                .options(load_only_for(Session, SessionListItem))
+                .filter(Session.user_id == 1)
+                .order_by(Session.started_at.desc())
+                .limit(limit),
+            ),
+        }
+
+        print(f"Page size: {limit} rows, median of {args.repeat} runs")
+        print(f"{'Endpoint':<26}{'':<12}{'KB/page':>12}{'ms/page':>10}")
+        for name, (schema, full, projected) in cases.items():
+            full_bytes, full_ms = measure(Session_, full, schema, args.repeat)
+            proj_bytes, proj_ms = measure(Session_, projected, schema, args.repeat)
+            print(f"{name:<26}{'full rows':<12}{full_bytes / 1024:>12,.1f}{full_ms:>10.2f}")
+            print(f"{'':<26}{'projected':<12}{proj_bytes / 1024:>12,.1f}{proj_ms:>10.2f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Compare per-session and vectorised assessment scoring throughput.
+
+Generates synthetic session metrics over a few scenario rubrics, scores them
+once with ``AssessmentEngine`` per session (the path a loop over the ORM
+would take) and once with the columnar ``score_batch`` path used by the
+re-scoring job, checks that every skill and overall score matches, and
+reports assessments per second for both.
+
+No database is needed: the rows are built in memory.
+
+Usage:
+    python scripts/benchmark_rescoring.py [--rows 100000] [--seed 7]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# Settings are required at import time; the benchmark never connects to them
+for _name, _value in {
+    "DATABASE_URL": "sqlite:///:memory:",
+    "DATABASE_URL_ASYNC": "sqlite+aiosqlite:///:memory:",
+    "AZURE_SPEECH_KEY": "benchmark",
+    "AZURE_OPENAI_KEY": "benchmark",
+    "AZURE_OPENAI_ENDPOINT": "https://benchmark.invalid",
+    "JWT_SECRET_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from app.services.assessment_engine import SKILLS, AssessmentEngine  # noqa: E402
+from app.services.batch_scoring import RubricRules, ScoringBatch, score_batch  # noqa: E402
+
+TOPICS = [
+    "pain_location",
+    "pain_quality",
+    "radiation",
+    "associated_symptoms",
+    "onset",
+    "past_medical_history",
+    "medications",
+    "allergies",
+    "social_history",
+    "family_history",
+]
+RED_FLAGS = ["crushing_pain", "radiation_to_arm", "sweating", "syncope", "weight_loss"]
+
+RUBRICS = [
+    {"must_ask": TOPICS[:4], "red_flags": RED_FLAGS[:3]},
+    {"must_ask": TOPICS[2:9], "red_flags": RED_FLAGS[3:], "time_limit": 10},
+    {"must_ask": [], "red_flags": [], "time_limit": 20},
+    {"must_ask": TOPICS, "red_flags": RED_FLAGS[:1], "time_limit": 12},
+]
+
+# Weights that differ from the defaults, as after a faculty change
+WEIGHTS = {
+    "history_taking": 0.35,
+    "clinical_reasoning": 0.30,
+    "management": 0.10,
+    "communication": 0.15,
+    "efficiency": 0.10,
+}
+
+
+def make_rows(count: int, rng: random.Random) -> list:
+    rows = []
+    for _ in range(count):
+        questions = rng.choice([0, rng.randint(1, 40)])
+        metrics = {
+            "questions_asked": questions,
+            "relevant_questions": rng.randint(0, questions),
+            "topics_covered": rng.sample(TOPICS, rng.randint(0, len(TOPICS))),
+            "red_flags_caught": rng.sample(RED_FLAGS, rng.randint(0, len(RED_FLAGS))),
+            "duration": rng.choice([0, rng.randint(30, 1800)]),
+            "diagnosis_correct": rng.random() < 0.6,
+            "relevance_percentage": rng.choice([50, 70, rng.randint(0, 100)]),
+        }
+        rows.append((metrics, rng.randrange(len(RUBRICS))))
+    return rows
+
+
+def score_per_row(rows: list) -> list:
+    results = []
+    for metrics, rubric_index in rows:
+        engine = AssessmentEngine({"assessment_rubric": RUBRICS[rubric_index]}, metrics, WEIGHTS)
+        results.append(engine.calculate_assessment())
+    return results
+
+
+def score_vectorised(rows: list) -> dict:
+    rules = [RubricRules(rubric) for rubric in RUBRICS]
+    batch = ScoringBatch.from_rows((metrics, rules[index]) for metrics, index in rows)
+    return score_batch(batch, WEIGHTS)
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=100000, help="Assessments to score")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed for the metrics")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, random.Random(args.seed))
+
+    per_row, per_row_seconds = timed(score_per_row, rows)
+    vectorised, vectorised_seconds = timed(score_vectorised, rows)
+
+    mismatches = 0
+    for i, expected in enumerate(per_row):
+        if expected["overall_score"] != vectorised["overall"][i] or any(
+            expected[f"{skill}_score"] != vectorised[skill][i] for skill in SKILLS
+        ):
+            mismatches += 1
+
+    print(f"Assessments:          {len(rows):,}")
+    print(f"Per-session engine:   {per_row_seconds:.3f}s ({len(rows) / per_row_seconds:,.0f}/s)")
+    print(
+        f"Vectorised batch:     {vectorised_seconds:.3f}s "
+        f"({len(rows) / vectorised_seconds:,.0f}/s)"
+    )
+    print(f"Speed-up:             {per_row_seconds / vectorised_seconds:.1f}x")
+    print(f"Score mismatches:     {mismatches}")
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Measure per-session memory of live ScenarioEngine instances.
+
+Builds many engines on one shared scenario snapshot (as the WebSocket endpoint
+does via the scenario registry), plays a number of student turns through each
+with the OpenAI call replaced by a canned reply, and reports the traced heap
+growth per session and the resulting sessions-per-GB capacity figure.
+
+No database or Azure access is needed: engines are built without a session ID,
+so turns leaving the in-memory conversation window are dropped, not written.
+
+Usage:
+    python scripts/benchmark_session_memory.py [--sessions 2000] [--turns 20]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# Settings are required at import time; the benchmark never connects to them
+for _name, _value in {
+    "DATABASE_URL": "sqlite:///:memory:",
+    "DATABASE_URL_ASYNC": "sqlite+aiosqlite:///:memory:",
+    "AZURE_SPEECH_KEY": "benchmark",
+    "AZURE_OPENAI_KEY": "benchmark",
+    "AZURE_OPENAI_ENDPOINT": "https://benchmark.invalid",
+    "JWT_SECRET_KEY": "benchmark",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from app.services import scenario_engine  # noqa: E402
+from app.services.scenario_engine import ScenarioEngine  # noqa: E402
+from app.services.scenario_registry import ScenarioRegistry  # noqa: E402
+
+STUDENT_QUESTIONS = [
+    "Where exactly is the pain?",
+    "Can you describe the pain, is it sharp or crushing?",
+    "Does it spread to your arm or jaw?",
+    "How long have you had it, did it start an hour ago?",
+    "Are you feeling sweating, nausea or breathless?",
+    "Any past medical history or conditions you've been diagnosed with?",
+    "What medication are you taking?",
+    "Do you have any allergies?",
+    "Do you smoke or drink alcohol?",
+    "Any family history of heart problems?",
+]
+
+PATIENT_REPLY = {
+    "text": "It's a heavy pressure right in the middle of my chest, and it's been going on "
+    "for about two hours now.",
+    "emotion": "fearful",
+}
+
+SCENARIO = {
+    "id": "1",
+    "title": "Acute Chest Pain",
+    "specialty": "Cardiology",
+    "patient_profile": {
+        "name": "Mr. Robert Thompson",
+        "age": 58,
+        "gender": "male",
+        "presenting_complaint": "Severe chest pain for 2 hours",
+        "voice_profile": {"accent": "British", "emotional_state": "anxious"},
+    },
+    "dialogue_tree": {
+        "root": {
+            "node_id": "greeting",
+            "patient_says": "Doctor, I have this terrible pain in my chest.",
+            "branches": {
+                "pain_location": {
+                    "triggers": ["where", "location", "chest"],
+                    "patient_says": "Right in the centre of my chest.",
+                },
+                "pain_character": {
+                    "triggers": ["describe", "feel", "type"],
+                    "patient_says": "It's a crushing, heavy pain.",
+                },
+                "associated_symptoms": {
+                    "triggers": ["nausea", "sweating", "breathing"],
+                    "patient_says": "I feel sick and I've been sweating.",
+                },
+            },
+        }
+    },
+    "assessment_rubric": {
+        "must_ask": ["pain_location", "pain_quality", "radiation", "associated_symptoms"],
+        "red_flags": ["crushing_pain", "radiation_to_arm", "sweating"],
+    },
+}
+
+
+async def _canned_reply(**kwargs):
+    # Fresh strings per turn, as real model output would be
+    return {
+        "text": f"{PATIENT_REPLY['text']} ({kwargs['student_message'][:8]})",
+        "emotion": PATIENT_REPLY["emotion"],
+    }
+
+
+async def _canned_summary(previous_summary, messages, max_tokens=200):
+    return f"{previous_summary}\n- {len(messages)} more turns"[-400:]
+
+
+async def build_sessions(count: int, turns: int, snapshot) -> list:
+    engines = []
+    for _ in range(count):
+        engine = ScenarioEngine(snapshot)
+        for turn in range(turns):
+            question = STUDENT_QUESTIONS[turn % len(STUDENT_QUESTIONS)]
+            await engine.process_student_input(f"{question} ({turn})")
+            # Yield so background summary updates run between turns, as they
+            # would while waiting on the student
+            await asyncio.sleep(0)
+        engines.append(engine)
+    return engines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=2000, help="Engines to build")
+    parser.add_argument("--turns", type=int, default=20, help="Student turns per session")
+    args = parser.parse_args()
+
+    scenario_engine.azure_openai_service.generate_patient_response = _canned_reply
+    scenario_engine.azure_openai_service.summarise_conversation = _canned_summary
+    snapshot = ScenarioRegistry().put(1, None, SCENARIO)
+
+    # Warm up once so lazily created module state is not attributed to sessions
+    asyncio.run(build_sessions(1, args.turns, snapshot))
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    engines = asyncio.run(build_sessions(args.sessions, args.turns, snapshot))
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    per_session = (after - before) / len(engines)
+    sessions_per_gb = (1024**3) / per_session if per_session else float("inf")
+
+    print(f"Sessions:            {len(engines)}")
+    print(f"Turns per session:   {args.turns}")
+    print(f"Bytes per session:   {per_session:,.0f}")
+    print(f"Peak traced memory:  {peak / 1024**2:,.1f} MiB")
+    print(f"Sessions per GB:     {sessions_per_gb:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Check that the user dashboard runs a fixed number of queries.
+
+Seeds an in-memory SQLite database with a user whose history grows from a
+handful to a few thousand completed sessions (each with an assessment),
+calls the dashboard endpoint at each size while counting the SQL statements
+it executes, and fails if the count changes with history size or exceeds
+the expected bound. The returned totals are checked against the seeded data.
+
+Usage:
+    python scripts/check_dashboard_queries.py [--sizes 5 50 500 2000] [--max-queries 5]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# Settings are required at import time; the check uses its own in-memory database
+for _name, _value in {
+    "DATABASE_URL": "sqlite:///:memory:",
+    "DATABASE_URL_ASYNC": "sqlite+aiosqlite:///:memory:",
+    "AZURE_SPEECH_KEY": "check",
+    "AZURE_OPENAI_KEY": "check",
+    "AZURE_OPENAI_ENDPOINT": "https://check.invalid",
+    "JWT_SECRET_KEY": "check",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from sqlalchemy import create_engine, event  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.api.analytics import get_user_dashboard  # noqa: E402
+from app.core.database import Base  # noqa: E402
+from app.models import Assessment, Scenario, Session, SessionStatus, User  # noqa: E402
+
+SPECIALTIES = ["Cardiology", "Respiratory", "Gastroenterology", "Neurology"]
+
+
+def seed(db, sessions: int, start: int) -> None:
+    """Add ``sessions`` more completed sessions, each with an assessment, for user 1"""
+    now = datetime.utcnow()
+    for i in range(start, start + sessions):
+        session_id = f"check_session_{i}"
+        db.add(
+            Session(
+                session_id=session_id,
+                user_id=1,
+                scenario_id=i % len(SPECIALTIES) + 1,
+                status=SessionStatus.COMPLETED,
+                started_at=now - timedelta(minutes=i),
+                duration=600,
+            )
+        )
+        db.add(
+            Assessment(
+                assessment_id=f"check_assessment_{i}",
+                user_id=1,
+                session_id=session_id,
+                overall_score=70,
+            )
+        )
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 50, 500, 2000])
+    parser.add_argument("--max-queries", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    db.add(User(id=1, email="check@example.com", username="check", first_name="A", last_name="B"))
+    for pk, specialty in enumerate(SPECIALTIES, start=1):
+        db.add(
+            Scenario(
+                id=pk,
+                scenario_id=f"check_scenario_{pk}",
+                title=f"{specialty} case",
+                specialty=specialty,
+                patient_profile={},
+                dialogue_tree={},
+                assessment_rubric={},
+            )
+        )
+    db.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+    counts = {}
+    seeded = 0
+    for size in sorted(args.sizes):
+        seed(db, size - seeded, seeded)
+        seeded = size
+        db.expire_all()
+
+        statements.clear()
+        dashboard = asyncio.run(get_user_dashboard(1, db=db, current_user={}))
+        counts[size] = len(statements)
+
+        assert dashboard["total_scenarios_completed"] == size, dashboard
+        assert dashboard["total_time_spent"] == size * 10, dashboard
+        assert dashboard["average_score"] == 70.0, dashboard
+        assert sum(dashboard["scenarios_by_specialty"].values()) == size, dashboard
+        assert len(dashboard["recent_activity"]) == min(size, 5), dashboard
+        assert all(a["score"] == 70 for a in dashboard["recent_activity"]), dashboard
+        print(f"{size:>6} sessions: {counts[size]} queries")
+
+    if len(set(counts.values())) != 1 or max(counts.values()) > args.max_queries:
+        print(f"FAIL: dashboard query count must stay constant and <= {args.max_queries}")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
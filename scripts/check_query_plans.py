@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Check that the hot read queries are answered from indexes.
+
+Seeds a database with a realistic volume of users, scenarios, sessions,
+assessments, skill progress and leaderboard entries, runs EXPLAIN on each
+critical query as the API builds it, and fails if any plan contains a
+sequential scan of a seeded table or a sort (i.e. an index the query relies
+on is missing or no longer matches its filter and ORDER BY).
+
+Uses a throwaway SQLite file by default (EXPLAIN QUERY PLAN); pass
+--database-url to check a scratch PostgreSQL database (EXPLAIN FORMAT JSON,
+after ANALYZE). The schema is created from the models there, so the model
+``__table_args__`` must declare every index the migrations add.
+
+Usage:
+    python scripts/check_query_plans.py [--users 500] [--scenarios 2000]
+        [--sessions 50000] [--database-url URL] [--show-plans]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# Settings are required at import time; the check uses its own engine
+for _name, _value in {
+    "DATABASE_URL": "sqlite:///:memory:",
+    "DATABASE_URL_ASYNC": "sqlite+aiosqlite:///:memory:",
+    "AZURE_SPEECH_KEY": "check",
+    "AZURE_OPENAI_KEY": "check",
+    "AZURE_OPENAI_ENDPOINT": "https://check.invalid",
+    "JWT_SECRET_KEY": "check",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+from sqlalchemy import create_engine, func, insert, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.api.scenarios import ScenarioListItem  # noqa: E402
+from app.api.sessions import SessionListItem  # noqa: E402
+from app.core.database import Base  # noqa: E402
+from app.core.pagination import encode_cursor, keyset_page  # noqa: E402
+from app.core.projection import load_only_for  # noqa: E402
+from app.models import (  # noqa: E402
+    Assessment,
+    LeaderboardEntry,
+    Scenario,
+    ScenarioStatus,
+    Session,
+    SessionStatus,
+    SkillProgress,
+    User,
+)
+from app.models.leaderboard import ALL_SPECIALTIES  # noqa: E402
+from app.models.scenario import DifficultyLevel  # noqa: E402
+from app.services.assessment_engine import SKILLS  # noqa: E402
+
+SPECIALTIES = ["Cardiology", "Respiratory", "Gastroenterology", "Neurology", "General"]
+SEEDED_TABLES = {
+    "users",
+    "scenarios",
+    "sessions",
+    "assessments",
+    "skill_progress",
+    "leaderboard_entries",
+}
+PAGE = 50
+
+
+def seed(db, users: int, scenarios: int, sessions: int) -> None:
+    rng = random.Random(48)
+    now = datetime.utcnow()
+    db.execute(
+        insert(User),
+        [
+            {
+                "id": pk,
+                "email": f"user{pk}@example.com",
+                "username": f"user{pk}",
+                "first_name": "A",
+                "last_name": "B",
+            }
+            for pk in range(1, users + 1)
+        ],
+    )
+    db.execute(
+        insert(Scenario),
+        [
+            {
+                "id": pk,
+                "scenario_id": f"check_{pk}",
+                "title": f"Scenario {pk}",
+                "specialty": rng.choice(SPECIALTIES),
+                "difficulty": rng.choice(list(DifficultyLevel)),
+                # Mostly published, like a live catalogue
+                "status": ScenarioStatus.PUBLISHED if pk % 10 else ScenarioStatus.DRAFT,
+                "patient_profile": {},
+                "dialogue_tree": {},
+                "assessment_rubric": {},
+            }
+            for pk in range(1, scenarios + 1)
+        ],
+    )
+    session_rows, assessment_rows = [], []
+    for pk in range(1, sessions + 1):
+        completed = pk % 5 != 0
+        session_rows.append(
+            {
+                "id": pk,
+                "session_id": f"check_session_{pk}",
+                "user_id": rng.randint(1, users),
+                "scenario_id": rng.randint(1, scenarios),
+                "status": SessionStatus.COMPLETED if completed else SessionStatus.IN_PROGRESS,
+                "started_at": now - timedelta(minutes=pk),
+                "duration": 600,
+            }
+        )
+        if completed:
+            assessment_rows.append(
+                {
+                    "assessment_id": f"check_assessment_{pk}",
+                    "user_id": session_rows[-1]["user_id"],
+                    "session_id": session_rows[-1]["session_id"],
+                    "overall_score": rng.randint(40, 100),
+                    "created_at": now - timedelta(minutes=pk),
+                }
+            )
+    db.execute(insert(Session), session_rows)
+    db.execute(insert(Assessment), assessment_rows)
+    db.execute(
+        insert(SkillProgress),
+        [
+            {"user_id": pk, "skill_name": skill, "current_level": 50, "sessions_count": 1}
+            for pk in range(1, users + 1)
+            for skill in SKILLS
+        ],
+    )
+    db.execute(
+        insert(LeaderboardEntry),
+        [
+            {
+                "user_id": pk,
+                "specialty": specialty,
+                "score_sum": 70,
+                "assessments_count": 1,
+                "average_score": rng.uniform(40, 100),
+            }
+            for pk in range(1, users + 1)
+            for specialty in [ALL_SPECIALTIES] + SPECIALTIES
+        ],
+    )
+    db.commit()
+
+
+def critical_queries(db):
+    """The queries to check, as the endpoints and services build them"""
+    user_id = db.query(Session.user_id).filter(Session.id == 1).scalar()
+    middle = (
+        db.query(Session.started_at, Session.id)
+        .filter(Session.user_id == user_id)
+        .order_by(Session.started_at.desc(), Session.id.desc())
+        .offset(5)
+        .first()
+    )
+    session_keys = [Session.started_at, Session.id]
+    assessment_keys = [Assessment.created_at, Assessment.id]
+    published = Scenario.status == ScenarioStatus.PUBLISHED
+    completed = [Session.user_id == user_id, Session.status == SessionStatus.COMPLETED]
+
+    def scenarios(*filters):
+        query = db.query(Scenario).options(load_only_for(Scenario, ScenarioListItem))
+        return keyset_page(query.filter(published, *filters), [Scenario.id], None, PAGE, False)
+
+    def user_sessions(cursor):
+        query = (
+            db.query(Session)
+            .options(load_only_for(Session, SessionListItem))
+            .filter(Session.user_id == user_id)
+        )
+        return keyset_page(query, session_keys, cursor, PAGE)
+
+    history = (
+        db.query(Session.id, Session.started_at, Scenario.title, Assessment.overall_score)
+        .join(Scenario, Session.scenario_id == Scenario.id)
+        .outerjoin(Assessment, Session.session_id == Assessment.session_id)
+        .filter(Session.user_id == user_id)
+    )
+
+    return {
+        "GET /scenarios": scenarios(),
+        "GET /scenarios?specialty": scenarios(Scenario.specialty == "Cardiology"),
+        "GET /scenarios?specialty&difficulty": scenarios(
+            Scenario.specialty == "Cardiology",
+            Scenario.difficulty == DifficultyLevel.INTERMEDIATE,
+        ),
+        "GET /sessions/user/{id}": user_sessions(None),
+        "GET /sessions/user/{id}?cursor": user_sessions(encode_cursor(middle)),
+        "GET /sessions/user/{id}/history": keyset_page(history, session_keys, None, PAGE),
+        "GET /assessments/user/{id}": keyset_page(
+            db.query(Assessment).filter(Assessment.user_id == user_id),
+            assessment_keys,
+            None,
+            PAGE,
+        ),
+        "dashboard totals": db.query(func.count(Session.id), func.sum(Session.duration)).filter(
+            *completed
+        ),
+        "skill progress of a user": db.query(SkillProgress).filter(
+            SkillProgress.user_id == user_id
+        ),
+        "leaderboard page": db.query(LeaderboardEntry)
+        .filter(LeaderboardEntry.specialty == "Cardiology")
+        .order_by(
+            LeaderboardEntry.average_score.desc(),
+            LeaderboardEntry.assessments_count.desc(),
+            LeaderboardEntry.user_id.desc(),
+        )
+        .limit(10),
+    }
+
+
+def explain(db, query):
+    """
+    Plan of a query and the problems found in it.
+
+    Returns:
+        (plan lines, list of problems)
+    """
+    bind = db.get_bind()
+    sql = str(query.statement.compile(bind, compile_kwargs={"literal_binds": True}))
+    problems = []
+    if bind.dialect.name == "postgresql":
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        lines = []
+
+        def walk(node, depth):
+            kind = node["Node Type"]
+            relation = node.get("Relation Name")
+            index = node.get("Index Name")
+            lines.append("  " * depth + " ".join(filter(None, [kind, relation, index])))
+            if kind == "Seq Scan" and relation in SEEDED_TABLES:
+                problems.append(f"sequential scan of {relation}")
+            if kind in ("Sort", "Incremental Sort"):
+                problems.append(f"{kind.lower()} on {', '.join(node.get('Sort Key', []))}")
+            for child in node.get("Plans", []):
+                walk(child, depth + 1)
+
+        walk(plan[0]["Plan"], 0)
+        return lines, problems
+
+    rows = db.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    lines = [row[3] for row in rows]
+    for detail in lines:
+        if detail.startswith("SCAN ") and " USING " not in detail:
+            problems.append(f"full scan: {detail}")
+        if detail.startswith("USE TEMP B-TREE"):
+            problems.append(f"sort: {detail}")
+    return lines, problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--scenarios", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=50000)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--show-plans", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{tmp}/plans.db"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        db = sessionmaker(bind=engine)()
+        seed(db, args.users, args.scenarios, args.sessions)
+        db.execute(text("ANALYZE"))
+        db.commit()
+
+        failures = 0
+        for name, query in critical_queries(db).items():
+            lines, problems = explain(db, query)
+            failures += bool(problems)
+            print(f"{'FAIL' if problems else 'ok':<6}{name}")
+            for problem in problems:
+                print(f"        {problem}")
+            if args.show_plans or problems:
+                for line in lines:
+                    print(f"          | {line}")
+        db.close()
+        engine.dispose()
+
+    if failures:
+        print(f"FAIL: {failures} queries need a sequential scan or sort")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()